@@ -0,0 +1,4 @@
+"""
+Benchmarks of the service, run in process against db/memory.py instead of
+SQL Server.
+"""
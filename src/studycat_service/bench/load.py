@@ -0,0 +1,243 @@
+"""
+HTTP-level load test of the ASGI app.
+
+Drives studycat_service.main:app in process through httpx's ASGI transport,
+with service/core.py routed to a seeded MemoryRepository (db/memory.py) whose
+calls sleep --latency-ms to stand in for SQL Server round trips. The app's
+lifespan is not run, so Prisma is never connected.
+
+Every simulated student POSTs /init, then answers each served item (3PL
+probability at a true theta ~ N(0, 1) per module), stores the Response as
+Core Backend would and POSTs /step until the attempt ends. Students start
+uniformly over --ramp-seconds (0: all at once, like a lecture starting a
+quiz at the same minute) and wait --think-ms between items. A student whose
+request fails stops there.
+
+Reported: request throughput, p50/p95/p99 latency and error rate per
+endpoint, and event-loop lag (how late a --lag-interval-ms sleep wakes up),
+which shows the time the loop spent blocked.
+
+Usage:
+    python -m studycat_service.bench.load --students 400 --latency-ms 2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+import numpy as np
+
+from ..db.memory import MemoryRepository
+from ..db.synthetic import answer_probability, seed_attempts, seed_quiz
+from .service import PERCENTILES, percentiles
+
+
+@dataclass(frozen=True)
+class LoadConfig:
+    """Bank shape, student population and pacing of one load test."""
+    students: int = 400
+    n_modules: int = 3
+    items_per_module: int = 200
+    attempt_length: int = 20
+    latency_ms: float = 2.0
+    ramp_seconds: float = 0.0
+    think_ms: float = 0.0
+    lag_interval_ms: float = 10.0
+    seed: int = 0
+
+
+@dataclass
+class LoadReport:
+    """
+    Measurements of one load test.
+
+    Attributes:
+        latencies: Seconds per successful request, by endpoint ("init", "step").
+        errors:    Failed requests (non-200 or transport error) by endpoint.
+        statuses:  Responses by (endpoint, HTTP status).
+        loop_lag:  Seconds each lag probe woke up late.
+        completed: Students whose attempt reached FINISH or MASTERED.
+        seconds:   Wall time of the whole run.
+    """
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Counter[str] = field(default_factory=Counter)
+    statuses: Counter[tuple[str, int]] = field(default_factory=Counter)
+    loop_lag: list[float] = field(default_factory=list)
+    completed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def requests(self) -> int:
+        return sum(len(v) for v in self.latencies.values()) + sum(self.errors.values())
+
+    def error_rate(self, endpoint: str) -> float:
+        total = len(self.latencies[endpoint]) + self.errors[endpoint]
+        return self.errors[endpoint] / total if total else 0.0
+
+
+async def _probe_loop_lag(interval: float, report: LoadReport, stop: asyncio.Event) -> None:
+    """Sleep interval seconds at a time, recording how late each wake-up is."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        report.loop_lag.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def _post(
+    client: httpx.AsyncClient, report: LoadReport, endpoint: str, url: str, payload: dict
+) -> dict | None:
+    """POST payload to url, recording the outcome under endpoint. Returns the JSON body."""
+    started = time.perf_counter()
+    try:
+        response = await client.post(url, json=payload)
+    except httpx.HTTPError:
+        report.errors[endpoint] += 1
+        return None
+    elapsed = time.perf_counter() - started
+    report.statuses[(endpoint, response.status_code)] += 1
+    if response.status_code != 200:
+        report.errors[endpoint] += 1
+        return None
+    report.latencies[endpoint].append(elapsed)
+    return response.json()
+
+
+async def _student(
+    client: httpx.AsyncClient,
+    repository: MemoryRepository,
+    attempt_id: str,
+    config: LoadConfig,
+    rng: np.random.Generator,
+    report: LoadReport,
+) -> None:
+    """One student taking one attempt from /init to the end."""
+    module_ids = {item.moduleId for item in repository.items.values()}
+    true_theta = {m: float(rng.normal()) for m in sorted(module_ids)}
+    await asyncio.sleep(rng.uniform(0.0, config.ramp_seconds))
+
+    body = await _post(client, report, "init", f"/v1/attempts/{attempt_id}/init", {})
+    while body is not None and body["next_action"] == "CONTINUE" and body["next_item"]:
+        if config.think_ms:
+            await asyncio.sleep(config.think_ms / 1000)
+        item = repository.items[body["next_item"]["item_id"]]
+        correct = rng.random() < answer_probability(item, true_theta[item.moduleId])
+        response = repository.add_response(attempt_id, item.id, bool(correct))
+        body = await _post(
+            client, report, "step", f"/v1/attempts/{attempt_id}/step",
+            {"response_id": response.id},
+        )
+    if body is not None:
+        report.completed += 1
+
+
+async def run_load(config: LoadConfig) -> LoadReport:
+    """Seed a repository, run every student against the app concurrently and report."""
+    from ..main import app
+
+    repository = MemoryRepository(latency=config.latency_ms / 1000)
+    quiz = seed_quiz(
+        repository,
+        n_modules=config.n_modules,
+        items_per_module=config.items_per_module,
+        seed=config.seed,
+    )
+    attempts = seed_attempts(repository, quiz.id, config.students, config.attempt_length)
+
+    report = LoadReport()
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    with repository.installed():
+        async with httpx.AsyncClient(transport=transport, base_url="http://studycat") as client:
+            probe = asyncio.create_task(
+                _probe_loop_lag(config.lag_interval_ms / 1000, report, stop)
+            )
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                _student(
+                    client, repository, attempt.id, config,
+                    np.random.default_rng([config.seed, n]), report,
+                )
+                for n, attempt in enumerate(attempts)
+            ))
+            report.seconds = time.perf_counter() - started
+            stop.set()
+            await probe
+    return report
+
+
+def format_report(report: LoadReport) -> str:
+    """Throughput, per-endpoint latency/error table and event-loop lag."""
+    throughput = report.requests / report.seconds if report.seconds else 0.0
+    header = (
+        f"{'endpoint':<10}{'ok':>8}{'errors':>8}{'err %':>8}"
+        + "".join(f"{f'p{p} ms':>11}" for p in PERCENTILES)
+    )
+    lines = [
+        f"{report.requests} requests in {report.seconds:.2f} s ({throughput:.1f} req/s), "
+        f"{report.completed} attempts completed",
+        "",
+        header,
+        "-" * len(header),
+    ]
+    for endpoint in ("init", "step"):
+        lines.append(
+            f"{endpoint:<10}{len(report.latencies[endpoint]):>8}{report.errors[endpoint]:>8}"
+            f"{report.error_rate(endpoint) * 100:>8.2f}"
+            + "".join(f"{p * 1000:>11.2f}" for p in percentiles(report.latencies[endpoint]))
+        )
+    failures = {k: v for k, v in report.statuses.items() if k[1] != 200}
+    if failures:
+        lines.append("")
+        lines.extend(
+            f"{endpoint} HTTP {status}: {count}"
+            for (endpoint, status), count in sorted(failures.items())
+        )
+    lag = report.loop_lag
+    p50, _, p99 = percentiles(lag)
+    lines += [
+        "",
+        f"event-loop lag: p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, "
+        f"max {max(lag, default=0.0) * 1000:.2f} ms",
+    ]
+    return "\n".join(lines)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--students", type=int, default=400)
+    parser.add_argument("--modules", type=int, default=3)
+    parser.add_argument("--items-per-module", type=int, default=200)
+    parser.add_argument("--attempt-length", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=2.0,
+                        help="simulated DB round trip per repository call")
+    parser.add_argument("--ramp-seconds", type=float, default=0.0,
+                        help="spread student start times over this many seconds")
+    parser.add_argument("--think-ms", type=float, default=0.0,
+                        help="pause between receiving an item and answering it")
+    parser.add_argument("--lag-interval-ms", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(args: argparse.Namespace) -> None:
+    config = LoadConfig(
+        students=args.students,
+        n_modules=args.modules,
+        items_per_module=args.items_per_module,
+        attempt_length=args.attempt_length,
+        latency_ms=args.latency_ms,
+        ramp_seconds=args.ramp_seconds,
+        think_ms=args.think_ms,
+        lag_interval_ms=args.lag_interval_ms,
+        seed=args.seed,
+    )
+    print(config, end="\n\n")
+    print(format_report(asyncio.run(run_load(config))))
+
+
+if __name__ == "__main__":
+    main(_parser().parse_args())
@@ -0,0 +1,237 @@
+"""
+End-to-end benchmark of init_attempt / step_attempt.
+
+Drives service/core.py against a seeded MemoryRepository (db/memory.py) and
+reports, per request type and per pipeline stage, the p50/p95/p99 latency in
+milliseconds. Stages are the names recorded in service/timing.py:
+
+    context.load        attempt, bank, modules, thetas and correct items
+                        (context.attempt, context.bank, context.correct and
+                        context.filter time its parts)
+    pools.build         engine item pools from the cached bank
+    model.build         the model over the pools
+    replay.model        rebuilding a model from stored responses (incl. pools)
+    replay.responses    re-recording the stored responses
+    step.estimate       theta update for the new response
+    step.select         choosing the next item
+    step.persist        writing thetas, snapshot and checkpoint
+
+Two scenarios run:
+- attempts: simulated students (true theta ~ N(0, 1), 3PL answers) take
+  whole attempts with their sessions cached, as on a warm worker;
+- replay sweep: before every step the attempt's session and the estimation
+  memo are dropped, as on a cold worker, so each step replays every stored
+  response. Step latency is reported per number of stored responses.
+
+Requests run one at a time so every stage observation belongs to exactly one
+request.
+
+Usage:
+    python -m studycat_service.bench.service --modules 3 --items-per-module 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+
+from ..config import settings
+from ..db.memory import MemoryRepository
+from ..db.synthetic import answer_probability, seed_attempts, seed_quiz
+from ..service.bank import estimates
+from ..service.core import init_attempt, step_attempt
+from ..service.session import sessions
+from ..service.timing import timings
+
+PERCENTILES = (50, 95, 99)
+
+# stage name -> seconds of every observation
+Samples = dict[str, list[float]]
+
+
+def percentiles(values: list[float]) -> tuple[float, ...]:
+    """p50/p95/p99 of values (0.0 each when empty)."""
+    if not values:
+        return tuple(0.0 for _ in PERCENTILES)
+    return tuple(float(p) for p in np.percentile(values, PERCENTILES))
+
+
+async def _measure[T](
+    samples: Samples, request: str, call: Callable[[], Awaitable[T]]
+) -> tuple[T, float]:
+    """
+    Await call(), adding its wall time under request and the time of every
+    stage it went through under the stage name. Returns (result, seconds).
+    """
+    before = timings.snapshot()
+    started = time.perf_counter()
+    result = await call()
+    elapsed = time.perf_counter() - started
+    samples[request].append(elapsed)
+    for stage, stats in timings.snapshot().items():
+        prior = before.get(stage)
+        if prior is None or stats.count > prior.count:
+            samples[stage].append(stats.total - (prior.total if prior else 0.0))
+    return result, elapsed
+
+
+async def _take_attempt(
+    repository: MemoryRepository,
+    attempt_id: str,
+    true_theta: dict[str, float],
+    rng: np.random.Generator,
+    samples: Samples,
+    cold: bool = False,
+) -> list[float]:
+    """
+    Take one attempt to its end. With cold, the session and estimation memo
+    are dropped before every step. Returns the latency of every step.
+    """
+    (_, item), _ = await _measure(
+        samples, "init", lambda: init_attempt(attempt_id, None, None, None)
+    )
+    step_latencies = []
+    while item is not None:
+        db_item = repository.items[item.item_id]
+        correct = rng.random() < answer_probability(db_item, true_theta[db_item.moduleId])
+        response = repository.add_response(attempt_id, db_item.id, bool(correct))
+        if cold:
+            sessions.discard(attempt_id)
+            estimates.clear()
+        (_, _, item, finished, _), elapsed = await _measure(
+            samples, "step", lambda r=response: step_attempt(attempt_id, r.id)
+        )
+        step_latencies.append(elapsed)
+        if finished:
+            break
+    return step_latencies
+
+
+async def run_attempts(
+    repository: MemoryRepository,
+    quiz_id: str,
+    n_attempts: int,
+    attempt_length: int,
+    seed: int = 0,
+) -> Samples:
+    """Take n_attempts attempts on quiz_id with cached sessions."""
+    rng = np.random.default_rng(seed)
+    module_ids = [qm.moduleId for qm in repository.quizzes[quiz_id].quizModules]
+    samples: Samples = defaultdict(list)
+    for attempt in seed_attempts(repository, quiz_id, n_attempts, attempt_length):
+        true_theta = {m: float(rng.normal()) for m in module_ids}
+        await _take_attempt(repository, attempt.id, true_theta, rng, samples)
+    return samples
+
+
+async def run_replay_sweep(
+    repository: MemoryRepository,
+    quiz_id: str,
+    n_attempts: int,
+    attempt_length: int,
+    seed: int = 0,
+) -> tuple[dict[int, list[float]], Samples]:
+    """
+    Take n_attempts cold attempts on quiz_id. Returns the step latencies keyed
+    by the number of responses stored before the step, and the stage samples.
+    """
+    rng = np.random.default_rng(seed)
+    module_ids = [qm.moduleId for qm in repository.quizzes[quiz_id].quizModules]
+    by_length: dict[int, list[float]] = defaultdict(list)
+    samples: Samples = defaultdict(list)
+    for attempt in seed_attempts(repository, quiz_id, n_attempts, attempt_length, "sweep"):
+        true_theta = {m: float(rng.normal()) for m in module_ids}
+        latencies = await _take_attempt(
+            repository, attempt.id, true_theta, rng, samples, cold=True
+        )
+        for n_stored, elapsed in enumerate(latencies):
+            by_length[n_stored].append(elapsed)
+    return dict(by_length), samples
+
+
+def format_samples(samples: Samples) -> str:
+    """Table of count and p50/p95/p99 (ms) per request type and stage."""
+    header = f"{'stage':<24}{'n':>7}" + "".join(f"{f'p{p} ms':>11}" for p in PERCENTILES)
+    lines = [header, "-" * len(header)]
+    requests = [name for name in ("init", "step") if name in samples]
+    for name in requests + sorted(set(samples) - set(requests)):
+        values = samples[name]
+        lines.append(
+            f"{name:<24}{len(values):>7}"
+            + "".join(f"{p * 1000:>11.2f}" for p in percentiles(values))
+        )
+    return "\n".join(lines)
+
+
+def format_sweep(by_length: dict[int, list[float]]) -> str:
+    """Table of cold step p50/p95 (ms) per number of stored responses."""
+    header = f"{'responses':>10}{'n':>7}{'p50 ms':>11}{'p95 ms':>11}"
+    lines = [header, "-" * len(header)]
+    for n_stored in sorted(by_length):
+        p50, p95, _ = percentiles(by_length[n_stored])
+        lines.append(
+            f"{n_stored:>10}{len(by_length[n_stored]):>7}{p50 * 1000:>11.2f}{p95 * 1000:>11.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--modules", type=int, default=3, help="modules in the quiz")
+    parser.add_argument("--items-per-module", type=int, default=200)
+    parser.add_argument("--attempts", type=int, default=20, help="attempts to take")
+    parser.add_argument("--attempt-length", type=int, default=20, help="items per attempt")
+    parser.add_argument("--sweep-attempts", type=int, default=3,
+                        help="cold attempts in the replay sweep (0 to skip it)")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="simulated DB round trip per repository call")
+    parser.add_argument("--estimator", default=settings.ability_estimator,
+                        choices=["bayes_modal", "grid_map", "grid_eap"])
+    parser.add_argument("--pool-backend", default=settings.item_pool_backend,
+                        choices=["array", "list"])
+    parser.add_argument("--checkpoints", action="store_true",
+                        help="persist and restore engine checkpoints")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings.ability_estimator = args.estimator
+    settings.item_pool_backend = args.pool_backend
+    settings.engine_checkpoints = args.checkpoints
+
+    repository = MemoryRepository(latency=args.latency_ms / 1000)
+    quiz = seed_quiz(
+        repository,
+        n_modules=args.modules,
+        items_per_module=args.items_per_module,
+        seed=args.seed,
+    )
+    print(
+        f"{args.modules} modules x {args.items_per_module} items, "
+        f"{args.attempt_length} items per attempt, estimator={args.estimator}, "
+        f"pools={args.pool_backend}, checkpoints={args.checkpoints}, "
+        f"db latency={args.latency_ms} ms\n"
+    )
+    with repository.installed():
+        samples = await run_attempts(
+            repository, quiz.id, args.attempts, args.attempt_length, seed=args.seed
+        )
+        print(f"Attempts ({args.attempts}, warm sessions)")
+        print(format_samples(samples))
+        if args.sweep_attempts:
+            by_length, sweep_samples = await run_replay_sweep(
+                repository, quiz.id, args.sweep_attempts, args.attempt_length, seed=args.seed
+            )
+            print(f"\nReplay sweep ({args.sweep_attempts} attempts, cold sessions)")
+            print(format_samples(sweep_samples))
+            print()
+            print(format_sweep(by_length))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(_parser().parse_args()))
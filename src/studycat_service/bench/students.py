@@ -0,0 +1,211 @@
+"""
+Simulated-student throughput and accuracy of the engine.
+
+Runs simulated examinees straight through the engine, without the service
+layer: build_multidim_model, then choose_next_item / record_response until the
+test ends (fixed length reached, every module mastered or pools exhausted).
+Each examinee has a true theta per module drawn from N(0, 1) and answers
+every item correctly with its 3PL probability at that theta.
+
+Reported: attempts per second, estimator calls per attempt (BayesModal runs,
+i.e. memo misses when --memo is set, or grid posterior updates), mean test
+length and the RMSE of the final theta against the true theta.
+
+Examinees can be split across worker processes (--processes); every worker
+draws the same item bank from --seed, and each examinee draws from its own
+generator seeded with (--seed, examinee index), so results only depend on the
+seed and the examinee count. (With --memo the estimator call counts also
+depend on how examinees are split, as each worker has its own memo.)
+Attempts per second are measured over the simulation work only: worker start
+up and bank construction are excluded.
+
+Usage:
+    python -m studycat_service.bench.students --students 1000 --processes 4
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from adaptivetesting.models import ItemPool, TestItem
+
+from ..db.synthetic import make_items
+from ..engine.adapter import _make_test_item, build_multidim_model, choose_next_item
+from ..engine.item_bank import ArrayItemPool
+from ..engine.memo import EstimationMemo
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """Bank shape and engine configuration of one simulation."""
+    n_modules: int = 3
+    items_per_module: int = 200
+    max_length: int = 30
+    mastery_threshold: float = 3.0
+    ability_estimator: str = "bayes_modal"
+    pool_backend: str = "array"
+    memo: bool = False
+    seed: int = 0
+
+
+@dataclass
+class ExamineeResult:
+    """
+    Outcome of one simulated attempt.
+
+    Attributes:
+        true_theta:      Ability per module the responses were drawn from.
+        final_theta:     Engine estimate per module at the end of the attempt.
+        length:          Items administered.
+        estimator_calls: Ability estimations run for the attempt.
+        seconds:         Time spent simulating the attempt.
+    """
+    true_theta: dict[str, float]
+    final_theta: dict[str, float]
+    length: int
+    estimator_calls: int
+    seconds: float = 0.0
+
+
+def _bank(config: SimulationConfig) -> dict[str, list[TestItem]]:
+    """TestItems per module, identical in every worker for a given seed."""
+    rng = np.random.default_rng(config.seed)
+    module_ids = [f"module{m}" for m in range(config.n_modules)]
+    by_module: dict[str, list[TestItem]] = {m: [] for m in module_ids}
+    for item in make_items(rng, module_ids, config.items_per_module):
+        by_module[item.moduleId].append(
+            _make_test_item(a=item.irtA, b=item.irtB, c=item.irtC, item_id=item.id)
+        )
+    return by_module
+
+
+def simulate(
+    config: SimulationConfig, n_students: int, first_student: int = 0
+) -> list[ExamineeResult]:
+    """
+    Run examinees first_student .. first_student + n_students - 1 against the
+    config's bank. Examinee n draws its abilities and responses from a
+    generator seeded with (config.seed, n).
+    """
+    bank = _bank(config)
+    array_pools = {m: ArrayItemPool(items) for m, items in bank.items()}
+    # The memo only applies to BayesModal; grid estimators update a posterior
+    use_memo = config.memo and config.ability_estimator == "bayes_modal"
+    memo = EstimationMemo(max_entries=65536) if use_memo else None
+
+    results = []
+    for student in range(first_student, first_student + n_students):
+        started = time.perf_counter()
+        rng = np.random.default_rng([config.seed, student])
+        true_theta = {m: float(rng.normal()) for m in bank}
+        if config.pool_backend == "array":
+            pools = {m: pool.copy() for m, pool in array_pools.items()}
+        else:
+            pools = {m: ItemPool(list(items)) for m, items in bank.items()}
+        model = build_multidim_model(
+            concepts=list(bank),
+            pools_by_concept=pools,
+            prior_mu=0.0,
+            prior_sigma2=1.0,
+            mastery_thresholds=dict.fromkeys(bank, config.mastery_threshold),
+            ability_estimator=config.ability_estimator,
+            estimation_memo=memo,
+        )
+        misses = memo.misses if memo is not None else 0
+
+        length = 0
+        while length < config.max_length:
+            item, skill = choose_next_item(model)
+            if item is None:
+                break
+            theta = true_theta[skill]
+            p = item.c + (item.d - item.c) / (1.0 + np.exp(-item.a * (theta - item.b)))
+            model.record_response(skill, int(rng.random() < p), item)
+            length += 1
+
+        results.append(ExamineeResult(
+            true_theta=true_theta,
+            final_theta={m: uni.get_theta() for m, uni in model.models.items()},
+            length=length,
+            estimator_calls=memo.misses - misses if memo is not None else length,
+            seconds=time.perf_counter() - started,
+        ))
+    return results
+
+
+def run(
+    config: SimulationConfig, n_students: int, processes: int = 1
+) -> tuple[list[ExamineeResult], float]:
+    """
+    Simulate n_students examinees, in processes worker processes when more
+    than one. Returns the results and the simulation time in seconds: the
+    longest time any worker spent simulating its examinees.
+    """
+    if processes <= 1:
+        chunks = [simulate(config, n_students)]
+    else:
+        chunks = [c for c in np.array_split(np.arange(n_students), processes) if len(c)]
+        # Spawned workers: forking a process with live executor threads can deadlock
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+            futures = [pool.submit(simulate, config, len(c), int(c[0])) for c in chunks]
+            chunks = [future.result() for future in futures]
+    results = [r for chunk in chunks for r in chunk]
+    return results, max((sum(r.seconds for r in chunk) for chunk in chunks), default=0.0)
+
+
+def summarize(results: list[ExamineeResult], seconds: float) -> dict[str, float]:
+    """Attempts/s, estimator calls per attempt, mean length and theta RMSE."""
+    errors = [
+        r.final_theta[m] - r.true_theta[m] for r in results for m in r.true_theta
+    ]
+    return {
+        "attempts": len(results),
+        "attempts_per_second": len(results) / seconds if seconds else 0.0,
+        "estimator_calls_per_attempt": float(np.mean([r.estimator_calls for r in results])),
+        "mean_length": float(np.mean([r.length for r in results])),
+        "rmse": float(np.sqrt(np.mean(np.square(errors)))),
+    }
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--modules", type=int, default=3)
+    parser.add_argument("--items-per-module", type=int, default=200)
+    parser.add_argument("--max-length", type=int, default=30, help="items per attempt")
+    parser.add_argument("--mastery-threshold", type=float, default=3.0)
+    parser.add_argument("--estimator", default="bayes_modal",
+                        choices=["bayes_modal", "grid_map", "grid_eap"])
+    parser.add_argument("--pool-backend", default="array", choices=["array", "list"])
+    parser.add_argument("--memo", action="store_true",
+                        help="share BayesModal estimates by response pattern")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(args: argparse.Namespace) -> None:
+    config = SimulationConfig(
+        n_modules=args.modules,
+        items_per_module=args.items_per_module,
+        max_length=args.max_length,
+        mastery_threshold=args.mastery_threshold,
+        ability_estimator=args.estimator,
+        pool_backend=args.pool_backend,
+        memo=args.memo,
+        seed=args.seed,
+    )
+    results, seconds = run(config, args.students, args.processes)
+    summary = summarize(results, seconds)
+    print(f"{config}\nprocesses={args.processes}, simulation={seconds:.2f} s\n")
+    for name, value in summary.items():
+        print(f"{name:<30}{value:>12.3f}")
+
+
+if __name__ == "__main__":
+    main(_parser().parse_args())
@@ -0,0 +1,161 @@
+"""
+Small in-process LRU cache with optional TTL and weight cap.
+
+Shared by the service-level caches (attempt sessions, item banks, ...) so each
+of them gets the same eviction semantics:
+- entries beyond max_entries are evicted least-recently-used first,
+- entries older than ttl_seconds are dropped on access (idle time when
+  sliding=True, time since insertion otherwise),
+- when a weigher is given, entries are evicted until the summed weight is
+  at most max_weight.
+
+Not thread-safe; callers use it from the event loop only.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class TTLCache:
+    """
+    LRU mapping with idle/absolute expiry and an optional weight budget.
+
+    Attributes:
+        hits (int):   Number of get() calls that returned a live entry.
+        misses (int): Number of get() calls that found nothing (or an expired entry).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float | None = None,
+        max_weight: int | None = None,
+        weigher: Callable[[Any], int] | None = None,
+        on_evict: Callable[[Hashable, Any], None] | None = None,
+        sliding: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Arguments:
+            max_entries (int): Maximum number of entries kept.
+            ttl_seconds (float | None): Expiry in seconds, or None to never expire.
+            max_weight (int | None): Budget for the summed weight of all entries.
+            weigher (Callable | None): Returns the weight of a value; defaults to 1.
+            on_evict (Callable | None): Called with (key, value) whenever an entry is
+                dropped by eviction or expiry (not by pop/discard/clear).
+            sliding (bool): Whether get() refreshes the entry's expiry (idle TTL).
+            clock (Callable): Monotonic time source, injectable for tests.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_weight = max_weight
+        self._weigher = weigher or (lambda _value: 1)
+        self._on_evict = on_evict
+        self._sliding = sliding
+        self._clock = clock
+        # key -> (value, weight, stamp)
+        self._data: OrderedDict[Hashable, tuple[Any, int, float]] = OrderedDict()
+        self._weight = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and not self._expired(entry)
+
+    @property
+    def weight(self) -> int:
+        """Summed weight of all cached entries."""
+        return self._weight
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key and mark it most recently used."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if self._expired(entry):
+            self._drop(key, evicted=True)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        if self._sliding:
+            value, weight, _ = entry
+            self._data[key] = (value, weight, self._clock())
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or replace key, then evict down to the configured limits."""
+        if key in self._data:
+            self._drop(key, evicted=False)
+        weight = self._weigher(value)
+        self._data[key] = (value, weight, self._clock())
+        self._weight += weight
+        self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value (counts as a lookup)."""
+        entry = self._data.get(key)
+        if entry is None or self._expired(entry):
+            if entry is not None:
+                self._drop(key, evicted=True)
+            self.misses += 1
+            return default
+        self._drop(key, evicted=False)
+        self.hits += 1
+        return entry[0]
+
+    def discard(self, key: Hashable) -> None:
+        """Remove key if present."""
+        if key in self._data:
+            self._drop(key, evicted=False)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the hit/miss counters."""
+        self._data.clear()
+        self._weight = 0
+        self.hits = 0
+        self.misses = 0
+
+    def values(self) -> list[Any]:
+        """Snapshot of the live values, least recently used first."""
+        return [value for value, _, _ in self._data.values()]
+
+    # ---- internals ----
+
+    def _expired(self, entry: tuple[Any, int, float]) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        return self._clock() - entry[2] > self.ttl_seconds
+
+    def _drop(self, key: Hashable, evicted: bool) -> None:
+        value, weight, _ = self._data.pop(key)
+        self._weight -= weight
+        if evicted and self._on_evict is not None:
+            self._on_evict(key, value)
+
+    def _evict(self) -> None:
+        # Expired entries go first, then least-recently-used until within budget.
+        # With a sliding TTL the LRU order is also stamp order, so stop at the
+        # first live entry.
+        expired = []
+        for key, entry in self._data.items():
+            if self._expired(entry):
+                expired.append(key)
+            elif self._sliding:
+                break
+        for key in expired:
+            self._drop(key, evicted=True)
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_weight is not None and self._weight > self.max_weight)
+        ):
+            key = next(iter(self._data))
+            self._drop(key, evicted=True)
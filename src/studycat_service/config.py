@@ -13,5 +13,85 @@ class Settings(BaseModel):
     prior_mu: float = 0.0
     prior_sigma2: float = 1.0
 
+    # In-process attempt session cache (service/session.py)
+    session_cache_max_entries: int = 2048
+    session_cache_ttl_seconds: float = 1800.0      # idle time before a session is dropped
+    session_cache_max_items: int = 2_000_000       # engine items held across all sessions
+
+    # Per-quiz item bank cache (service/bank.py)
+    bank_cache_max_quizzes: int = 256
+    bank_cache_ttl_seconds: float = 300.0          # reload at least this often
+
+    # Items each enrollment answered correctly per quiz, for quizzes that do not
+    # repeat correct questions (service/exclusions.py)
+    correct_cache_max_entries: int = 8192
+    correct_cache_ttl_seconds: float = 60.0        # reload at least this often
+
+    # Serialised /init and /step responses replayed to retried requests
+    # (service/results.py)
+    result_cache_max_entries: int = 4096
+    result_cache_ttl_seconds: float = 600.0        # time since the response was computed
+
+    # Item pool implementation handed to the engine: "array" (NumPy-backed pools
+    # with vectorised selection, engine/item_bank.py) or "list" (adaptivetesting's
+    # ItemPool of TestItem objects)
+    item_pool_backend: str = "array"
+
+    # Theta update after each response: "bayes_modal" (adaptivetesting's BayesModal
+    # over the full response pattern), or "grid_map" / "grid_eap" (incremental
+    # grid posterior, engine/grid.py, with grid_points points over [-4, 4])
+    ability_estimator: str = "bayes_modal"
+    grid_points: int = 161
+
+    # LRU of "bayes_modal" estimates by (bank version, prior, items, responses),
+    # shared by every attempt on the worker (engine/memo.py)
+    estimation_memo_max_entries: int = 65536
+
+    # Persist engine checkpoints on Attempt.engineCheckpoint after every step so a
+    # cold worker can restore the model instead of replaying every response.
+    # Enable once the studycat-schema migration adding the column is deployed.
+    engine_checkpoints: bool = False
+
+    # After serving an item, compute the theta update and next item for both
+    # possible answers in the background so the following /step only persists
+    # the matching branch. Costs two model forks per served item.
+    speculative_steps: bool = False
+
+    # Attempts without stored thetas or excluded items open identically for a
+    # given bank, module scope and prior. init_cache shares their initial model
+    # and first item per bank; with decision_tree_depth K > 0 the first K+1
+    # items come from a precomputed decision tree instead (2**(K+1) - 1 models,
+    # service/tree.py). Each bank holds at most init_cache_max_per_bank openings.
+    init_cache: bool = True
+    decision_tree_depth: int = 0
+    init_cache_max_per_bank: int = 32
+
+    # Executor for estimation/selection (service/executor.py): "thread" runs them
+    # on engine_workers threads off the event loop, "inline" on the loop itself.
+    # Past engine_max_queue pending computations requests wait for a slot; those
+    # still waiting after engine_queue_timeout seconds are rejected with 503.
+    engine_executor: str = "thread"
+    engine_workers: int = 4
+    engine_max_queue: int = 64
+    engine_queue_timeout: float = 5.0
+
+    # Fraction of HTTP requests whose stage timings are returned in a
+    # Server-Timing header and logged as a structured record (middleware.py)
+    timing_sample_rate: float = 0.0
+
+    # Repository backend chosen at startup (db/backend.py): "prisma" (SQL Server
+    # via DATABASE_URL), "memory" (in-process, synthetic data) or "sqlite"
+    # (sqlite_path, seeded with the synthetic data when empty)
+    repository_backend: str = "prisma"
+    sqlite_path: str = "studycat.sqlite3"
+
+    # Synthetic quiz and attempts seeded into the memory/SQLite backends
+    # (db/synthetic.py): quiz "quiz", attempts "quiz-attempt0", "quiz-attempt1", ...
+    synthetic_modules: int = 3
+    synthetic_items_per_module: int = 200
+    synthetic_attempts: int = 100
+    synthetic_attempt_length: int = 20
+    synthetic_seed: int = 0
+
 
 settings = Settings()
@@ -0,0 +1,168 @@
+"""
+Repository backends.
+
+service/core.py reaches the database only through the functions of
+db/repo.py, reached as `core.repo`. The Repository protocol below is that
+query surface; three backends implement it:
+
+- "prisma": db/repo.py itself, over the SQL Server behind DATABASE_URL;
+- "memory": db/memory.py, seeded with a synthetic quiz (db/synthetic.py);
+- "sqlite": db/sqlite.py, a local file seeded the same way when it is empty.
+
+settings.repository_backend picks one at startup (main.py's lifespan enters
+open_repository()). The memory and SQLite backends only need the synthetic
+data settings, so benchmarks and cache experiments run without SQL Server.
+
+open_repository() installs the backend wrapped in a MeteredRepository, which
+counts and times every repository call for /v1/metrics (metrics.py).
+"""
+from __future__ import annotations
+
+import inspect
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Protocol
+
+from ..config import settings
+from ..metrics import db_calls, db_duration, db_errors
+
+REPOSITORY_BACKENDS = ("prisma", "memory", "sqlite")
+
+
+class Repository(Protocol):
+    """The db/repo.py functions service/core.py calls."""
+
+    async def get_attempt(self, attempt_id: str) -> Any | None: ...
+
+    async def list_responses(self, attempt_id: str) -> list[Any]: ...
+
+    async def list_response_ids(self, attempt_id: str) -> list[str]: ...
+
+    async def get_response_by_id(self, response_id: str) -> Any | None: ...
+
+    async def list_eligible_items_for_quiz(
+        self, quiz_id: str, quiz: Any | None = None
+    ) -> list[Any]: ...
+
+    async def get_item_by_id(self, item_id: str) -> Any | None: ...
+
+    async def get_correct_item_ids_for_enrollment_and_quiz(
+        self, enrollment_id: str, quiz_id: str
+    ) -> set[str]: ...
+
+    async def persist_step_results(
+        self,
+        enrollment_id: str,
+        thetas: dict[str, float],
+        response_id: str | None = None,
+        snapshot: str | None = None,
+        attempt_id: str | None = None,
+        checkpoint: str | None = None,
+    ) -> None: ...
+
+    async def get_thetas_for_enrollment(
+        self, enrollment_id: str, module_ids: list[str] | None = None
+    ) -> dict[str, float]: ...
+
+
+class MeteredRepository:
+    """
+    Proxy of a Repository recording, per coroutine function called through it,
+    studycat_db_calls_total, studycat_db_call_errors_total and
+    studycat_db_call_duration_seconds. Other attributes pass through.
+
+    Attributes:
+        repository (Repository): The wrapped backend.
+    """
+
+    def __init__(self, repository: Repository):
+        self.repository = repository
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.repository, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def metered(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await attr(*args, **kwargs)
+            except Exception:
+                db_errors.labels(name).inc()
+                raise
+            finally:
+                db_calls.labels(name).inc()
+                db_duration.labels(name).observe(time.perf_counter() - started)
+
+        return metered
+
+
+@contextmanager
+def installed(repository: Repository) -> Iterator[Repository]:
+    """Route service/core.py's repository calls to repository for the with-block."""
+    from ..service import core
+
+    previous, core.repo = core.repo, repository
+    try:
+        yield repository
+    finally:
+        core.repo = previous
+
+
+def seed_synthetic(repository) -> None:
+    """Seed a memory or SQLite repository with the settings' synthetic quiz and attempts."""
+    from .synthetic import seed_attempts, seed_quiz
+
+    quiz = seed_quiz(
+        repository,
+        n_modules=settings.synthetic_modules,
+        items_per_module=settings.synthetic_items_per_module,
+        seed=settings.synthetic_seed,
+    )
+    seed_attempts(
+        repository, quiz.id, settings.synthetic_attempts, settings.synthetic_attempt_length
+    )
+
+
+@asynccontextmanager
+async def open_repository(backend: str | None = None) -> AsyncIterator[Repository]:
+    """
+    Open the backend (settings.repository_backend by default), install it
+    (metered) for service/core.py and close it on exit. Yields the backend
+    itself.
+
+    Raises:
+        ValueError: If backend is not one of REPOSITORY_BACKENDS.
+    """
+    backend = backend or settings.repository_backend
+    if backend == "prisma":
+        from . import repo
+        from .client import db
+
+        await db.connect()
+        try:
+            with installed(MeteredRepository(repo)):
+                yield repo
+        finally:
+            await db.disconnect()
+    elif backend == "memory":
+        from .memory import MemoryRepository
+
+        repository = MemoryRepository()
+        seed_synthetic(repository)
+        with installed(MeteredRepository(repository)):
+            yield repository
+    elif backend == "sqlite":
+        from .sqlite import SQLiteRepository
+
+        repository = SQLiteRepository(settings.sqlite_path)
+        try:
+            if repository.is_empty():
+                seed_synthetic(repository)
+            with installed(MeteredRepository(repository)):
+                yield repository
+        finally:
+            repository.close()
+    else:
+        raise ValueError(f"Unknown repository backend: {backend}")
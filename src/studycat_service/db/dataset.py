@@ -0,0 +1,320 @@
+"""
+Streaming generator of large synthetic datasets.
+
+Benchmarks of list_eligible_items_for_quiz,
+get_correct_item_ids_for_enrollment_and_quiz and step replay need production
+volumes: tens of thousands of items, thousands of enrollments and millions of
+responses. generate() produces such a dataset row by row and streams it, in
+batches, into a sink:
+
+- SQLiteSink: a file with the db/sqlite.py schema, ready for the "sqlite"
+  repository backend (point settings.sqlite_path at it);
+- JSONLSink: a directory snapshot with one <Table>.jsonl file per table, one
+  JSON object per row, columns named as in the SQLite schema.
+
+Only the item bank and the quizzes are held in memory; enrollments, attempts,
+responses and thetas are written as they are drawn.
+
+The shape of the data:
+- items_total items with 3PL parameters (as db/synthetic.py) spread evenly
+  over n_modules modules and the first n_blooms Bloom levels; a fraction
+  (inactive_fraction) is inactive;
+- n_quizzes quizzes over modules_per_quiz modules each. Half of them
+  restrict Bloom levels (includedBlooms). explicit_fraction of them also list
+  explicit_items items explicitly (QuizItem), drawn from their modules at any
+  Bloom level or activity, so scope resolution exercises both paths;
+  no_repeat_fraction of them disable repeatCorrectQuestions;
+- n_enrollments students with a true theta per module ~ N(0, 1), each taking
+  attempts_per_enrollment finished attempts of history responses on random
+  quizzes. Items are drawn at random from the quiz's scope (excluding, on
+  no-repeat quizzes, items the student already answered correctly) and
+  answered by their 3PL probability. Every module answered gets a Theta row.
+
+Usage:
+    python -m studycat_service.db.dataset sqlite bank.sqlite3 --items 20000 \\
+        --enrollments 5000 --history 40
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+
+from .records import Item
+from .sqlite import SCHEMA
+from .synthetic import BLOOMS, SEEDED_AT, answer_probability, make_items
+
+
+@dataclass(frozen=True)
+class DatasetConfig:
+    """Volumes and mix of one generated dataset."""
+    items_total: int = 20000
+    n_modules: int = 40
+    n_blooms: int = len(BLOOMS)
+    inactive_fraction: float = 0.05
+    n_quizzes: int = 50
+    modules_per_quiz: int = 3
+    explicit_fraction: float = 0.2
+    explicit_items: int = 60
+    no_repeat_fraction: float = 0.5
+    mastery_threshold: float = 1.5
+    n_enrollments: int = 2000
+    attempts_per_enrollment: int = 5
+    history: int = 20
+    seed: int = 0
+
+
+class Sink(Protocol):
+    def write(self, table: str, rows: list[dict]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SQLiteSink:
+    """Bulk-load rows into a SQLite file with the db/sqlite.py schema."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path)
+        # A generated file can always be regenerated: trade durability for speed
+        self._conn.execute("PRAGMA journal_mode = OFF")
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.executescript(SCHEMA)
+
+    def write(self, table: str, rows: list[dict]) -> None:
+        columns = list(rows[0])
+        self._conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            [tuple(row[c] for c in columns) for row in rows],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class JSONLSink:
+    """Append rows to <directory>/<table>.jsonl."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._files = {}
+
+    def write(self, table: str, rows: list[dict]) -> None:
+        f = self._files.get(table)
+        if f is None:
+            f = self._files[table] = open(self.directory / f"{table}.jsonl", "w")
+        f.writelines(json.dumps(row) + "\n" for row in rows)
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+
+
+class _Batches:
+    """Per-table row buffers flushed to a sink every batch_size rows."""
+
+    def __init__(self, sink: Sink, batch_size: int):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.counts: Counter[str] = Counter()
+        self._rows: dict[str, list[dict]] = defaultdict(list)
+
+    def add(self, table: str, row: dict) -> None:
+        rows = self._rows[table]
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table: str | None = None) -> None:
+        for name in [table] if table else list(self._rows):
+            if self._rows[name]:
+                self.sink.write(name, self._rows[name])
+                self.counts[name] += len(self._rows[name])
+                self._rows[name] = []
+
+
+@dataclass
+class _QuizScope:
+    quiz_id: str
+    item_ids: list[str]
+    no_repeat: bool
+
+
+def _write_bank(
+    config: DatasetConfig, rng: np.random.Generator, batches: _Batches
+) -> tuple[dict[str, Item], list[_QuizScope]]:
+    """Draw and write items, options and quizzes; return the items and quiz scopes."""
+    module_ids = [f"module{m}" for m in range(config.n_modules)]
+    blooms = BLOOMS[:config.n_blooms]
+    items = make_items(rng, module_ids, max(1, config.items_total // config.n_modules))
+    by_module: dict[str, list[Item]] = defaultdict(list)
+    for item in items:
+        item.bloom = blooms[int(rng.integers(len(blooms)))]
+        item.active = bool(rng.random() >= config.inactive_fraction)
+        by_module[item.moduleId].append(item)
+        options = [asdict(o) for o in item.options]
+        batches.add("Item", {
+            k: v for k, v in asdict(item).items() if k != "options"
+        })
+        for option in options:
+            batches.add("Option", {"itemId": item.id, **option})
+
+    scopes = []
+    for q in range(config.n_quizzes):
+        quiz_id = f"quiz{q}"
+        modules = list(rng.choice(
+            module_ids, size=min(config.modules_per_quiz, len(module_ids)), replace=False
+        ))
+        included = None
+        if rng.random() < 0.5 and len(blooms) > 1:
+            included = list(rng.choice(blooms, size=max(1, len(blooms) // 2), replace=False))
+        candidates = [it for m in modules for it in by_module[m]]
+        scope = {
+            it.id for it in candidates
+            if it.active and (included is None or it.bloom in included)
+        }
+        explicit = []
+        if rng.random() < config.explicit_fraction:
+            picks = rng.choice(
+                len(candidates), size=min(config.explicit_items, len(candidates)), replace=False
+            )
+            explicit = [candidates[int(i)].id for i in picks]
+        no_repeat = bool(rng.random() < config.no_repeat_fraction)
+
+        batches.add("Quiz", {
+            "id": quiz_id,
+            "includedBlooms": ",".join(included) if included else None,
+            "repeatCorrectQuestions": not no_repeat,
+            "updatedAt": SEEDED_AT.isoformat(),
+        })
+        for module_id in modules:
+            batches.add("QuizModule", {
+                "quizId": quiz_id,
+                "moduleId": str(module_id),
+                "masteryThreshold": config.mastery_threshold,
+            })
+        for item_id in explicit:
+            batches.add("QuizItem", {"quizId": quiz_id, "itemId": item_id})
+        item_ids = explicit + sorted(scope - set(explicit))
+        scopes.append(_QuizScope(quiz_id, item_ids, no_repeat))
+    return {it.id: it for it in items}, scopes
+
+
+def generate(config: DatasetConfig, sink: Sink, batch_size: int = 10000) -> Counter[str]:
+    """Stream a dataset into sink. Returns the number of rows written per table."""
+    rng = np.random.default_rng(config.seed)
+    batches = _Batches(sink, batch_size)
+    items, scopes = _write_bank(config, rng, batches)
+    answered_at = 0
+
+    for e in range(config.n_enrollments):
+        enrollment_id = f"enrollment{e}"
+        true_theta: dict[str, float] = {}
+        correct: dict[str, set[str]] = defaultdict(set)
+        for k in range(config.attempts_per_enrollment):
+            scope = scopes[int(rng.integers(len(scopes)))]
+            attempt_id = f"{enrollment_id}-attempt{k}"
+            batches.add("Attempt", {
+                "id": attempt_id,
+                "quizId": scope.quiz_id,
+                "enrollmentId": enrollment_id,
+                "fixedLengthN": config.history,
+                "engineCheckpoint": None,
+            })
+            eligible = scope.item_ids
+            if scope.no_repeat and correct[scope.quiz_id]:
+                eligible = [i for i in eligible if i not in correct[scope.quiz_id]]
+            picks = rng.choice(
+                len(eligible), size=min(config.history, len(eligible)), replace=False
+            )
+            for i in picks:
+                item = items[eligible[int(i)]]
+                theta = true_theta.setdefault(item.moduleId, float(rng.normal()))
+                is_correct = bool(rng.random() < answer_probability(item, theta))
+                if is_correct:
+                    correct[scope.quiz_id].add(item.id)
+                batches.add("Response", {
+                    "id": f"{attempt_id}-r{answered_at}",
+                    "attemptId": attempt_id,
+                    "itemId": item.id,
+                    "isCorrect": is_correct,
+                    "answeredAt": answered_at,
+                    "engineMasterySnapshot": None,
+                })
+                answered_at += 1
+        for module_id, theta in true_theta.items():
+            batches.add("Theta", {
+                "enrollmentId": enrollment_id,
+                "moduleId": module_id,
+                "value": theta + float(rng.normal(0.0, 0.3)),
+            })
+
+    batches.flush()
+    sink.close()
+    return batches.counts
+
+
+def _parser() -> argparse.ArgumentParser:
+    defaults = DatasetConfig()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("format", choices=["sqlite", "jsonl"])
+    parser.add_argument("out", help="SQLite file, or directory for the JSONL snapshot")
+    parser.add_argument("--items", type=int, default=defaults.items_total)
+    parser.add_argument("--modules", type=int, default=defaults.n_modules)
+    parser.add_argument("--blooms", type=int, default=defaults.n_blooms,
+                        choices=range(1, len(BLOOMS) + 1))
+    parser.add_argument("--inactive-fraction", type=float, default=defaults.inactive_fraction)
+    parser.add_argument("--quizzes", type=int, default=defaults.n_quizzes)
+    parser.add_argument("--modules-per-quiz", type=int, default=defaults.modules_per_quiz)
+    parser.add_argument("--explicit-fraction", type=float, default=defaults.explicit_fraction,
+                        help="fraction of quizzes that also list items explicitly")
+    parser.add_argument("--explicit-items", type=int, default=defaults.explicit_items)
+    parser.add_argument("--no-repeat-fraction", type=float,
+                        default=defaults.no_repeat_fraction)
+    parser.add_argument("--enrollments", type=int, default=defaults.n_enrollments)
+    parser.add_argument("--attempts-per-enrollment", type=int,
+                        default=defaults.attempts_per_enrollment)
+    parser.add_argument("--history", type=int, default=defaults.history,
+                        help="responses per attempt")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    return parser
+
+
+def main(args: argparse.Namespace) -> None:
+    config = DatasetConfig(
+        items_total=args.items,
+        n_modules=args.modules,
+        n_blooms=args.blooms,
+        inactive_fraction=args.inactive_fraction,
+        n_quizzes=args.quizzes,
+        modules_per_quiz=args.modules_per_quiz,
+        explicit_fraction=args.explicit_fraction,
+        explicit_items=args.explicit_items,
+        no_repeat_fraction=args.no_repeat_fraction,
+        n_enrollments=args.enrollments,
+        attempts_per_enrollment=args.attempts_per_enrollment,
+        history=args.history,
+        seed=args.seed,
+    )
+    if args.format == "sqlite" and Path(args.out).exists():
+        raise SystemExit(f"{args.out} already exists")
+    sink = SQLiteSink(args.out) if args.format == "sqlite" else JSONLSink(args.out)
+    started = time.perf_counter()
+    counts = generate(config, sink, batch_size=args.batch_size)
+    for table, count in sorted(counts.items()):
+        print(f"{table:<12}{count:>12}")
+    print(f"{sum(counts.values())} rows in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main(_parser().parse_args())
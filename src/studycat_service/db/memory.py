@@ -0,0 +1,186 @@
+"""
+In-memory stand-in for db/repo.py.
+
+MemoryRepository implements the Repository protocol (db/backend.py), i.e.
+every function of db/repo.py that the service layer calls, over the plain
+records of db/records.py instead of Prisma. It lets benchmarks (bench/) and
+local runs drive service/core.py end to end without a SQL Server.
+
+An optional per-call latency (seconds) stands in for DB round trips.
+
+Use `installed()` to route service/core.py through a repository:
+
+    repository = MemoryRepository()
+    with repository.installed():
+        await init_attempt(...)
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from .backend import installed
+from .records import Attempt, Item, Quiz, Response
+
+
+class MemoryRepository:
+    """
+    db/repo.py over in-memory records.
+
+    Attributes:
+        latency (float): Seconds every repository call sleeps, to model the
+            round trip to the database. 0 by default.
+        calls (Counter): Number of calls per repository function.
+        items, quizzes, attempts, responses: Records by primary key.
+        thetas: Stored theta per (enrollment_id, module_id).
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.items: dict[str, Item] = {}
+        self.quizzes: dict[str, Quiz] = {}
+        self.attempts: dict[str, Attempt] = {}
+        self.responses: dict[str, Response] = {}
+        self.thetas: dict[tuple[str, str], float] = {}
+        self._clock = itertools.count()
+
+    # ---- seeding (what Core Backend would write) ----
+
+    def add_item(self, item: Item) -> Item:
+        self.items[item.id] = item
+        return item
+
+    def add_quiz(self, quiz: Quiz) -> Quiz:
+        self.quizzes[quiz.id] = quiz
+        return quiz
+
+    def add_attempt(
+        self, attempt_id: str, quiz_id: str, enrollment_id: str, fixed_length: int
+    ) -> Attempt:
+        attempt = Attempt(
+            id=attempt_id,
+            quizId=quiz_id,
+            enrollmentId=enrollment_id,
+            fixedLengthN=fixed_length,
+            quiz=self.quizzes.get(quiz_id),
+        )
+        self.attempts[attempt_id] = attempt
+        return attempt
+
+    def add_response(self, attempt_id: str, item_id: str, is_correct: bool) -> Response:
+        """Store the student's answer to item_id, as Core Backend does before /step."""
+        answered_at = next(self._clock)
+        response = Response(
+            id=f"{attempt_id}-r{answered_at}",
+            attemptId=attempt_id,
+            itemId=item_id,
+            item=self.items[item_id],
+            isCorrect=is_correct,
+            answeredAt=answered_at,
+        )
+        self.responses[response.id] = response
+        return response
+
+    @contextmanager
+    def installed(self) -> Iterator[MemoryRepository]:
+        """Route service/core.py's repository calls to this repository."""
+        with installed(self):
+            yield self
+
+    async def _call(self, name: str) -> None:
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _attempt_responses(self, attempt_id: str) -> list[Response]:
+        return sorted(
+            (r for r in self.responses.values() if r.attemptId == attempt_id),
+            key=lambda r: r.answeredAt,
+        )
+
+    # ---- db/repo.py ----
+
+    async def get_attempt(self, attempt_id: str) -> Attempt | None:
+        await self._call("get_attempt")
+        return self.attempts.get(attempt_id)
+
+    async def list_responses(self, attempt_id: str) -> list[Response]:
+        await self._call("list_responses")
+        return self._attempt_responses(attempt_id)
+
+    async def list_response_ids(self, attempt_id: str) -> list[str]:
+        await self._call("list_response_ids")
+        return [r.id for r in self._attempt_responses(attempt_id)]
+
+    async def get_response_by_id(self, response_id: str) -> Response | None:
+        await self._call("get_response_by_id")
+        return self.responses.get(response_id)
+
+    async def list_eligible_items_for_quiz(
+        self, quiz_id: str, quiz: Quiz | None = None
+    ) -> list[Item]:
+        await self._call("list_eligible_items_for_quiz")
+        quiz = quiz or self.quizzes.get(quiz_id)
+        if not quiz:
+            return []
+        explicit = [self.items[qi.itemId] for qi in quiz.quizItems if qi.itemId in self.items]
+        module_ids = {qm.moduleId for qm in quiz.quizModules}
+        blooms = (
+            {b.strip() for b in quiz.includedBlooms.split(",")} if quiz.includedBlooms else None
+        )
+        explicit_ids = {it.id for it in explicit}
+        filtered = [
+            it for it in self.items.values()
+            if it.active
+            and (not module_ids or it.moduleId in module_ids)
+            and (blooms is None or it.bloom in blooms)
+            and it.id not in explicit_ids
+        ]
+        return explicit + filtered
+
+    async def get_item_by_id(self, item_id: str) -> Item | None:
+        await self._call("get_item_by_id")
+        return self.items.get(item_id)
+
+    async def get_correct_item_ids_for_enrollment_and_quiz(
+        self, enrollment_id: str, quiz_id: str
+    ) -> set[str]:
+        await self._call("get_correct_item_ids_for_enrollment_and_quiz")
+        return {
+            r.itemId for r in self.responses.values()
+            if r.isCorrect
+            and self.attempts[r.attemptId].quizId == quiz_id
+            and self.attempts[r.attemptId].enrollmentId == enrollment_id
+        }
+
+    async def persist_step_results(
+        self,
+        enrollment_id: str,
+        thetas: dict[str, float],
+        response_id: str | None = None,
+        snapshot: str | None = None,
+        attempt_id: str | None = None,
+        checkpoint: str | None = None,
+    ) -> None:
+        await self._call("persist_step_results")
+        for module_id, value in thetas.items():
+            self.thetas[(enrollment_id, module_id)] = value
+        if response_id is not None and snapshot is not None:
+            self.responses[response_id].engineMasterySnapshot = snapshot
+        if attempt_id is not None and checkpoint is not None:
+            self.attempts[attempt_id].engineCheckpoint = checkpoint
+
+    async def get_thetas_for_enrollment(
+        self, enrollment_id: str, module_ids: list[str] | None = None
+    ) -> dict[str, float]:
+        await self._call("get_thetas_for_enrollment")
+        return {
+            module_id: value
+            for (enrollment, module_id), value in self.thetas.items()
+            if enrollment == enrollment_id and (module_ids is None or module_id in module_ids)
+        }
+
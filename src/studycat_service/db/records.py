@@ -0,0 +1,76 @@
+"""
+Plain records returned by the non-Prisma repositories (db/memory.py,
+db/sqlite.py).
+
+Each dataclass carries the field names of the Prisma model it stands in for,
+so service/core.py reads them exactly like prisma.models objects.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+
+@dataclass
+class Option:
+    label: str
+    text: str
+    isCorrect: bool
+
+
+@dataclass
+class Item:
+    id: str
+    moduleId: str
+    irtA: float
+    irtB: float
+    irtC: float
+    stem: str = ""
+    options: list[Option] = field(default_factory=list)
+    active: bool = True
+    bloom: str | None = None
+    figureUrl: str | None = None
+    reference: str | None = None
+
+
+@dataclass
+class QuizItem:
+    itemId: str
+
+
+@dataclass
+class QuizModule:
+    quizId: str
+    moduleId: str
+    masteryThreshold: float
+
+
+@dataclass
+class Quiz:
+    id: str
+    quizItems: list[QuizItem] = field(default_factory=list)
+    quizModules: list[QuizModule] = field(default_factory=list)
+    includedBlooms: str | None = None
+    repeatCorrectQuestions: bool = True
+    updatedAt: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+
+@dataclass
+class Attempt:
+    id: str
+    quizId: str
+    enrollmentId: str
+    fixedLengthN: int
+    quiz: Quiz | None = None
+    engineCheckpoint: str | None = None
+
+
+@dataclass
+class Response:
+    id: str
+    attemptId: str
+    itemId: str
+    item: Item
+    isCorrect: bool
+    answeredAt: int
+    engineMasterySnapshot: str | None = None
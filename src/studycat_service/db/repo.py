@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from typing import Any
 
-from prisma.models import Attempt, Item, Quiz, QuizModule, Response, Theta
+from prisma.models import Attempt, Item, Quiz, Response
 
 from .client import db
 
@@ -15,6 +15,9 @@ async def get_attempt(attempt_id: str) -> Attempt | None:
     """
     Fetch an Attempt record by its primary key, including its related Quiz.
 
+    The quiz comes with its quizItems and quizModules so callers can resolve
+    the quiz's scope and settings without reading the quiz row again.
+
     Args:
         attempt_id: Primary key of the Attempt to fetch.
 
@@ -23,41 +26,12 @@ async def get_attempt(attempt_id: str) -> Attempt | None:
     """
     return await db.attempt.find_unique(
         where={"id": attempt_id},
-        include={"quiz": True, "responses": False}
-    )
-
-
-async def get_quiz(quiz_id: str) -> Quiz | None:
-    """
-    Fetch a Quiz record by its primary key without any relations included.
-
-    Args:
-        quiz_id: Primary key of the Quiz to fetch.
-
-    Returns:
-        The Quiz record, or None if not found.
-    """
-    return await db.quiz.find_unique(
-        where={"id": quiz_id}
+        include={
+            "quiz": {"include": {"quizItems": True, "quizModules": True}},
+            "responses": False,
+        }
     )
 
-async def get_quiz_modules(quiz_id: str) -> list[QuizModule]:
-    """
-    Fetch all QuizModule records associated with a given quiz.
-
-    Each QuizModule links a quiz to a concept/module and carries the mastery
-    threshold for that concept within the quiz context.
-
-    Args:
-        quiz_id: Primary key of the Quiz whose modules to retrieve.
-
-    Returns:
-        A list of QuizModule records, or an empty list if none are configured.
-    """
-    quiz_modules = await db.quizmodule.find_many(
-        where={"quizId": quiz_id}
-    )
-    return quiz_modules
 
 # -------- Responses --------
 
@@ -67,54 +41,56 @@ async def list_responses(attempt_id: str) -> list[Response]:
 
     Responses are ordered by answeredAt ascending so callers can replay them
     into the IRT model in the correct sequence to reconstruct historical theta
-    estimates. Each response includes its related item and that item's options.
+    estimates. Each response includes its related item; replay only needs the
+    item's id and moduleId, so options are not loaded.
 
     Args:
         attempt_id: Primary key of the Attempt whose responses to retrieve.
 
     Returns:
-        A list of Response records ordered oldest-first, each with item and
-        options included. Returns an empty list if no responses exist yet.
+        A list of Response records ordered oldest-first, each with its item
+        included (without options). Returns an empty list if no responses
+        exist yet.
     """
     # We want ordered history to optionally "replay" into the model if you choose.
     return await db.response.find_many(
         where={"attemptId": attempt_id},
         order={"answeredAt": "asc"},
-        include={"item": {"include": {"options": True}}}
+        include={"item": True}
     )
 
 
-async def get_response_by_id(response_id: str) -> Response | None:
-    """Fetch a specific Response by ID with item and options included."""
-    return await db.response.find_unique(
-        where={"id": response_id},
-        include={"item": {"include": {"options": True}}}
-    )
-
-
-async def attach_engine_snapshot_to_response(response_id: str, snapshot: str) -> None:
+async def list_response_ids(attempt_id: str) -> list[str]:
     """
-    Persist a mastery snapshot onto a Response record.
+    Fetch the IDs of all Responses for an attempt, oldest first.
 
-    Writes the JSON-serialised theta values to the engineMasterySnapshot field
-    so that historical ability estimates are preserved alongside each response
-    for auditing and analytics.
+    A light-weight companion to list_responses (no relations included) used to
+    check that a cached attempt session has seen every stored response.
 
     Args:
-        response_id: Primary key of the Response to update.
-        snapshot:    JSON string of skill → float theta values to store. Should be
-                     produced by _snapshot_payload in service/core.py to
-                     ensure format consistency.
+        attempt_id: Primary key of the Attempt whose responses to list.
+
+    Returns:
+        Response IDs ordered by answeredAt ascending.
     """
-    await db.response.update(
+    responses = await db.response.find_many(
+        where={"attemptId": attempt_id},
+        order={"answeredAt": "asc"},
+    )
+    return [r.id for r in responses]
+
+
+async def get_response_by_id(response_id: str) -> Response | None:
+    """Fetch a specific Response by ID with its item (without options) included."""
+    return await db.response.find_unique(
         where={"id": response_id},
-        data={"engineMasterySnapshot": snapshot}
+        include={"item": True}
     )
 
 
 # -------- Items (scope) --------
 
-async def list_eligible_items_for_quiz(quiz_id: str) -> list[Item]:
+async def list_eligible_items_for_quiz(quiz_id: str, quiz: Quiz | None = None) -> list[Item]:
     """
     Resolve the full set of items eligible for a given quiz by unioning
     explicitly assigned items with filter-based selection.
@@ -128,29 +104,37 @@ async def list_eligible_items_for_quiz(quiz_id: str) -> list[Item]:
     The two sets are merged with deduplication so an item appearing in both
     the explicit list and the filter results is only returned once.
 
+    Items are returned without their options: the engine only needs id,
+    moduleId, active and the IRT parameters, and the content of the one item
+    served is fetched separately with get_item_by_id. (Prisma Client Python has
+    no per-query field projection, so scalar columns still come back.)
+
     Args:
         quiz_id: Primary key of the Quiz to resolve items for.
+        quiz:    The Quiz already loaded with quizItems and quizModules included
+                 (e.g. Attempt.quiz from get_attempt). Fetched when None.
 
     Returns:
-        A deduplicated list of Item records with options included, or an
+        A deduplicated list of Item records without options, or an
         empty list if the quiz does not exist or no items match the criteria.
 
     TODO: If you add scope logic to Core Backend, you can instead pass eligible ids to the engine
     and avoid re-computing here.
     """
-    quiz = await db.quiz.find_unique(
-        where={"id": quiz_id},
-        include={
-            "quizItems": True,
-            "quizModules": {"include": {"module": True}},
-            }
-    )
+    if quiz is None:
+        quiz = await db.quiz.find_unique(
+            where={"id": quiz_id},
+            include={
+                "quizItems": True,
+                "quizModules": True,
+                }
+        )
     if not quiz:
         return []
 
     explicit_ids = [qi.itemId for qi in quiz.quizItems]
 
-    included_module_ids = [qm.module.id for qm in quiz.quizModules]
+    included_module_ids = [qm.moduleId for qm in quiz.quizModules]
 
     # Filter-based scope
     where_clause: dict[str, Any] = {"active": True}
@@ -162,16 +146,12 @@ async def list_eligible_items_for_quiz(quiz_id: str) -> list[Item]:
         where_clause["bloom"] = {"in": bloom_list}
 
     # If explicit list exists, union of both (explicit always included)
-    filter_items = await db.item.find_many(
-        where=where_clause,
-        include={"options": True}
-    )
+    filter_items = await db.item.find_many(where=where_clause)
 
     # De-dup union
     if explicit_ids:
         explicit_items = await db.item.find_many(
             where={"id": {"in": explicit_ids}},
-            include={"options": True}
         )
         explicit_item_ids = {ei.id for ei in explicit_items}
         items = explicit_items + [
@@ -207,6 +187,7 @@ async def get_correct_item_ids_for_enrollment_and_quiz(
     Returns item IDs that this student has EVER answered correctly
     for this quiz (across all attempts).
     """
+    # One row per distinct item; no relations are loaded
     responses = await db.response.find_many(
         where={
             "isCorrect": True,
@@ -215,7 +196,7 @@ async def get_correct_item_ids_for_enrollment_and_quiz(
                 "enrollmentId": enrollment_id,
             },
         },
-        include={"item": False},  # optional, just get response fields
+        distinct=["itemId"],
     )
 
     # Collect unique item IDs
@@ -223,55 +204,69 @@ async def get_correct_item_ids_for_enrollment_and_quiz(
 
 # -------- Theta Management --------
 
-async def upsert_theta(enrollment_id: str, module_id: str, value: float) -> Theta:
-    """
-    Create or update the theta value for a specific enrollment and module.
-
-    Performs a manual find-then-update/create rather than a Prisma upsert to
-    remain compatible with the current client configuration. Idempotent: calling
-    this multiple times with the same arguments will converge on the last value.
-
-    Args:
-        enrollment_id: Primary key of the Enrollment to update.
-        module_id:     Primary key of the Module (concept) being updated.
-        value:         New theta (ability estimate) to store.
-
-    Returns:
-        The updated or newly created Theta record.
-    """
-    # First try to find existing theta
-    existing_theta = await db.theta.find_unique(
-        where={
-            "enrollmentId_moduleId": {
-                "enrollmentId": enrollment_id,
-                "moduleId": module_id
-            }
-        }
-    )
-
-    if existing_theta:
-        # Update existing theta
-        return await db.theta.update(
+def _queue_theta_upserts(batcher, enrollment_id: str, thetas: dict[str, float]) -> None:
+    """Add one Theta upsert per module to a Prisma batch."""
+    for module_id, value in thetas.items():
+        batcher.theta.upsert(
             where={
                 "enrollmentId_moduleId": {
                     "enrollmentId": enrollment_id,
                     "moduleId": module_id
                 }
             },
-            data={"value": value}
-        )
-    else:
-        # Create new theta
-        return await db.theta.create(
             data={
-                "enrollmentId": enrollment_id,
-                "moduleId": module_id,
-                "value": value
+                "create": {
+                    "enrollmentId": enrollment_id,
+                    "moduleId": module_id,
+                    "value": value
+                },
+                "update": {"value": value},
             }
         )
 
 
-async def get_thetas_for_enrollment(enrollment_id: str, module_ids: list[str]) -> dict[str, float]:
+async def persist_step_results(
+    enrollment_id: str,
+    thetas: dict[str, float],
+    response_id: str | None = None,
+    snapshot: str | None = None,
+    attempt_id: str | None = None,
+    checkpoint: str | None = None,
+) -> None:
+    """
+    Write everything a step produces in one transaction.
+
+    Theta upserts, the Response snapshot and (optionally) the engine checkpoint
+    are sent as a single Prisma batch: one round trip, and either all of them
+    are stored or none is, so a cancelled request never leaves thetas updated
+    without their snapshot.
+
+    Args:
+        enrollment_id: Primary key of the Enrollment whose thetas are written.
+        thetas:        Map module_id -> new theta to store.
+        response_id:   Response to attach the snapshot to, if any.
+        snapshot:      JSON produced by service/core.py:_snapshot_payload.
+        attempt_id:    Attempt to store the checkpoint on, if any.
+        checkpoint:    String produced by engine/checkpoint.py:dump_checkpoint.
+    """
+    async with db.batch_() as batcher:
+        _queue_theta_upserts(batcher, enrollment_id, thetas)
+        if response_id is not None and snapshot is not None:
+            batcher.response.update(
+                where={"id": response_id},
+                data={"engineMasterySnapshot": snapshot}
+            )
+        if attempt_id is not None and checkpoint is not None:
+            batcher.attempt.update(
+                where={"id": attempt_id},
+                data={"engineCheckpoint": checkpoint}
+            )
+
+
+async def get_thetas_for_enrollment(
+    enrollment_id: str,
+    module_ids: list[str] | None = None,
+) -> dict[str, float]:
     """
     Fetch theta values for a batch of modules for a single enrollment.
 
@@ -282,16 +277,15 @@ async def get_thetas_for_enrollment(enrollment_id: str, module_ids: list[str]) -
 
     Args:
         enrollment_id: Primary key of the Enrollment to query.
-        module_ids:    List of module IDs to retrieve thetas for.
+        module_ids:    List of module IDs to retrieve thetas for, or None for
+                       every module the enrollment has a theta for.
 
     Returns:
         A dict mapping module_id → float theta value for each module that
         has a stored record. Modules with no record are excluded.
     """
-    thetas = await db.theta.find_many(
-        where={
-            "enrollmentId": enrollment_id,
-            "moduleId": {"in": module_ids}
-        }
-    )
+    where: dict[str, Any] = {"enrollmentId": enrollment_id}
+    if module_ids is not None:
+        where["moduleId"] = {"in": module_ids}
+    thetas = await db.theta.find_many(where=where)
     return {theta.moduleId: theta.value for theta in thetas}
@@ -0,0 +1,402 @@
+"""
+SQLite-backed repository.
+
+SQLiteRepository implements the Repository protocol (db/backend.py) over a
+local SQLite file whose tables mirror the Prisma models service/core.py uses
+(Item, Option, Quiz, QuizItem, QuizModule, Attempt, Response, Theta). Rows
+come back as the records of db/records.py.
+
+sqlite3 is blocking, so every query runs on one dedicated worker thread: the
+event loop never waits on disk, and the connection is only ever used by one
+thread at a time. Writes of one call are committed as one transaction, like
+the Prisma batches of db/repo.py.
+
+It has the seeding methods of MemoryRepository (add_item, add_quiz,
+add_attempt, add_response), so db/synthetic.py seeds either.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import sqlite3
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .records import Attempt, Item, Option, Quiz, QuizItem, QuizModule, Response
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS Item (
+    id TEXT PRIMARY KEY,
+    moduleId TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    irtA REAL NOT NULL,
+    irtB REAL NOT NULL,
+    irtC REAL NOT NULL,
+    stem TEXT NOT NULL DEFAULT '',
+    bloom TEXT,
+    figureUrl TEXT,
+    reference TEXT
+);
+CREATE INDEX IF NOT EXISTS Item_moduleId ON Item (moduleId);
+CREATE TABLE IF NOT EXISTS Option (
+    itemId TEXT NOT NULL,
+    label TEXT NOT NULL,
+    text TEXT NOT NULL,
+    isCorrect INTEGER NOT NULL,
+    PRIMARY KEY (itemId, label)
+);
+CREATE TABLE IF NOT EXISTS Quiz (
+    id TEXT PRIMARY KEY,
+    includedBlooms TEXT,
+    repeatCorrectQuestions INTEGER NOT NULL DEFAULT 1,
+    updatedAt TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS QuizItem (
+    quizId TEXT NOT NULL,
+    itemId TEXT NOT NULL,
+    PRIMARY KEY (quizId, itemId)
+);
+CREATE TABLE IF NOT EXISTS QuizModule (
+    quizId TEXT NOT NULL,
+    moduleId TEXT NOT NULL,
+    masteryThreshold REAL NOT NULL,
+    PRIMARY KEY (quizId, moduleId)
+);
+CREATE TABLE IF NOT EXISTS Attempt (
+    id TEXT PRIMARY KEY,
+    quizId TEXT NOT NULL,
+    enrollmentId TEXT NOT NULL,
+    fixedLengthN INTEGER NOT NULL,
+    engineCheckpoint TEXT
+);
+CREATE INDEX IF NOT EXISTS Attempt_enrollment_quiz ON Attempt (enrollmentId, quizId);
+CREATE TABLE IF NOT EXISTS Response (
+    id TEXT PRIMARY KEY,
+    attemptId TEXT NOT NULL,
+    itemId TEXT NOT NULL,
+    isCorrect INTEGER NOT NULL,
+    answeredAt INTEGER NOT NULL,
+    engineMasterySnapshot TEXT
+);
+CREATE INDEX IF NOT EXISTS Response_attempt ON Response (attemptId, answeredAt);
+CREATE TABLE IF NOT EXISTS Theta (
+    enrollmentId TEXT NOT NULL,
+    moduleId TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (enrollmentId, moduleId)
+);
+"""
+
+_ITEM_COLUMNS = "id, moduleId, active, irtA, irtB, irtC, stem, bloom, figureUrl, reference"
+
+_UPSERT_THETA = """
+INSERT INTO Theta (enrollmentId, moduleId, value) VALUES (?, ?, ?)
+ON CONFLICT (enrollmentId, moduleId) DO UPDATE SET value = excluded.value
+"""
+
+
+def _item(row: sqlite3.Row, options: list[Option] | None = None) -> Item:
+    return Item(
+        id=row["id"],
+        moduleId=row["moduleId"],
+        active=bool(row["active"]),
+        irtA=row["irtA"],
+        irtB=row["irtB"],
+        irtC=row["irtC"],
+        stem=row["stem"],
+        bloom=row["bloom"],
+        figureUrl=row["figureUrl"],
+        reference=row["reference"],
+        options=options or [],
+    )
+
+
+class SQLiteRepository:
+    """
+    db/repo.py over a SQLite file.
+
+    Args:
+        path: Database file, created with the schema if missing (":memory:"
+              for a throwaway database).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        row = self._conn.execute("SELECT MAX(answeredAt) FROM Response").fetchone()
+        self._clock = itertools.count(0 if row[0] is None else row[0] + 1)
+
+    def close(self) -> None:
+        """Stop the worker thread and close the connection."""
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+    def is_empty(self) -> bool:
+        """True when the database holds no quiz yet."""
+        return self._conn.execute("SELECT 1 FROM Quiz LIMIT 1").fetchone() is None
+
+    async def _run[T](self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run fn(connection) on the worker thread inside one transaction."""
+        def transaction() -> T:
+            with self._conn:
+                return fn(self._conn)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, transaction)
+
+    # ---- seeding (what Core Backend would write) ----
+
+    def add_item(self, item: Item) -> Item:
+        with self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO Item ({_ITEM_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                (item.id, item.moduleId, int(item.active), item.irtA, item.irtB, item.irtC,
+                 item.stem, item.bloom, item.figureUrl, item.reference),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO Option (itemId, label, text, isCorrect) VALUES (?,?,?,?)",
+                [(item.id, o.label, o.text, int(o.isCorrect)) for o in item.options],
+            )
+        return item
+
+    def add_quiz(self, quiz: Quiz) -> Quiz:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO Quiz (id, includedBlooms, repeatCorrectQuestions, "
+                "updatedAt) VALUES (?,?,?,?)",
+                (quiz.id, quiz.includedBlooms, int(quiz.repeatCorrectQuestions),
+                 quiz.updatedAt.isoformat()),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO QuizItem (quizId, itemId) VALUES (?,?)",
+                [(quiz.id, qi.itemId) for qi in quiz.quizItems],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO QuizModule (quizId, moduleId, masteryThreshold) "
+                "VALUES (?,?,?)",
+                [(quiz.id, qm.moduleId, qm.masteryThreshold) for qm in quiz.quizModules],
+            )
+        return quiz
+
+    def add_attempt(
+        self, attempt_id: str, quiz_id: str, enrollment_id: str, fixed_length: int
+    ) -> Attempt:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO Attempt (id, quizId, enrollmentId, fixedLengthN) "
+                "VALUES (?,?,?,?)",
+                (attempt_id, quiz_id, enrollment_id, fixed_length),
+            )
+        return Attempt(
+            id=attempt_id, quizId=quiz_id, enrollmentId=enrollment_id, fixedLengthN=fixed_length
+        )
+
+    def add_response(self, attempt_id: str, item_id: str, is_correct: bool) -> Response:
+        """Store the student's answer to item_id, as Core Backend does before /step."""
+        answered_at = next(self._clock)
+        response_id = f"{attempt_id}-r{answered_at}"
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO Response (id, attemptId, itemId, isCorrect, answeredAt) "
+                "VALUES (?,?,?,?,?)",
+                (response_id, attempt_id, item_id, int(is_correct), answered_at),
+            )
+            row = self._conn.execute(
+                f"SELECT {_ITEM_COLUMNS} FROM Item WHERE id = ?", (item_id,)
+            ).fetchone()
+        return Response(
+            id=response_id, attemptId=attempt_id, itemId=item_id, item=_item(row),
+            isCorrect=is_correct, answeredAt=answered_at,
+        )
+
+    # ---- queries ----
+
+    @staticmethod
+    def _quiz(conn: sqlite3.Connection, quiz_id: str) -> Quiz | None:
+        row = conn.execute("SELECT * FROM Quiz WHERE id = ?", (quiz_id,)).fetchone()
+        if row is None:
+            return None
+        return Quiz(
+            id=row["id"],
+            includedBlooms=row["includedBlooms"],
+            repeatCorrectQuestions=bool(row["repeatCorrectQuestions"]),
+            updatedAt=datetime.fromisoformat(row["updatedAt"]),
+            quizItems=[
+                QuizItem(itemId=r["itemId"])
+                for r in conn.execute("SELECT itemId FROM QuizItem WHERE quizId = ?", (quiz_id,))
+            ],
+            quizModules=SQLiteRepository._quiz_modules(conn, quiz_id),
+        )
+
+    @staticmethod
+    def _quiz_modules(conn: sqlite3.Connection, quiz_id: str) -> list[QuizModule]:
+        return [
+            QuizModule(quizId=r["quizId"], moduleId=r["moduleId"],
+                       masteryThreshold=r["masteryThreshold"])
+            for r in conn.execute("SELECT * FROM QuizModule WHERE quizId = ?", (quiz_id,))
+        ]
+
+    @staticmethod
+    def _responses(conn: sqlite3.Connection, where: str, args: tuple) -> list[Response]:
+        item_columns = ", ".join(f"i.{c} AS {c}" for c in _ITEM_COLUMNS.split(", "))
+        rows = conn.execute(
+            f"SELECT r.id AS responseId, r.attemptId, r.isCorrect, r.answeredAt, "
+            f"r.engineMasterySnapshot, {item_columns} "
+            f"FROM Response r JOIN Item i ON i.id = r.itemId WHERE {where} "
+            f"ORDER BY r.answeredAt",
+            args,
+        )
+        return [
+            Response(
+                id=row["responseId"],
+                attemptId=row["attemptId"],
+                itemId=row["id"],
+                item=_item(row),
+                isCorrect=bool(row["isCorrect"]),
+                answeredAt=row["answeredAt"],
+                engineMasterySnapshot=row["engineMasterySnapshot"],
+            )
+            for row in rows
+        ]
+
+    async def get_attempt(self, attempt_id: str) -> Attempt | None:
+        def query(conn):
+            row = conn.execute("SELECT * FROM Attempt WHERE id = ?", (attempt_id,)).fetchone()
+            if row is None:
+                return None
+            return Attempt(
+                id=row["id"],
+                quizId=row["quizId"],
+                enrollmentId=row["enrollmentId"],
+                fixedLengthN=row["fixedLengthN"],
+                engineCheckpoint=row["engineCheckpoint"],
+                quiz=self._quiz(conn, row["quizId"]),
+            )
+
+        return await self._run(query)
+
+    async def list_responses(self, attempt_id: str) -> list[Response]:
+        return await self._run(
+            lambda conn: self._responses(conn, "r.attemptId = ?", (attempt_id,))
+        )
+
+    async def list_response_ids(self, attempt_id: str) -> list[str]:
+        return await self._run(lambda conn: [
+            row[0] for row in conn.execute(
+                "SELECT id FROM Response WHERE attemptId = ? ORDER BY answeredAt", (attempt_id,)
+            )
+        ])
+
+    async def get_response_by_id(self, response_id: str) -> Response | None:
+        responses = await self._run(
+            lambda conn: self._responses(conn, "r.id = ?", (response_id,))
+        )
+        return responses[0] if responses else None
+
+    async def list_eligible_items_for_quiz(
+        self, quiz_id: str, quiz: Quiz | None = None
+    ) -> list[Item]:
+        def query(conn):
+            scope = quiz or self._quiz(conn, quiz_id)
+            if scope is None:
+                return []
+            explicit_ids = [qi.itemId for qi in scope.quizItems]
+            module_ids = [qm.moduleId for qm in scope.quizModules]
+
+            where, args = ["active = 1"], []
+            if module_ids:
+                where.append(f"moduleId IN ({','.join('?' * len(module_ids))})")
+                args += module_ids
+            if scope.includedBlooms:
+                blooms = [b.strip() for b in scope.includedBlooms.split(",")]
+                where.append(f"bloom IN ({','.join('?' * len(blooms))})")
+                args += blooms
+            filtered = [_item(r) for r in conn.execute(
+                f"SELECT {_ITEM_COLUMNS} FROM Item WHERE {' AND '.join(where)}", args
+            )]
+            if not explicit_ids:
+                return filtered
+            explicit = [_item(r) for r in conn.execute(
+                f"SELECT {_ITEM_COLUMNS} FROM Item "
+                f"WHERE id IN ({','.join('?' * len(explicit_ids))})",
+                explicit_ids,
+            )]
+            seen = {it.id for it in explicit}
+            return explicit + [it for it in filtered if it.id not in seen]
+
+        return await self._run(query)
+
+    async def get_item_by_id(self, item_id: str) -> Item | None:
+        def query(conn):
+            row = conn.execute(
+                f"SELECT {_ITEM_COLUMNS} FROM Item WHERE id = ?", (item_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            options = [
+                Option(label=o["label"], text=o["text"], isCorrect=bool(o["isCorrect"]))
+                for o in conn.execute(
+                    "SELECT * FROM Option WHERE itemId = ? ORDER BY label", (item_id,)
+                )
+            ]
+            return _item(row, options)
+
+        return await self._run(query)
+
+    async def get_correct_item_ids_for_enrollment_and_quiz(
+        self, enrollment_id: str, quiz_id: str
+    ) -> set[str]:
+        return await self._run(lambda conn: {
+            row[0] for row in conn.execute(
+                "SELECT DISTINCT r.itemId FROM Response r JOIN Attempt a ON a.id = r.attemptId "
+                "WHERE r.isCorrect = 1 AND a.quizId = ? AND a.enrollmentId = ?",
+                (quiz_id, enrollment_id),
+            )
+        })
+
+    async def persist_step_results(
+        self,
+        enrollment_id: str,
+        thetas: dict[str, float],
+        response_id: str | None = None,
+        snapshot: str | None = None,
+        attempt_id: str | None = None,
+        checkpoint: str | None = None,
+    ) -> None:
+        def write(conn):
+            conn.executemany(
+                _UPSERT_THETA, [(enrollment_id, m, v) for m, v in thetas.items()]
+            )
+            if response_id is not None and snapshot is not None:
+                conn.execute(
+                    "UPDATE Response SET engineMasterySnapshot = ? WHERE id = ?",
+                    (snapshot, response_id),
+                )
+            if attempt_id is not None and checkpoint is not None:
+                conn.execute(
+                    "UPDATE Attempt SET engineCheckpoint = ? WHERE id = ?",
+                    (checkpoint, attempt_id),
+                )
+
+        await self._run(write)
+
+    async def get_thetas_for_enrollment(
+        self, enrollment_id: str, module_ids: list[str] | None = None
+    ) -> dict[str, float]:
+        def query(conn):
+            sql, args = "SELECT moduleId, value FROM Theta WHERE enrollmentId = ?", [enrollment_id]
+            if module_ids is not None:
+                sql += f" AND moduleId IN ({','.join('?' * len(module_ids))})"
+                args += module_ids
+            return {row["moduleId"]: row["value"] for row in conn.execute(sql, args)}
+
+        return await self._run(query)
+
+    def installed(self):
+        """Route service/core.py's repository calls to this repository."""
+        from .backend import installed
+
+        return installed(self)
@@ -0,0 +1,109 @@
+"""
+Synthetic quizzes, items and enrollments for the local repositories.
+
+Items get 3PL parameters drawn from fixed distributions (discrimination
+a ~ U(0.5, 2.5), difficulty b ~ N(0, 1.2), guessing c ~ U(0, 0.25)), spread
+evenly across modules, so benchmarks and simulations run against banks shaped
+like real ones. Everything is drawn from one seeded generator: the same
+arguments always produce the same data. MemoryRepository and
+SQLiteRepository are seeded alike.
+"""
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .records import Attempt, Item, Option, Quiz, QuizModule
+
+if TYPE_CHECKING:
+    from .memory import MemoryRepository
+    from .sqlite import SQLiteRepository
+
+BLOOMS = ("remember", "understand", "apply", "analyze", "evaluate", "create")
+
+# Quiz.updatedAt of every seeded quiz, so seeded data is fully reproducible
+SEEDED_AT = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def make_items(
+    rng: np.random.Generator,
+    module_ids: list[str],
+    items_per_module: int,
+    prefix: str = "item",
+) -> list[Item]:
+    """Draw items_per_module four-option items for every module."""
+    items = []
+    for module_id in module_ids:
+        for n in range(items_per_module):
+            correct = int(rng.integers(4))
+            items.append(Item(
+                id=f"{prefix}-{module_id}-{n}",
+                moduleId=module_id,
+                irtA=float(rng.uniform(0.5, 2.5)),
+                irtB=float(rng.normal(0.0, 1.2)),
+                irtC=float(rng.uniform(0.0, 0.25)),
+                stem=f"{module_id} question {n}",
+                options=[
+                    Option(label=label, text=f"Option {label}", isCorrect=i == correct)
+                    for i, label in enumerate("ABCD")
+                ],
+                bloom=BLOOMS[int(rng.integers(len(BLOOMS)))],
+            ))
+    return items
+
+
+def seed_quiz(
+    repository: MemoryRepository | SQLiteRepository,
+    quiz_id: str = "quiz",
+    n_modules: int = 3,
+    items_per_module: int = 100,
+    mastery_threshold: float = 1.5,
+    repeat_correct: bool = True,
+    seed: int = 0,
+) -> Quiz:
+    """
+    Add a quiz over n_modules modules of items_per_module items each.
+
+    Items are selected by module filter (no explicit QuizItems), as for most
+    StudyCAT quizzes.
+    """
+    rng = np.random.default_rng(seed)
+    module_ids = [f"{quiz_id}-module{m}" for m in range(n_modules)]
+    for item in make_items(rng, module_ids, items_per_module, prefix=quiz_id):
+        repository.add_item(item)
+    return repository.add_quiz(Quiz(
+        id=quiz_id,
+        quizModules=[
+            QuizModule(quizId=quiz_id, moduleId=m, masteryThreshold=mastery_threshold)
+            for m in module_ids
+        ],
+        repeatCorrectQuestions=repeat_correct,
+        updatedAt=SEEDED_AT,
+    ))
+
+
+def seed_attempts(
+    repository: MemoryRepository | SQLiteRepository,
+    quiz_id: str,
+    n_attempts: int,
+    fixed_length: int,
+    prefix: str = "attempt",
+) -> list[Attempt]:
+    """
+    Add one attempt on quiz_id for each of n_attempts new enrollments, with
+    IDs "{quiz_id}-{prefix}{n}" (enrollments "{quiz_id}-{prefix}{n}-student").
+    """
+    attempts = []
+    for n in range(n_attempts):
+        attempt_id = f"{quiz_id}-{prefix}{n}"
+        attempts.append(repository.add_attempt(
+            attempt_id, quiz_id, f"{attempt_id}-student", fixed_length
+        ))
+    return attempts
+
+
+def answer_probability(item: Item, theta: float) -> float:
+    """3PL probability that a student of ability theta answers item correctly."""
+    return item.irtC + (1.0 - item.irtC) / (1.0 + np.exp(-item.irtA * (theta - item.irtB)))
@@ -6,19 +6,31 @@ response (if provided), and ask the model for the next item.
 """
 from __future__ import annotations
 
+import copy
 import uuid
+from collections.abc import Hashable
+from typing import Any
 
 from adaptivetesting.math.estimators import BayesModal, NormalPrior
 from adaptivetesting.math.item_selection import maximum_information_criterion
 from adaptivetesting.models import ItemPool, TestItem
 
 from ..models.multidimensional import MultidimensionalModel
+from .grid import GRID_ESTIMATORS, GridPosterior, theta_grid
+from .item_bank import ArrayItemPool, vectorized_maximum_information_criterion
+from .memo import EstimationMemo
 
 
-def _make_test_item(a: float, b: float, c: float) -> TestItem:
-    """Create a TestItem in the shape expected by adaptivetesting."""
+def _make_test_item(a: float, b: float, c: float, item_id: str | None = None) -> TestItem:
+    """
+    Create a TestItem in the shape expected by adaptivetesting.
+
+    item_id is the DB Item.id. It is kept on TestItem.id, which survives the
+    deep copies the engine makes of its pools, so it is the item's stable
+    identity inside the model. Without one a random id is used.
+    """
     t = TestItem()
-    t.id = uuid.uuid4()     # ephemeral per-request id; we track mapping outside
+    t.id = item_id if item_id is not None else uuid.uuid4()
     t.a = a
     t.b = b
     t.c = c
@@ -32,10 +44,29 @@ def build_multidim_model(
     prior_sigma2: float,
     mastery_thresholds: dict[str, float],
     existing_thetas: dict[str, float] | None = None,
+    ability_estimator: str = "bayes_modal",
+    grid_points: int = 161,
+    estimation_memo: EstimationMemo | None = None,
+    memo_scope: Hashable = None,
 ) -> MultidimensionalModel:
     """
     Build a MultidimensionalModel with one UnidimensionalModel per concept.
+
+    Concepts whose pool is an ArrayItemPool select items with the vectorised
+    maximum information criterion; plain ItemPools use adaptivetesting's.
+
+    ability_estimator picks how theta is updated after each response:
+    "bayes_modal" re-runs BayesModal over the whole response pattern, while
+    "grid_map" / "grid_eap" keep an incremental GridPosterior with
+    grid_points points over the optimisation interval.
+
+    With "bayes_modal", estimation_memo (engine/memo.py) shares estimates
+    between identical response patterns within memo_scope (e.g. the item bank
+    version).
     """
+    if ability_estimator != "bayes_modal" and ability_estimator not in GRID_ESTIMATORS:
+        raise ValueError(f"Unknown ability_estimator: {ability_estimator}")
+    interval = (-4, 4)
     model = MultidimensionalModel(student_id=0, test_id=0)  # IDs not used by library
 
     if existing_thetas is None:
@@ -48,6 +79,15 @@ def build_multidim_model(
         # Use stored theta as the starting point if it exists, otherwise use global default
         concept_mu = existing_thetas.get(concept, prior_mu)
 
+        prior = NormalPrior(concept_mu, prior_sigma2)
+        posterior = None
+        if ability_estimator in GRID_ESTIMATORS:
+            posterior = GridPosterior(
+                prior,
+                theta_grid(interval, grid_points),
+                point=ability_estimator.removeprefix("grid_"),
+            )
+
         model.add_model(
             skill=concept,
             mastery_threshold=thr,
@@ -55,15 +95,55 @@ def build_multidim_model(
             initial_theta=concept_mu,
             ability_estimator=BayesModal,
             estimator_args={
-                "prior": NormalPrior(concept_mu, prior_sigma2),
-                "optimization_interval": (-4, 4),
+                "prior": prior,
+                "optimization_interval": interval,
             },
-            item_selector=maximum_information_criterion,
-            item_selector_args={}
+            item_selector=(
+                vectorized_maximum_information_criterion
+                if isinstance(pool, ArrayItemPool)
+                else maximum_information_criterion
+            ),
+            item_selector_args={},
+            posterior=posterior,
+            estimation_memo=estimation_memo if posterior is None else None,
+            memo_scope=memo_scope,
         )
     return model
 
 
+def index_test_items(pool: ItemPool) -> dict[Any, TestItem]:
+    """
+    Map TestItem.id -> TestItem for a pool.
+
+    An ArrayItemPool covers every item of its bank (available or not) and its
+    index is built once and shared by every copy; a plain ItemPool is indexed
+    over its current items.
+    """
+    if isinstance(pool, ArrayItemPool):
+        return pool.by_id()
+    return {t.id: t for t in pool.test_items}
+
+
+def fork_model(model: MultidimensionalModel) -> MultidimensionalModel:
+    """
+    Return an independent copy of model that shares its TestItems.
+
+    Pools, response patterns and posteriors are copied so the fork can record
+    responses without touching model; TestItems are kept by identity because
+    pools and session indexes match items with `is`.
+    """
+    memo: dict[int, Any] = {}
+    for uni in model.models.values():
+        test = uni.adaptive_test
+        memo.update((id(item), item) for item in test.answered_items)
+        # The memo scope is immutable; sharing it keeps fork keys identical
+        memo[id(uni.memo_scope)] = uni.memo_scope
+        # ArrayItemPool copies already share their items
+        if not isinstance(test.item_pool, ArrayItemPool):
+            memo.update((id(item), item) for item in test.item_pool.test_items)
+    return copy.deepcopy(model, memo)
+
+
 def choose_next_item(model: MultidimensionalModel):
     """
     Delegate to your MultidimensionalModel to choose next item.
@@ -0,0 +1,171 @@
+"""
+Compact, versioned serialisation of MultidimensionalModel state.
+
+A checkpoint records, per skill, everything the model accumulated while the
+attempt ran (prior, theta, SE, administered item IDs, response pattern and
+mastery flag) so a worker without a cached session can restore the model
+without re-running the estimator once per stored response.
+
+Items are referenced by DB Item.id; the caller supplies how to read that ID
+off a TestItem. A checkpoint whose version is unknown, or which references
+items that are no longer in the pools, is treated as missing.
+"""
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+from adaptivetesting.models import ItemPool, TestItem
+
+from ..models.multidimensional import MultidimensionalModel
+from .adapter import build_multidim_model
+from .memo import EstimationMemo
+
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class SkillState:
+    prior_mu: float
+    theta: float
+    se: float | None
+    item_ids: list[str]
+    responses: list[int]
+    mastered: bool
+
+
+@dataclass
+class EngineCheckpoint:
+    prior_sigma2: float
+    response_ids: list[str]
+    skills: dict[str, SkillState] = field(default_factory=dict)
+    version: int = CHECKPOINT_VERSION
+
+
+def capture_checkpoint(
+    model: MultidimensionalModel,
+    item_id_of: Callable[[TestItem], str],
+    response_ids: list[str],
+    prior_sigma2: float,
+) -> EngineCheckpoint:
+    """
+    Capture the state of every skill model.
+
+    Args:
+        model:        The live model.
+        item_id_of:   Returns the DB Item.id of a TestItem held by the model.
+        response_ids: IDs of the stored Responses applied to the model, oldest first.
+        prior_sigma2: Prior variance the model was built with.
+    """
+    checkpoint = EngineCheckpoint(prior_sigma2=prior_sigma2, response_ids=list(response_ids))
+    for skill, uni in model.models.items():
+        test = uni.adaptive_test
+        se = test.standard_error
+        checkpoint.skills[skill] = SkillState(
+            prior_mu=float(uni.initial_theta),
+            theta=float(test.ability_level),
+            se=None if se != se else float(se),  # NaN before the first response
+            item_ids=[item_id_of(t) for t in test.answered_items],
+            responses=[int(r) for r in test.response_pattern],
+            mastered=bool(uni.mastery_reached),
+        )
+    return checkpoint
+
+
+def dump_checkpoint(checkpoint: EngineCheckpoint) -> str:
+    """Serialise a checkpoint to a compact JSON string."""
+    payload: dict[str, Any] = {
+        "v": checkpoint.version,
+        "s2": checkpoint.prior_sigma2,
+        "r": checkpoint.response_ids,
+        "k": {
+            skill: [st.prior_mu, st.theta, st.se, st.item_ids, st.responses, int(st.mastered)]
+            for skill, st in checkpoint.skills.items()
+        },
+    }
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def load_checkpoint(raw: str | None) -> EngineCheckpoint | None:
+    """
+    Parse a serialised checkpoint.
+
+    Returns:
+        The checkpoint, or None when raw is empty, malformed or written by a
+        different CHECKPOINT_VERSION.
+    """
+    if not raw:
+        return None
+    try:
+        payload = json.loads(raw)
+        if payload.get("v") != CHECKPOINT_VERSION:
+            return None
+        skills = {
+            skill: SkillState(
+                prior_mu=float(mu),
+                theta=float(theta),
+                se=None if se is None else float(se),
+                item_ids=list(item_ids),
+                responses=[int(r) for r in responses],
+                mastered=bool(mastered),
+            )
+            for skill, (mu, theta, se, item_ids, responses, mastered) in payload["k"].items()
+        }
+        return EngineCheckpoint(
+            prior_sigma2=float(payload["s2"]),
+            response_ids=list(payload["r"]),
+            skills=skills,
+        )
+    except (TypeError, ValueError, KeyError, AttributeError):
+        return None
+
+
+def restore_model(
+    checkpoint: EngineCheckpoint,
+    pools_by_concept: dict[str, ItemPool],
+    mastery_thresholds: dict[str, float],
+    item_id_of: Callable[[TestItem], str],
+    ability_estimator: str = "bayes_modal",
+    grid_points: int = 161,
+    estimation_memo: EstimationMemo | None = None,
+    memo_scope: Hashable = None,
+) -> MultidimensionalModel | None:
+    """
+    Rebuild a model from a checkpoint without running the estimator.
+
+    ability_estimator, grid_points, estimation_memo and memo_scope are passed
+    to build_multidim_model; a grid posterior is rebuilt from the stored items
+    and responses.
+
+    Returns:
+        The restored model, or None if any administered item is no longer in
+        its skill's pool (the bank changed; the caller should replay instead).
+    """
+    model = build_multidim_model(
+        concepts=list(checkpoint.skills),
+        pools_by_concept=pools_by_concept,
+        prior_mu=0.0,
+        prior_sigma2=checkpoint.prior_sigma2,
+        mastery_thresholds=mastery_thresholds,
+        existing_thetas={skill: st.prior_mu for skill, st in checkpoint.skills.items()},
+        ability_estimator=ability_estimator,
+        grid_points=grid_points,
+        estimation_memo=estimation_memo,
+        memo_scope=memo_scope,
+    )
+    for skill, st in checkpoint.skills.items():
+        uni = model.models[skill]
+        by_id = {item_id_of(t): t for t in uni.adaptive_test.item_pool.test_items}
+        items = [by_id.get(item_id) for item_id in st.item_ids]
+        if any(t is None for t in items) or len(items) != len(st.responses):
+            return None
+        uni.restore_history(
+            items=items,
+            responses=st.responses,
+            theta=st.theta,
+            standard_error=float("nan") if st.se is None else st.se,
+            mastery_reached=st.mastered,
+        )
+    return model
@@ -0,0 +1,116 @@
+"""
+Incremental grid-posterior ability estimation (MAP / EAP).
+
+BayesModal re-optimises the posterior over the whole response pattern every
+time a response is recorded. GridPosterior instead keeps the log posterior
+of one skill on a fixed theta grid and folds each new response in with a
+single vectorised add of the item's log-likelihood row, so the cost of an
+update is O(grid size) regardless of how many items were answered.
+
+Log-likelihood rows for ArrayItemPool items are precomputed for the whole
+bank at once and shared by every model built from that bank.
+"""
+from __future__ import annotations
+
+import numpy as np
+from adaptivetesting.math.estimators import Prior
+from adaptivetesting.models import TestItem
+
+from .item_bank import ArrayItemPool
+
+GRID_ESTIMATORS = ("grid_map", "grid_eap")
+
+# Floor for probabilities/densities before taking logs
+_TINY = 1e-300
+
+
+def theta_grid(interval: tuple[float, float], points: int) -> np.ndarray:
+    """Evenly spaced theta grid over interval (inclusive)."""
+    return np.linspace(interval[0], interval[1], points)
+
+
+def likelihood_table(pool: ArrayItemPool, grid: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Log-likelihood of a correct and an incorrect response for every pool item
+    at every grid point, shape (n_items, len(grid)) each.
+
+    Computed once per (bank, grid) and cached on the pool's shared state.
+    """
+    key = (float(grid[0]), float(grid[-1]), len(grid))
+    tables = pool.tables
+    if key not in tables:
+        p = pool.probabilities(grid).T
+        tables[key] = (np.log(np.maximum(p, _TINY)), np.log(np.maximum(1.0 - p, _TINY)))
+    return tables[key]
+
+
+def _item_log_likelihood(item: TestItem, grid: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    z = np.clip(float(item.a) * (grid - float(item.b)), -500, 500)
+    p = float(item.c) + (float(item.d) - float(item.c)) / (1.0 + np.exp(-z))
+    return np.log(np.maximum(p, _TINY)), np.log(np.maximum(1.0 - p, _TINY))
+
+
+class GridPosterior:
+    """
+    Discretised posterior over a fixed theta grid for one skill.
+
+    Attributes:
+        grid (np.ndarray): Theta values the posterior is evaluated at.
+        log_posterior (np.ndarray): Unnormalised log posterior on the grid.
+        point (str): "map" for the posterior mode, "eap" for the posterior mean.
+    """
+
+    def __init__(self, prior: Prior, grid: np.ndarray, point: str = "map"):
+        if point not in ("map", "eap"):
+            raise ValueError(f"Unknown point estimate: {point}")
+        self.grid = grid
+        self.point = point
+        self.log_posterior = np.log(np.maximum(prior.pdf(grid), _TINY))
+
+    def observe(self, item: TestItem, response: int, pool=None) -> None:
+        """
+        Fold one response into the posterior without computing an estimate.
+
+        Args:
+            item:     The administered TestItem.
+            response: 1 for correct, 0 for incorrect.
+            pool:     The item's pool; rows of ArrayItemPool items come from the
+                      shared precomputed table.
+        """
+        position = pool.position_of(item) if isinstance(pool, ArrayItemPool) else None
+        if position is not None:
+            log_p, log_q = likelihood_table(pool, self.grid)
+            self.log_posterior += log_p[position] if response else log_q[position]
+        else:
+            log_p, log_q = _item_log_likelihood(item, self.grid)
+            self.log_posterior += log_p if response else log_q
+
+    def update(self, item: TestItem, response: int, pool=None) -> tuple[float, float]:
+        """Fold one response into the posterior and return (theta, SE)."""
+        self.observe(item, response, pool)
+        return self.estimate()
+
+    def estimate(self) -> tuple[float, float]:
+        """
+        Return the point estimate and the posterior standard deviation.
+
+        The MAP is refined with a parabola through the best grid point and its
+        neighbours so it is not limited to the grid spacing.
+        """
+        lp = self.log_posterior
+        weights = np.exp(lp - lp.max())
+        weights /= weights.sum()
+        eap = float(weights @ self.grid)
+        se = float(np.sqrt(weights @ (self.grid - eap) ** 2))
+        if self.point == "eap":
+            return eap, se
+
+        i = int(np.argmax(lp))
+        theta = float(self.grid[i])
+        if 0 < i < len(lp) - 1:
+            left, mid, right = lp[i - 1], lp[i], lp[i + 1]
+            curvature = left - 2 * mid + right
+            if curvature < 0:
+                step = float(self.grid[1] - self.grid[0])
+                theta += 0.5 * step * (left - right) / curvature
+        return theta, se
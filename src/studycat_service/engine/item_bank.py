@@ -0,0 +1,161 @@
+"""
+Array-backed item pool and vectorised maximum-information item selection.
+
+adaptivetesting's ItemPool is a plain list of TestItem objects: the engine
+deep-copies it for every model and maximum_information_criterion walks it in
+Python, one item at a time. For large banks ArrayItemPool keeps the 3PL
+parameters in contiguous NumPy arrays plus an "available" mask instead:
+- copying a pool only copies the mask (TestItems and parameters are shared),
+- deleting an item flips one mask entry,
+- Fisher information for every candidate is computed in one vectorised pass
+  and the next item is picked with argmax.
+
+ArrayItemPool is a drop-in ItemPool for TestAssembler; pair it with
+vectorized_maximum_information_criterion (build_multidim_model does this
+automatically).
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+from adaptivetesting.math.item_selection import maximum_information_criterion
+from adaptivetesting.models import ItemPool, ItemSelectionException, TestItem
+
+# Same clipping as adaptivetesting's item_information_function
+_P_EPS = 1e-10
+
+
+class _AvailableItems(Sequence):
+    """Read-only list view of the items still available in an ArrayItemPool."""
+
+    def __init__(self, pool: ArrayItemPool):
+        self.pool = pool
+
+    def __len__(self) -> int:
+        return self.pool.n_available
+
+    def __getitem__(self, index):
+        positions = np.flatnonzero(self.pool.available)[index]
+        if isinstance(positions, np.ndarray):
+            return [self.pool.items[i] for i in positions]
+        return self.pool.items[positions]
+
+    def __iter__(self) -> Iterator[TestItem]:
+        items = self.pool.items
+        return (items[i] for i in np.flatnonzero(self.pool.available))
+
+    def __contains__(self, item) -> bool:
+        position = self.pool.position_of(item)
+        return position is not None and bool(self.pool.available[position])
+
+
+class ArrayItemPool(ItemPool):
+    """
+    ItemPool backed by a/b/c/d parameter arrays and an availability mask.
+
+    Attributes:
+        items (list[TestItem]): Every item of the pool, available or not. Shared
+            between copies; never mutated.
+        a, b, c, d (np.ndarray): Item parameters, aligned with items. Shared.
+        available (np.ndarray): Boolean mask of items not yet administered.
+    """
+
+    def __init__(self, test_items: list[TestItem]):
+        # test_items is exposed as a view over the mask, so ItemPool.__init__
+        # (which assigns it) is not called.
+        self.simulated_responses = None
+        self.items = list(test_items)
+        self.a = np.array([float(t.a) for t in self.items], dtype=float)
+        self.b = np.array([float(t.b) for t in self.items], dtype=float)
+        self.c = np.array([float(t.c) for t in self.items], dtype=float)
+        self.d = np.array([float(t.d) for t in self.items], dtype=float)
+        # Items are matched by identity, like ItemPool.delete_item's list.index
+        self._positions = {id(t): i for i, t in enumerate(self.items)}
+        self.available = np.ones(len(self.items), dtype=bool)
+        self.n_available = len(self.items)
+        # Per-bank derived tables (e.g. grid likelihoods), shared between copies
+        self.tables: dict = {}
+
+    @property
+    def test_items(self) -> _AvailableItems:
+        """The available items, in bank order."""
+        return _AvailableItems(self)
+
+    def position_of(self, item: TestItem) -> int | None:
+        """Index of item in the shared arrays, or None if it is not in the bank."""
+        return self._positions.get(id(item))
+
+    def by_id(self) -> dict:
+        """Map TestItem.id -> TestItem over every item of the bank, built once and shared."""
+        index = self.tables.get("by_id")
+        if index is None:
+            index = self.tables["by_id"] = {t.id: t for t in self.items}
+        return index
+
+    def copy(self) -> ArrayItemPool:
+        """Return a pool sharing items and parameters with its own availability mask."""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.available = self.available.copy()
+        return clone
+
+    def __deepcopy__(self, memo) -> ArrayItemPool:
+        # TestAssembler deep-copies its pool; only the mask is per-model state.
+        return self.copy()
+
+    def delete_item(self, item: TestItem) -> None:
+        """Mark item as administered. Raises ValueError if it is not available."""
+        position = self.position_of(item)
+        if position is None or not self.available[position]:
+            raise ValueError(f"{item!r} is not in the item pool")
+        self.available[position] = False
+        self.n_available -= 1
+
+    def exclude(self, positions: np.ndarray) -> None:
+        """Mark every item at the given positions as unavailable."""
+        self.available[positions] = False
+        self.n_available = int(self.available.sum())
+
+    def probabilities(self, theta: float | np.ndarray) -> np.ndarray:
+        """
+        3PL/4PL probability of a correct response for every item.
+
+        Returns:
+            Array of shape (n_items,) for scalar theta, or (len(theta), n_items)
+            for an array of abilities.
+        """
+        theta = np.asarray(theta, dtype=float)[..., np.newaxis]
+        z = np.clip(self.a * (theta - self.b), -500, 500)
+        return self.c + (self.d - self.c) / (1.0 + np.exp(-z))
+
+    def information(self, theta: float) -> np.ndarray:
+        """Fisher information of every item (available or not) at theta."""
+        p = self.probabilities(theta)
+        dp = self.a * (p - self.c) * (self.d - p) / (self.d - self.c)
+        p = np.clip(p, _P_EPS, 1 - _P_EPS)
+        return dp * dp / (p * (1 - p))
+
+    def most_informative(self, theta: float) -> TestItem:
+        """
+        Return the available item with maximum Fisher information at theta.
+
+        Raises:
+            ItemSelectionException: If no item is available.
+        """
+        if self.n_available == 0:
+            raise ItemSelectionException("No appropriate item could be selected.")
+        information = np.where(self.available, self.information(theta), -np.inf)
+        return self.items[int(np.argmax(information))]
+
+
+def vectorized_maximum_information_criterion(items, ability: float) -> TestItem:
+    """
+    Maximum information criterion over an ArrayItemPool in one vectorised pass.
+
+    Matches adaptivetesting's maximum_information_criterion signature; any
+    other item list is delegated to it unchanged.
+    """
+    if isinstance(items, _AvailableItems):
+        return items.pool.most_informative(float(ability))
+    return maximum_information_criterion(items, ability)
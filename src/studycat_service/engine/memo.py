@@ -0,0 +1,90 @@
+"""
+Memo of ability estimates keyed by response pattern.
+
+With the "bayes_modal" estimator every recorded response re-runs BayesModal
+over the attempt's whole response pattern. Students of a quiz share the same
+prior and, early in an attempt, the same (item, response) prefixes, so the
+same estimation is computed over and over. EstimationMemo keeps the
+resulting (theta, SE) in a bounded LRU keyed by a 16-byte digest of:
+- a scope (the item bank's quiz and version, see service/core.py),
+- the estimator, its prior and optimisation interval,
+- the ordered item IDs and 3PL/4PL parameters and the responses.
+
+Item parameters are part of the key, so an item recalibrated without a new
+bank version never hits a stale entry; entries of old scopes simply age out
+of the LRU.
+
+Estimation runs on executor threads (service/executor.py), so lookups are
+guarded by a lock. Models deep-copied by fork_model share their memo.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections.abc import Callable, Hashable, Sequence
+
+from adaptivetesting.models import TestItem
+
+from ..cache import TTLCache
+
+
+def pattern_key(scope: Hashable, items: Sequence[TestItem], responses: Sequence[int]) -> bytes:
+    """Canonical digest of (scope, ordered item IDs/parameters, responses)."""
+    digest = hashlib.blake2b(repr(scope).encode(), digest_size=16)
+    for item, response in zip(items, responses, strict=True):
+        digest.update(
+            f"|{item.id}:{item.a!r},{item.b!r},{item.c!r},{item.d!r}:{response}".encode()
+        )
+    return digest.digest()
+
+
+class EstimationMemo:
+    """
+    Bounded LRU of (theta, SE) by response pattern.
+
+    Attributes:
+        hits (int):   Lookups answered from the memo.
+        misses (int): Lookups that ran the estimator.
+    """
+
+    def __init__(self, max_entries: int):
+        self._cache = TTLCache(max_entries=max_entries)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __deepcopy__(self, memo) -> EstimationMemo:
+        # Forked models share the memo
+        return self
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def estimate(
+        self,
+        scope: Hashable,
+        items: Sequence[TestItem],
+        responses: Sequence[int],
+        compute: Callable[[], tuple[float, float]],
+    ) -> tuple[float, float]:
+        """Return the memoised (theta, SE) for the pattern, running compute() on a miss."""
+        key = pattern_key(scope, items, responses)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        result = compute()
+        with self._lock:
+            self._cache.put(key, result)
+        return result
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._cache.clear()
@@ -2,8 +2,12 @@
 App entrypoint.
 
 LIFECYCLE:
-- Connect Prisma on startup and disconnect on shutdown via lifespan.
+- Open the configured repository backend on startup and close it on shutdown
+  via lifespan (db/backend.py; Prisma is connected for the default backend).
+- Stop the engine executor's worker threads on shutdown.
 - Include v1 routes under /v1
+- Sample per-request stage timings into Server-Timing (middleware.py)
+- Record request counts, latencies and in-flight requests for /v1/metrics
 """
 from __future__ import annotations
 
@@ -12,16 +16,18 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from . import routers
-from .db.client import db
+from .db.backend import open_repository
+from .middleware import MetricsMiddleware, ServerTimingMiddleware
+from .service.executor import engine
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await db.connect()
     try:
-        yield
+        async with open_repository():
+            yield
     finally:
-        await db.disconnect()
+        engine.shutdown()
 
 
 app = FastAPI(
@@ -31,4 +37,6 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(routers.router, prefix="/v1")
@@ -0,0 +1,295 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A minimal Counter / Gauge / Histogram implementation (no client library, no
+network dependency) plus the service's metric definitions. GET /v1/metrics
+(routers.py) renders the registry:
+
+- studycat_http_requests_total / _request_duration_seconds: per route, method
+  and status, recorded by MetricsMiddleware (middleware.py);
+- studycat_http_requests_in_flight, studycat_attempts_in_flight,
+  studycat_engine_pending: requests, attempts (service/flights.py) and engine
+  computations (service/executor.py) currently in progress;
+- studycat_db_calls_total / _errors_total / _duration_seconds: per repository
+  function, recorded by the repository wrapper of db/backend.py;
+- studycat_stage_duration_seconds: every pipeline stage of service/timing.py,
+  e.g. step.estimate (estimation), step.select (selection), replay.responses;
+- studycat_replay_responses: responses replayed per session rebuild;
+- studycat_estimations_total: theta updates by path (step, replay,
+  speculation, tree) and estimator;
+- studycat_selection_candidates: items available at each item selection;
+- studycat_cache_hits_total / _misses_total / _hit_ratio / _entries: per
+  in-process cache, read at scrape time.
+
+Metrics are updated from the event loop and from executor threads, so every
+metric guards its values with a lock.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections.abc import Callable, Iterable, Iterator
+
+# Latency buckets in seconds, from sub-millisecond engine stages to slow requests
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base of a labelled metric family; children are kept per label values."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """The child for the given label values, created on first use."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, labels: dict[str, str], child) -> Iterator[tuple[str, dict, float]]:
+        raise NotImplementedError
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        """(sample name, labels, value) of every child."""
+        for key, child in sorted(self._children.items()):
+            yield from self._samples(dict(zip(self.labelnames, key, strict=True)), child)
+
+    def clear(self) -> None:
+        """Drop every child."""
+        with self._lock:
+            self._children.clear()
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonic count, exposed as <name>."""
+
+    type = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def _samples(self, labels, child):
+        yield self.name, labels, child.value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _Buckets:
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = next((i for i, b in enumerate(self.bounds) if value <= b), len(self.bounds))
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Cumulative buckets, _sum and _count, as Prometheus histograms."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def _samples(self, labels, child):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), child.counts, strict=True):
+            cumulative += count
+            yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+        yield f"{self.name}_sum", labels, child.sum
+        yield f"{self.name}_count", labels, cumulative
+
+    def observe(self, value: float) -> None:
+        """Observe on the unlabelled histogram."""
+        self.labels().observe(value)
+
+
+class Registry:
+    """Registered metrics plus collectors building extra metrics at scrape time."""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], Iterable[_Metric]]] = []
+
+    def register[M: _Metric](self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], Iterable[_Metric]]) -> Callable[[], Iterable[_Metric]]:
+        """Register fn, called on every render() for freshly built metrics."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        """All metrics in the text exposition format (version 0.0.4)."""
+        metrics = list(self._metrics)
+        for collect in self._collectors:
+            metrics.extend(collect())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(
+                f"{name}{_format_labels(labels)} {_format_value(value)}"
+                for name, labels, value in metric.samples()
+            )
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset every registered metric."""
+        for metric in self._metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "studycat_http_requests_total", "HTTP requests by route, method and status.",
+    ("route", "method", "status"),
+))
+http_duration = registry.register(Histogram(
+    "studycat_http_request_duration_seconds", "HTTP request latency by route and method.",
+    ("route", "method"),
+))
+http_in_flight = registry.register(Gauge(
+    "studycat_http_requests_in_flight", "HTTP requests currently being served.",
+))
+db_calls = registry.register(Counter(
+    "studycat_db_calls_total", "Repository calls by function.", ("function",),
+))
+db_errors = registry.register(Counter(
+    "studycat_db_call_errors_total", "Repository calls that raised, by function.",
+    ("function",),
+))
+db_duration = registry.register(Histogram(
+    "studycat_db_call_duration_seconds", "Repository call latency by function.",
+    ("function",),
+))
+stage_duration = registry.register(Histogram(
+    "studycat_stage_duration_seconds", "Attempt pipeline stage durations (service/timing.py).",
+    ("stage",),
+))
+replay_responses = registry.register(Histogram(
+    "studycat_replay_responses", "Responses replayed per attempt session rebuild.",
+    buckets=(0, 1, 2, 5, 10, 20, 30, 50, 75, 100, 200),
+))
+estimations = registry.register(Counter(
+    "studycat_estimations_total", "Theta updates by path and ability estimator.",
+    ("path", "estimator"),
+))
+selection_candidates = registry.register(Histogram(
+    "studycat_selection_candidates", "Items available to each item selection.",
+    buckets=(0, 1, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000),
+))
+
+
+@registry.collector
+def _service_state() -> list[_Metric]:
+    """Cache statistics and in-flight work, read from the service singletons."""
+    from .service.bank import banks, estimates
+    from .service.exclusions import correct_items
+    from .service.executor import engine
+    from .service.flights import flights
+    from .service.results import results
+    from .service.session import sessions
+
+    hits = Counter("studycat_cache_hits_total", "Cache lookups that hit, by cache.", ("cache",))
+    misses = Counter(
+        "studycat_cache_misses_total", "Cache lookups that missed, by cache.", ("cache",)
+    )
+    ratio = Gauge("studycat_cache_hit_ratio", "Hits over lookups, by cache.", ("cache",))
+    entries = Gauge("studycat_cache_entries", "Entries held, by cache.", ("cache",))
+    for name, cache in [
+        ("bank", banks), ("session", sessions), ("correct_items", correct_items),
+        ("result", results), ("estimation_memo", estimates),
+    ]:
+        hits.labels(name).set(cache.hits)
+        misses.labels(name).set(cache.misses)
+        lookups = cache.hits + cache.misses
+        ratio.labels(name).set(cache.hits / lookups if lookups else 0.0)
+        entries.labels(name).set(len(cache))
+
+    attempts = Gauge("studycat_attempts_in_flight", "Attempts with a request in progress.")
+    attempts.set(len(flights))
+    pending = Gauge("studycat_engine_pending", "Engine computations queued or running.")
+    pending.set(engine.pending)
+    return [hits, misses, ratio, entries, attempts, pending]
@@ -0,0 +1,110 @@
+"""
+ASGI middleware exposing per-request stage timings and request metrics.
+
+MetricsMiddleware records every HTTP request in metrics.py: the in-flight
+gauge while it runs, then its count and latency labelled by the matched
+route's template (e.g. /attempts/{attempt_id}/init, "unmatched" when no route
+matched), method and status. Labels never contain request data, so their
+number is bounded by the number of routes.
+
+ServerTimingMiddleware:
+
+A fraction (settings.timing_sample_rate) of HTTP requests is sampled. For a
+sampled request a RequestTiming (service/timing.py) is made current while the
+app runs, so every stage the request goes through (attempt load, bank load,
+repeat-correct filter, pool/model build, replay, estimation, selection,
+persistence, payload build, and the waits for engine workers) is recorded on
+it. The stages are then
+- returned to the client in a Server-Timing response header, with the total
+  request time first, and
+- logged as one structured record (logger "studycat_service.timing", JSON
+  message, also attached to the log record as `timing`).
+
+Unsampled requests pass straight through; with the default rate of 0 the only
+cost is one comparison per request.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+
+from .config import settings
+from .metrics import http_duration, http_in_flight, http_requests
+from .service.timing import RequestTiming, request_timing
+
+logger = logging.getLogger("studycat_service.timing")
+
+
+class MetricsMiddleware:
+    """Count, time and gauge HTTP requests (see module docstring)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec()
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_requests.labels(route, scope["method"], status).inc()
+            http_duration.labels(route, scope["method"]).observe(time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """Sample requests and report their stage timings (see module docstring)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        rate = settings.timing_sample_rate
+        if scope["type"] != "http" or rate <= 0 or (rate < 1 and random.random() >= rate):
+            await self.app(scope, receive, send)
+            return
+
+        record = RequestTiming()
+        token = request_timing.set(record)
+        started = time.perf_counter()
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = record.server_timing(total=time.perf_counter() - started)
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"server-timing", header.encode())],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timing.reset(token)
+            timing = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "total": time.perf_counter() - started,
+                "stages": record.as_dict(),
+            }
+            logger.info(json.dumps(timing), extra={"timing": timing})
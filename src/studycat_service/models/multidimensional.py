@@ -34,6 +34,9 @@ class MultidimensionalModel:
         estimator_args: dict[str, Any] | None = None,
         item_selector: ItemSelectionStrategy = maximum_information_criterion,
         item_selector_args: dict[str, Any] | None = None,
+        posterior: Any | None = None,
+        estimation_memo: Any | None = None,
+        memo_scope: Any = None,
     ) -> None:
         """
         Adds a new unidimensional model tracking the specified skill.
@@ -53,6 +56,11 @@ class MultidimensionalModel:
                 maximum_information_criterion
             item_selector_args (dict[str, Any] | None):
                 Arguments to provide to the item selector class, defaults to None
+            posterior (GridPosterior | None):
+                Incremental grid posterior used instead of ability_estimator, defaults to None
+            estimation_memo (EstimationMemo | None):
+                Memo of estimates by response pattern, defaults to None
+            memo_scope (Any): Scope of the memo entries, defaults to None
         """
 
         model = UnidimensionalModel(
@@ -64,6 +72,9 @@ class MultidimensionalModel:
             estimator_args=estimator_args,
             item_selector=item_selector,
             item_selector_args=item_selector_args,
+            posterior=posterior,
+            estimation_memo=estimation_memo,
+            memo_scope=memo_scope,
         )
 
         self.models[skill] = model
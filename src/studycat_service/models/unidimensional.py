@@ -37,6 +37,9 @@ class UnidimensionalModel:
         estimator_args: dict[str, Any] | None = None,
         item_selector: ItemSelectionStrategy = maximum_information_criterion,
         item_selector_args: dict[str, Any] | None = None,
+        posterior: Any | None = None,
+        estimation_memo: Any | None = None,
+        memo_scope: Any = None,
         debug: bool = False
     ):
         """
@@ -57,11 +60,22 @@ class UnidimensionalModel:
                 maximum_information_criterion
             item_selector_args (dict[str, Any] | None):
                 Arguments to provide to the item selector class, defaults to None
+            posterior (GridPosterior | None):
+                Incremental grid posterior (engine/grid.py). When given, it replaces
+                ability_estimator for updating theta after each response.
+            estimation_memo (EstimationMemo | None):
+                Memo of (theta, SE) by response pattern (engine/memo.py). When given,
+                ability_estimator only runs for patterns not seen before.
+            memo_scope (Any):
+                Scope of the memo entries, e.g. the item bank version. The estimator,
+                prior and optimisation interval are added to it.
             debug (bool):
                 Whether to run the TestAssembler class in debug mode. Defaults to false
         """
         self.skill = skill
         self.mastery_threshold = mastery_threshold
+        self.initial_theta = initial_theta
+        self.posterior = posterior
 
         # default args if not provided
         if estimator_args is None:
@@ -72,6 +86,16 @@ class UnidimensionalModel:
         if item_selector_args is None:
             item_selector_args = {}
 
+        self.estimation_memo = estimation_memo
+        prior = estimator_args.get("prior")
+        self.memo_scope = (
+            memo_scope,
+            ability_estimator.__name__,
+            getattr(prior, "mean", None),
+            getattr(prior, "sd", None),
+            estimator_args.get("optimization_interval"),
+        )
+
         # Each skill has its own TestAssembler instance
         self.adaptive_test = TestAssembler(
             item_pool=item_pool,
@@ -114,8 +138,20 @@ class UnidimensionalModel:
         self.adaptive_test.answered_items.append(item)
         self.adaptive_test.item_pool.delete_item(item)
 
-        # update theta using TestAssembler's estimation method
-        est, se = self.adaptive_test.estimate_ability_level()
+        if self.posterior is not None:
+            # one vectorised posterior update instead of a full re-estimation
+            est, se = self.posterior.update(item, response, self.adaptive_test.item_pool)
+        elif self.estimation_memo is not None:
+            # identical response patterns share one estimation
+            est, se = self.estimation_memo.estimate(
+                self.memo_scope,
+                self.adaptive_test.answered_items,
+                self.adaptive_test.response_pattern,
+                self.adaptive_test.estimate_ability_level,
+            )
+        else:
+            # update theta using TestAssembler's estimation method
+            est, se = self.adaptive_test.estimate_ability_level()
         self.adaptive_test.ability_level = est
         self.adaptive_test.standard_error = se
 
@@ -123,3 +159,27 @@ class UnidimensionalModel:
 
         if self.get_theta() > self.mastery_threshold:
             self.mastery_reached = True
+
+    def restore_history(
+        self,
+        items: list[TestItem],
+        responses: list[int],
+        theta: float,
+        standard_error: float,
+        mastery_reached: bool,
+    ) -> None:
+        """
+        Restore previously recorded responses without re-estimating theta.
+
+        Removes the items from the pool and sets the estimate, standard error
+        and mastery flag to the values saved alongside them.
+        """
+        for response, item in zip(responses, items, strict=True):
+            self.adaptive_test.response_pattern.append(response)
+            self.adaptive_test.answered_items.append(item)
+            self.adaptive_test.item_pool.delete_item(item)
+            if self.posterior is not None:
+                self.posterior.observe(item, response, self.adaptive_test.item_pool)
+        self.adaptive_test.ability_level = theta
+        self.adaptive_test.standard_error = standard_error
+        self.mastery_reached = mastery_reached
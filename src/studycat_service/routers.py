@@ -3,15 +3,20 @@ FastAPI routes for the engine.
 
 We expose:
 - GET  /v1/health                       (liveness)
+- GET  /v1/metrics                      (Prometheus text exposition, metrics.py)
 - POST /v1/attempts/{attempt_id}/init   (start an attempt and get the first item)
 - POST /v1/attempts/{attempt_id}/step   (apply the latest response and get the next item)
 
+Successful /init and /step bodies are cached (service/results.py) and replayed
+verbatim to retries of the same request.
+
 Authentication is not implemented. Add middleware if required.
 """
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
+from .metrics import registry
 from .schemas import (
     AttemptInitRequest,
     AttemptInitResponse,
@@ -20,6 +25,9 @@ from .schemas import (
     ItemPayload,
 )
 from .service.core import PublicItem, init_attempt, step_attempt
+from .service.executor import EngineBusyError
+from .service.results import results
+from .service.timing import timings
 
 router = APIRouter(tags=["engine"])
 
@@ -35,6 +43,16 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+@router.get("/metrics", response_class=Response)
+def metrics() -> Response:
+    """
+    Service metrics in the Prometheus text exposition format (version 0.0.4).
+
+    Counters and histograms are per process: each worker reports its own.
+    """
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 def _map_public_item(p: PublicItem | None) -> ItemPayload | None:
     """
     Convert a PublicItem dataclass returned by the service layer into the
@@ -62,8 +80,12 @@ def _map_public_item(p: PublicItem | None) -> ItemPayload | None:
     )
 
 
+def _json(body: str) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
 @router.post("/attempts/{attempt_id}/init", response_model=AttemptInitResponse)
-async def attempt_init(attempt_id: str, payload: AttemptInitRequest) -> AttemptInitResponse:
+async def attempt_init(attempt_id: str, payload: AttemptInitRequest) -> Response:
     """
     Initialise an attempt and return the first item to present to the student.
 
@@ -85,10 +107,19 @@ async def attempt_init(attempt_id: str, payload: AttemptInitRequest) -> AttemptI
                          available for this quiz.
           - next_action: Either "CONTINUE" or "FINISH".
 
+    A repeat of the last successful /init for the attempt (same payload, no
+    step since) returns the cached body without touching the engine or DB.
+
     Raises:
         HTTPException(400): If the attempt_id is not found or any other
                             ValueError is raised by the service layer.
+        HTTPException(503): If the engine executor's queue is full; retry later.
     """
+    request = payload.model_dump_json()
+    cached = results.get_init(attempt_id, request)
+    if cached is not None:
+        return _json(cached)
+
     try:
         theta, next_item = await init_attempt(
             attempt_id=attempt_id,
@@ -98,21 +129,26 @@ async def attempt_init(attempt_id: str, payload: AttemptInitRequest) -> AttemptI
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
+    except EngineBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"}) from e
+
+    with timings.measure("payload.build"):
+        response = AttemptInitResponse(
+            theta=theta,
+            next_item=_map_public_item(next_item),
+            next_action="CONTINUE"
+        )
 
-    response = AttemptInitResponse(
-        theta=theta,
-        next_item=_map_public_item(next_item),
-        next_action="CONTINUE"
-    )
-
-    if next_item is None:
-        response.next_action = "FINISH"
+        if next_item is None:
+            response.next_action = "FINISH"
 
-    return response
+        body = response.model_dump_json()
+    results.put_init(attempt_id, request, body)
+    return _json(body)
 
 
 @router.post("/attempts/{attempt_id}/step", response_model=AttemptStepResponse)
-async def attempt_step(attempt_id: str, payload: AttemptStepRequest) -> AttemptStepResponse:
+async def attempt_step(attempt_id: str, payload: AttemptStepRequest) -> Response:
     """
     Process the student's latest response and return the next item or a
     completion signal.
@@ -151,11 +187,21 @@ async def attempt_step(attempt_id: str, payload: AttemptStepRequest) -> AttemptS
           - next_item:   The next question to show, or null when next_action
                          is "FINISH" or "MASTERED".
 
+    A retry of an already answered step (same response_id and payload)
+    returns the cached body without touching the engine or DB, so the
+    response is applied to theta only once.
+
     Raises:
         HTTPException(400): If the attempt_id is not found, the item_id is
                             unknown, or any other ValueError is raised by the
                             service layer.
+        HTTPException(503): If the engine executor's queue is full; retry later.
     """
+    request = payload.model_dump_json()
+    cached = results.get_step(attempt_id, payload.response_id, request)
+    if cached is not None:
+        return _json(cached)
+
     try:
         theta, mastery, next_item, is_finished, all_mastered = await step_attempt(
             attempt_id=attempt_id,
@@ -165,6 +211,8 @@ async def attempt_step(attempt_id: str, payload: AttemptStepRequest) -> AttemptS
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
+    except EngineBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"}) from e
 
     if all_mastered:
         next_action = "MASTERED"
@@ -173,9 +221,12 @@ async def attempt_step(attempt_id: str, payload: AttemptStepRequest) -> AttemptS
     else:
         next_action = "CONTINUE"
 
-    return AttemptStepResponse(
-        theta=theta,
-        mastery=mastery,
-        next_action=next_action,
-        next_item=_map_public_item(next_item)
-    )
+    with timings.measure("payload.build"):
+        body = AttemptStepResponse(
+            theta=theta,
+            mastery=mastery,
+            next_action=next_action,
+            next_item=_map_public_item(next_item)
+        ).model_dump_json()
+    results.put_step(attempt_id, payload.response_id, request, body)
+    return _json(body)
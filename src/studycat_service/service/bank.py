@@ -0,0 +1,199 @@
+"""
+Shared per-quiz cache of eligible items and their prebuilt engine items.
+
+Resolving a quiz's eligible items costs a quiz lookup plus one or two
+item queries, and turning them into TestItems is pure Python work that is
+identical for every student taking the quiz. A QuizBank holds the result
+once per quiz:
+- entries expire ttl_seconds after they were loaded,
+- an entry is reloaded when the caller presents a different version
+  (Quiz.updatedAt) than the one it was loaded with,
+- concurrent misses for the same quiz/version share a single load.
+
+TestItems held by a bank are shared between requests and must not be
+mutated; the engine deep-copies pools, so building ItemPools from them is safe.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from adaptivetesting.models import ItemPool, TestItem
+
+from ..cache import TTLCache
+from ..config import settings
+from ..engine.item_bank import ArrayItemPool
+from ..engine.memo import EstimationMemo
+
+
+@dataclass
+class QuizBank:
+    """
+    Eligible items of a quiz with their TestItems prebuilt.
+
+    Attributes:
+        quiz_id:          Quiz the bank was resolved for.
+        version:          Version token the bank was loaded with (Quiz.updatedAt).
+        items:            Eligible DB Item records.
+        concepts:         Sorted concepts that have at least one usable item.
+        test_items:       Per-concept TestItems, in item order.
+        testitem_to_itemid: Map TestItem -> DB Item.id.
+        testitem_to_skill:  Map TestItem -> concept/module.
+        array_pools:      Per-concept ArrayItemPools, built on first use when
+                          settings.item_pool_backend is "array".
+        items_by_id:      Map DB Item.id -> DB Item record.
+        positions:        Map DB Item.id -> index in items.
+        content:          Public payloads of items already served, keyed by
+                          Item.id. Bank items carry no options, so an item's
+                          content is fetched the first time it is selected.
+        openings:         Shared openings (first item, or decision tree of the
+                          first answers; service/tree.py) built for this
+                          bank, keyed by module scope, prior and model settings.
+    """
+    quiz_id: str
+    version: Any
+    items: list[Any]
+    concepts: list[str]
+    test_items: dict[str, list[TestItem]]
+    testitem_to_itemid: dict[TestItem, str]
+    testitem_to_skill: dict[TestItem, str]
+    loaded_at: float = field(default_factory=time.monotonic)
+    array_pools: dict[str, ArrayItemPool] | None = None
+    items_by_id: dict[str, Any] = field(init=False)
+    positions: dict[str, int] = field(init=False)
+    content: dict[str, Any] = field(default_factory=dict)
+    openings: dict[Hashable, asyncio.Future] = field(default_factory=dict, repr=False)
+    _concept_positions: dict[str, np.ndarray] | None = field(default=None, repr=False)
+
+    def __post_init__(self):
+        self.items_by_id = {it.id: it for it in self.items}
+        self.positions = {it.id: i for i, it in enumerate(self.items)}
+
+    def concept_positions(self) -> dict[str, np.ndarray]:
+        """Per concept, the index in items of each of the concept's TestItems."""
+        if self._concept_positions is None:
+            self._concept_positions = {
+                c: np.array([self.positions[ti.id] for ti in lst], dtype=np.intp)
+                for c, lst in self.test_items.items()
+            }
+        return self._concept_positions
+
+    def build_pools(
+        self, excluded: np.ndarray | None = None
+    ) -> tuple[list[str], dict[str, ItemPool], dict[TestItem, str], dict[TestItem, str]]:
+        """
+        Build fresh per-concept ItemPools over the bank's items.
+
+        Returns the same shapes as service/core.py:_build_item_pools, reusing
+        the prebuilt TestItems instead of creating new ones. With the "array"
+        pool backend each pool is a mask copy of a shared ArrayItemPool.
+        Concepts left without items are dropped.
+
+        Args:
+            excluded: Boolean mask over items of the items to leave out (e.g.
+                      the ones the student already answered correctly), or None.
+        """
+        if settings.item_pool_backend == "array":
+            return self._build_array_pools(excluded)
+
+        if excluded is None:
+            pools = {c: ItemPool(list(lst)) for c, lst in self.test_items.items()}
+            return list(self.concepts), pools, self.testitem_to_itemid, self.testitem_to_skill
+
+        positions = self.concept_positions()
+        by_concept: dict[str, list[TestItem]] = {}
+        for concept, lst in self.test_items.items():
+            dropped = excluded[positions[concept]]
+            kept = [ti for ti, drop in zip(lst, dropped, strict=True) if not drop]
+            if kept:
+                by_concept[concept] = kept
+        pools = {c: ItemPool(lst) for c, lst in by_concept.items()}
+        return sorted(by_concept), pools, self.testitem_to_itemid, self.testitem_to_skill
+
+    def _build_array_pools(
+        self, excluded: np.ndarray | None
+    ) -> tuple[list[str], dict[str, ItemPool], dict[TestItem, str], dict[TestItem, str]]:
+        if self.array_pools is None:
+            self.array_pools = {c: ArrayItemPool(lst) for c, lst in self.test_items.items()}
+
+        pools = {c: pool.copy() for c, pool in self.array_pools.items()}
+        if excluded is not None:
+            positions = self.concept_positions()
+            for concept, pool in list(pools.items()):
+                pool.exclude(np.flatnonzero(excluded[positions[concept]]))
+                if pool.n_available == 0:
+                    del pools[concept]
+        return sorted(pools), pools, self.testitem_to_itemid, self.testitem_to_skill
+
+
+class BankCache:
+    """TTL + version-checked cache of QuizBank objects with single-flight loading."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds, sliding=False)
+        self._loading: dict[tuple[str, Hashable], asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    async def get(
+        self,
+        quiz_id: str,
+        version: Hashable,
+        loader: Callable[[str, Hashable], Awaitable[QuizBank]],
+    ) -> QuizBank:
+        """
+        Return the bank for quiz_id, loading it if missing, expired or outdated.
+
+        Args:
+            quiz_id: Quiz to resolve.
+            version: Current version token of the quiz; None disables the
+                     version check and relies on the TTL only.
+            loader:  Coroutine function (quiz_id, version) -> QuizBank.
+        """
+        bank = self._cache.get(quiz_id)
+        if bank is not None and bank.version == version:
+            return bank
+
+        key = (quiz_id, version)
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(quiz_id, version, loader))
+            self._loading[key] = task
+            task.add_done_callback(lambda _task: self._loading.pop(key, None))
+        # shield: a cancelled waiter must not cancel the load other waiters share
+        return await asyncio.shield(task)
+
+    def invalidate(self, quiz_id: str) -> None:
+        """Drop the cached bank for quiz_id (e.g. after an item bank edit)."""
+        self._cache.discard(quiz_id)
+
+    def clear(self) -> None:
+        """Drop every cached bank."""
+        self._cache.clear()
+
+    async def _load(self, quiz_id, version, loader) -> QuizBank:
+        bank = await loader(quiz_id, version)
+        self._cache.put(quiz_id, bank)
+        return bank
+
+
+banks = BankCache(
+    max_entries=settings.bank_cache_max_quizzes,
+    ttl_seconds=settings.bank_cache_ttl_seconds,
+)
+
+# Ability estimates by response pattern, scoped per bank version (engine/memo.py)
+estimates = EstimationMemo(max_entries=settings.estimation_memo_max_entries)
@@ -3,8 +3,13 @@ Core orchestration that binds DB state <-> engine adapter.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import logging
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Any
 
+import numpy as np
 from adaptivetesting.models import ItemPool, TestItem
 
 from ..config import settings
@@ -14,8 +19,26 @@ from ..engine.adapter import (
     build_multidim_model,
     choose_next_item,
     determine_all_mastered,
+    fork_model,
 )
+from ..engine.checkpoint import (
+    EngineCheckpoint,
+    capture_checkpoint,
+    dump_checkpoint,
+    load_checkpoint,
+    restore_model,
+)
+from ..metrics import estimations, replay_responses, selection_candidates
 from ..models.multidimensional import MultidimensionalModel
+from .bank import QuizBank, banks, estimates
+from .exclusions import CorrectItems, correct_items
+from .executor import EngineBusyError, engine
+from .flights import flights
+from .session import AttemptSession, Branch, Speculation, sessions
+from .timing import timings
+from .tree import TreeNode, build_tree
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -60,7 +83,7 @@ def _build_item_pools(
         if it.irtA is None or it.irtB is None or it.irtC is None:
             continue
 
-        ti = _make_test_item(a=float(it.irtA), b=float(it.irtB), c=float(it.irtC))
+        ti = _make_test_item(a=float(it.irtA), b=float(it.irtB), c=float(it.irtC), item_id=it.id)
         by_concept.setdefault(module_id, []).append(ti)
         testitem_to_itemid[ti] = it.id
         testitem_to_skill[ti] = module_id
@@ -70,6 +93,33 @@ def _build_item_pools(
     return concepts, pools, testitem_to_itemid, testitem_to_skill
 
 
+async def _load_bank(quiz_id: str, version, quiz=None) -> QuizBank:
+    """
+    Resolve a quiz's eligible items and prebuild their TestItems.
+
+    quiz is the already loaded Quiz (Attempt.quiz), passed on so the quiz row
+    is not read again.
+    """
+    items = await repo.list_eligible_items_for_quiz(quiz_id, quiz=quiz)
+    concepts, pools, ti2id, ti2skill = _build_item_pools(items)
+    return QuizBank(
+        quiz_id=quiz_id,
+        version=version,
+        items=items,
+        concepts=concepts,
+        test_items={c: list(pool.test_items) for c, pool in pools.items()},
+        testitem_to_itemid=ti2id,
+        testitem_to_skill=ti2skill,
+    )
+
+
+async def _get_bank(attempt) -> QuizBank:
+    """Fetch the attempt's quiz bank through the shared cache, keyed by Quiz.updatedAt."""
+    version = getattr(attempt.quiz, "updatedAt", None)
+    with timings.measure("context.bank"):
+        return await banks.get(attempt.quizId, version, partial(_load_bank, quiz=attempt.quiz))
+
+
 def _public_item_payload(db_item) -> PublicItem:
     """
     Convert a Prisma Item record into a PublicItem dataclass for the API layer.
@@ -108,53 +158,484 @@ def _snapshot_payload(theta: dict[str, float], mastery: dict[str, bool]) -> str:
     Returns a JSON string for Prisma compatibility.
     """
     import json
-    snapshot = {skill: float(theta[skill]) for skill in mastery.keys()}
-    return json.dumps(snapshot)
-
-
-def _find_test_item_by_irt_params(
-        model: MultidimensionalModel,
-        a: float,
-        b: float,
-        c: float,
-    ) -> TestItem | None:
-    """Find a TestItem in the model's pools that matches the given IRT parameters."""
-    for _, uni_model in model.models.items():
-        for test_item in uni_model.adaptive_test.item_pool.test_items:
-            if (abs(test_item.a - a) < 0.001 and
-                abs(test_item.b - b) < 0.001 and
-                abs(test_item.c - c) < 0.001):
-                return test_item
+    with timings.measure("step.snapshot"):
+        snapshot = {skill: float(theta[skill]) for skill in mastery.keys()}
+        return json.dumps(snapshot)
+
+
+async def _load_public_item(bank: QuizBank, test_item: TestItem | None) -> PublicItem | None:
+    """
+    Build the public payload for the DB item behind a selected TestItem.
+
+    Bank items are loaded without options, so the selected item's content is
+    fetched on first use and cached on the bank for every later request.
+    """
+    if test_item is None:
+        return None
+    public = bank.content.get(test_item.id)
+    if public is None:
+        with timings.measure("item.content"):
+            db_item = await repo.get_item_by_id(test_item.id)
+        if db_item is None:
+            return None
+        public = bank.content[test_item.id] = _public_item_payload(db_item)
+    return public
+
+
+def _filter_repeat_correct_items(
+    bank: QuizBank, correct: CorrectItems | None
+) -> np.ndarray | None:
+    """
+    Mask of the bank's items this student has previously answered correctly
+    on this quiz, or None if nothing is excluded (repeats allowed, or no
+    correct answers yet). The mask is maintained by the CorrectItems entry.
+    """
+    if correct is None or not correct.item_ids:
+        return None
+    return correct.mask(bank)
+
+
+# ---- Quiz context ------------------------------------------------------------
+
+@dataclass
+class QuizContext:
+    """
+    Everything init/step need about an attempt's quiz, loaded once per request.
+
+    Attributes:
+        attempt:    The Attempt record, with its Quiz included.
+        bank:       The quiz's cached QuizBank.
+        excluded:   Boolean mask over bank.items of the items this student
+                    already answered correctly when the quiz does not allow
+                    repeats, or None if no item is excluded.
+        thresholds: Mastery threshold per module of the quiz.
+        thetas:     Stored theta per module for the attempt's enrollment.
+    """
+    attempt: Any
+    bank: QuizBank
+    excluded: np.ndarray | None
+    thresholds: dict[str, float]
+    thetas: dict[str, float]
+
+    @property
+    def has_items(self) -> bool:
+        """Whether any eligible item is left once exclusions are applied."""
+        if self.excluded is None:
+            return bool(self.bank.items)
+        return not self.excluded.all()
+
+
+def _exempt_own_items(ctx: QuizContext, item_ids: list[str]) -> QuizContext:
+    """
+    ctx with item_ids (the attempt's own answers) removed from its exclusion
+    mask, so a restore or replay finds the items this attempt administered
+    even when they have since been answered correctly.
+    """
+    if ctx.excluded is None:
+        return ctx
+    positions = [ctx.bank.positions[i] for i in item_ids if i in ctx.bank.positions]
+    if not positions or not ctx.excluded[positions].any():
+        return ctx
+    excluded = ctx.excluded.copy()
+    excluded[positions] = False
+    return replace(ctx, excluded=excluded if excluded.any() else None)
+
+
+def _stored_checkpoint(attempt) -> EngineCheckpoint | None:
+    """The attempt's engine checkpoint when checkpoints are enabled, else None."""
+    if not settings.engine_checkpoints:
+        return None
+    return load_checkpoint(getattr(attempt, "engineCheckpoint", None))
+
+
+def _with_recorded_prior(ctx: QuizContext, checkpoint: EngineCheckpoint | None) -> QuizContext:
+    """
+    ctx seeded with the prior the attempt started with, as recorded on its
+    checkpoint.
+
+    Every step overwrites the enrollment's stored thetas, so once the attempt
+    has answers they already count them; seeding from them again would count
+    those answers twice.
+    """
+    if checkpoint is None:
+        return ctx
+    prior = {skill: st.prior_mu for skill, st in checkpoint.skills.items()}
+    return replace(ctx, thetas={**ctx.thetas, **prior})
+
+
+async def _no_correct_items() -> None:
     return None
 
 
-async def _filter_repeat_correct_items(attempt, items):
+async def _get_correct_items(attempt) -> CorrectItems:
+    """The enrollment's previously correct items on the quiz, through the shared cache."""
+    with timings.measure("context.correct"):
+        return await correct_items.get(
+            attempt.enrollmentId,
+            attempt.quizId,
+            repo.get_correct_item_ids_for_enrollment_and_quiz,
+        )
+
+
+async def _load_quiz_context(attempt_id: str) -> QuizContext:
+    """
+    Load an attempt's quiz context with as much concurrency as possible.
+
+    The attempt (with its quiz) is read first; the bank, stored thetas and
+    previously correct items only depend on it and are fetched concurrently.
+    The quiz row is read once: its settings and mastery thresholds come from
+    Attempt.quiz, which is also handed to the bank loader on a cache miss.
+    Previously correct items come from the per-enrollment cache in
+    service/exclusions.py and only hit the DB on a miss.
+
+    Raises:
+        ValueError: If attempt_id does not correspond to a known Attempt record.
+    """
+    with timings.measure("context.attempt"):
+        attempt = await repo.get_attempt(attempt_id)
+    if not attempt:
+        raise ValueError("Unknown attempt_id")
+
+    # Repeats are allowed unless the quiz explicitly disables them
+    quiz = attempt.quiz
+    repeats_allowed = not quiz or getattr(quiz, "repeatCorrectQuestions", True)
+    quiz_modules = quiz.quizModules if quiz else []
+
+    bank, thetas, correct = await asyncio.gather(
+        _get_bank(attempt),
+        repo.get_thetas_for_enrollment(attempt.enrollmentId),
+        _no_correct_items() if repeats_allowed else _get_correct_items(attempt),
+    )
+    with timings.measure("context.filter"):
+        excluded = _filter_repeat_correct_items(bank, correct)
+    return QuizContext(
+        attempt=attempt,
+        bank=bank,
+        excluded=excluded,
+        thresholds={qm.moduleId: qm.masteryThreshold for qm in quiz_modules},
+        thetas=thetas,
+    )
+
+
+# ---- Engine stages -----------------------------------------------------------
+# Synchronous, CPU-bound parts of the orchestration. They are run through the
+# engine executor so the event loop keeps serving DB I/O meanwhile.
+
+def _build_model(
+    bank: QuizBank,
+    excluded: np.ndarray | None,
+    concepts: list[str] | None,
+    thresholds: dict[str, float],
+    existing_thetas: dict[str, float],
+    prior_mu: float,
+    prior_sigma2: float,
+) -> tuple[MultidimensionalModel, dict[str, float]]:
     """
-    If quiz does NOT allow repeats, remove items that this student
-    has previously answered correctly on this quiz.
+    Build pools from the bank and a model over concepts (all pooled concepts
+    when None). Returns the model and its mastery thresholds.
     """
-    quiz = await repo.get_quiz(attempt.quizId)
+    with timings.measure("pools.build"):
+        all_concepts, pools, _, _ = bank.build_pools(excluded)
+    effective_concepts = concepts or all_concepts
+    thr = {c: thresholds[c] for c in effective_concepts}
+    with timings.measure("model.build"):
+        model = build_multidim_model(
+            concepts=effective_concepts,
+            pools_by_concept=pools,
+            prior_mu=prior_mu,
+            prior_sigma2=prior_sigma2,
+            mastery_thresholds=thr,
+            existing_thetas=existing_thetas,
+            ability_estimator=settings.ability_estimator,
+            grid_points=settings.grid_points,
+            estimation_memo=estimates,
+            memo_scope=(bank.quiz_id, bank.version),
+        )
+    return model, thr
 
-    # If repeats allowed, no filtering
-    if not quiz or getattr(quiz, "repeatCorrectQuestions", True):
-        return items
 
-    # Get all previously correct item IDs for this student + quiz
-    correct_item_ids = await repo.get_correct_item_ids_for_enrollment_and_quiz(
+def _count_estimations(path: str, n: int = 1) -> None:
+    """Add n theta updates made on path (step, replay, speculation, tree) to the metrics."""
+    if n:
+        estimations.labels(path, settings.ability_estimator).inc(n)
+
+
+def _choose_next_item(model: MultidimensionalModel) -> tuple[TestItem | None, str | None]:
+    """choose_next_item, recording how many items the chosen module selected from."""
+    next_item, skill = choose_next_item(model)
+    if skill is not None:
+        pool = model.models[skill].adaptive_test.item_pool
+        selection_candidates.observe(len(pool.test_items))
+    return next_item, skill
+
+
+def _init_model(
+    ctx: QuizContext,
+    modules: list[str] | None,
+    prior_mu: float,
+    prior_sigma2: float,
+) -> tuple[MultidimensionalModel, dict[str, float], TestItem | None]:
+    """Engine stage of init_attempt: build the model and choose the first item."""
+    model, thr = _build_model(
+        ctx.bank, ctx.excluded, modules, ctx.thresholds, ctx.thetas, prior_mu, prior_sigma2
+    )
+    next_item, _ = _choose_next_item(model)
+    return model, thr, next_item
+
+
+def _restore_model(ctx: QuizContext, checkpoint) -> MultidimensionalModel | None:
+    """Engine stage of a checkpoint restore: build pools and restore the model."""
+    with timings.measure("pools.build"):
+        _, pools, _, _ = ctx.bank.build_pools(ctx.excluded)
+    thr = {s: ctx.thresholds[s] for s in checkpoint.skills}
+    with timings.measure("model.restore"):
+        return restore_model(
+            checkpoint, pools, thr,
+            item_id_of=lambda t: t.id,
+            ability_estimator=settings.ability_estimator,
+            grid_points=settings.grid_points,
+            estimation_memo=estimates,
+            memo_scope=(ctx.bank.quiz_id, ctx.bank.version),
+        )
+
+
+def _replay_model(
+    ctx: QuizContext,
+    attempt_id: str,
+    responses: list[Any],
+    response_id: str,
+    prior_sigma2: float,
+) -> AttemptSession:
+    """
+    Engine stage of a replay: build a session seeded from ctx.thetas and
+    record every response except response_id into it.
+    """
+    attempt = ctx.attempt
+    model, thr = _build_model(
+        ctx.bank, ctx.excluded, None, ctx.thresholds, ctx.thetas,
+        settings.prior_mu, prior_sigma2,
+    )
+    session = AttemptSession(
+        attempt_id=attempt_id,
         enrollment_id=attempt.enrollmentId,
         quiz_id=attempt.quizId,
+        fixed_length=attempt.fixedLengthN,
+        model=model,
+        bank=ctx.bank,
+        thresholds=thr,
+        prior_sigma2=prior_sigma2,
     )
+    replayed = 0
+    with timings.measure("replay.responses"):
+        for prev_response in responses:
+            # Skip the current response (we'll process it separately)
+            if prev_response.id == response_id:
+                continue
+
+            # Replay previous response
+            is_correct = bool(prev_response.isCorrect)
+            skill = prev_response.item.moduleId
+            prev_ti = session.find_test_item(skill, prev_response.item.id)
+            if prev_ti:
+                model.models[skill].record_response(1 if is_correct else 0, prev_ti)
+                replayed += 1
+            session.response_ids.append(prev_response.id)
+    replay_responses.observe(replayed)
+    _count_estimations("replay", replayed)
+    return session
+
+
+def _estimate(
+    session: AttemptSession,
+    answer: tuple[str, str, bool] | None,
+    capture: bool,
+) -> tuple[dict[str, float], dict[str, bool], str | None]:
+    """
+    Engine stage of step_attempt before persistence: record answer (skill,
+    item_id, is_correct) if given, then return theta, naive mastery and the
+    serialised checkpoint when capture is set.
+    """
+    model = session.model
+    if answer is not None:
+        skill, item_id, is_correct = answer
+        # Find the model's TestItem for the answered item
+        prev_ti = session.find_test_item(skill, item_id)
+        if prev_ti:
+            # Record the response into the correct skill model
+            model.models[skill].record_response(1 if is_correct else 0, prev_ti)
+            _count_estimations("step")
+
+    # Compute current theta and naive mastery
+    theta = {s: m.get_theta() for s, m in model.models.items()}
+    mastery = {s: (theta[s] > session.thresholds[s]) for s in theta}
+
+    # Engine state so any worker can resume without a replay
+    checkpoint = None
+    if capture:
+        checkpoint = dump_checkpoint(capture_checkpoint(
+            model, session.item_id_of, session.response_ids, session.prior_sigma2
+        ))
+    return theta, mastery, checkpoint
+
 
-    if not correct_item_ids:
-        return items
+def _select(session: AttemptSession) -> tuple[TestItem | None, bool]:
+    """Engine stage of step_attempt after persistence: next item and all_mastered."""
+    next_item = None
+    # Every stored response of the attempt has been applied at this point
+    if (len(session.response_ids) < session.fixed_length):
+        # Pick next item
+        next_item, chosen_skill = _choose_next_item(session.model)
+    return next_item, determine_all_mastered(session.model)
+
+
+def _speculate(
+    model: MultidimensionalModel,
+    item: TestItem,
+    thresholds: dict[str, float],
+) -> dict[int, Branch]:
+    """
+    Engine stage run in the background after an item is served: the Branch
+    for each possible answer (0 and 1), each on its own fork of model.
+    """
+    skill = next(
+        s for s, uni in model.models.items()
+        if item in uni.adaptive_test.item_pool.test_items
+    )
+    branches = {}
+    for response in (0, 1):
+        fork = fork_model(model)
+        fork.models[skill].record_response(response, item)
+        theta = {s: m.get_theta() for s, m in fork.models.items()}
+        next_item, _ = choose_next_item(fork)
+        branches[response] = Branch(
+            model=fork,
+            theta=theta,
+            mastery={s: theta[s] > thresholds[s] for s in theta},
+            next_item=next_item,
+            all_mastered=determine_all_mastered(fork),
+        )
+    _count_estimations("speculation", len(branches))
+    return branches
+
+
+def _build_tree(
+    ctx: QuizContext,
+    modules: list[str] | None,
+    prior_mu: float,
+    prior_sigma2: float,
+    depth: int,
+) -> TreeNode:
+    """Engine stage: build the opening tree (just the first item for depth 0)."""
+    model, thr = _build_model(
+        ctx.bank, None, modules, ctx.thresholds, {}, prior_mu, prior_sigma2
+    )
+    tree = build_tree(model, thr, depth)
+    # Every node below the root recorded one answer
+    _count_estimations("tree", tree.size - 1)
+    return tree
 
-    filtered = [it for it in items if it.id not in correct_item_ids]
 
-    # if no unanswered items remain, no items will be returned
-    if not filtered:
+async def _opening_tree(
+    ctx: QuizContext,
+    modules: list[str] | None,
+    prior_mu: float,
+    prior_sigma2: float,
+) -> TreeNode | None:
+    """
+    The bank's shared opening for this attempt, building it on first use.
+
+    With decision_tree_depth K > 0 this is the decision tree of the first K
+    answers; otherwise (init_cache) a depth-0 tree holding the initial model
+    and first item. Returns None (live engine) when both are disabled, the
+    bank already holds init_cache_max_per_bank openings, or the attempt's
+    opening depends on more than the bank, module scope and prior: excluded
+    items or a stored theta that differs from the prior mean.
+
+    A build that fails is dropped so a later init retries it. If the engine
+    was busy this init falls back to the live engine; other errors are logged
+    and raised.
+    """
+    depth = settings.decision_tree_depth
+    bank = ctx.bank
+    if depth <= 0 and not settings.init_cache:
+        return None
+    if ctx.excluded is not None and ctx.excluded.any():
+        return None
+    concepts = modules or bank.concepts
+    if any(ctx.thetas.get(c, prior_mu) != prior_mu for c in concepts):
         return None
 
-    return filtered
+    key = (
+        tuple(modules) if modules else None,
+        tuple((c, ctx.thresholds.get(c)) for c in concepts),
+        prior_mu,
+        prior_sigma2,
+        settings.ability_estimator,
+        settings.grid_points,
+        settings.item_pool_backend,
+        depth,
+    )
+    task = bank.openings.get(key)
+    if task is None:
+        if len(bank.openings) >= settings.init_cache_max_per_bank:
+            return None
+        stage = "tree.build" if depth > 0 else "init.model"
+        task = bank.openings[key] = asyncio.ensure_future(
+            engine.run(stage, _build_tree, ctx, modules, prior_mu, prior_sigma2, depth)
+        )
+    try:
+        # shield: a cancelled waiter must not cancel the build other waiters share
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        # Only forget the build if it was cancelled itself, not just this waiter
+        if task.cancelled() and bank.openings.get(key) is task:
+            del bank.openings[key]
+        raise
+    except Exception as e:
+        # Retry the build on a later init
+        if bank.openings.get(key) is task:
+            del bank.openings[key]
+        if isinstance(e, EngineBusyError):
+            # This one uses the live engine
+            return None
+        logger.exception("Building the opening of quiz %s failed", bank.quiz_id)
+        raise
+
+
+async def _tree_branch(
+    session: AttemptSession, answer: tuple[str, str, bool] | None
+) -> Branch | None:
+    """
+    Advance the session along its opening decision tree for answer.
+
+    Returns the Branch for the answer with a private fork of the node's model,
+    or None once the attempt has left the tree.
+    """
+    node, session.tree_node = session.tree_node, None
+    if node is None or answer is None:
+        return None
+    node = node.child(answer[1], answer[2])
+    if node is None:
+        return None
+    if node.children:
+        session.tree_node = node
+    model = await engine.run("tree.fork", fork_model, node.branch.model)
+    return replace(node.branch, model=model)
+
+
+def _start_speculation(session: AttemptSession, next_item: TestItem | None) -> None:
+    """Compute both branches for next_item in the background when enabled."""
+    if not settings.speculative_steps or next_item is None:
+        return
+    if session.tree_node is not None:
+        # The opening decision tree already covers the next answer
+        return
+    task = asyncio.ensure_future(
+        engine.run("speculate", _speculate, session.model, next_item, session.thresholds)
+    )
+    # Failures (e.g. EngineBusyError) just mean the next step computes normally
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    session.speculation = Speculation(item_id=next_item.id, task=task)
 
 
 # ---- Orchestration -----------------------------------------------------------
@@ -178,6 +659,9 @@ async def init_attempt(
     prior_sigma2 override the configured defaults when provided, allowing
     callers to customise the Bayesian prior per attempt.
 
+    Concurrent identical calls for the attempt share one computation, and
+    calls for the same attempt run one at a time in arrival order.
+
     Args:
         attempt_id:   Primary key of the Attempt record to initialise.
         modules:      Optional list of concept/module IDs to restrict the
@@ -199,65 +683,163 @@ async def init_attempt(
     Raises:
         ValueError: If attempt_id does not correspond to a known Attempt record.
     """
-    attempt = await repo.get_attempt(attempt_id)
-    if not attempt:
-        raise ValueError("Unknown attempt_id")
+    key = ("init", tuple(modules) if modules else None, prior_mu, prior_sigma2)
+    return await flights.run(
+        attempt_id,
+        key,
+        partial(_init_attempt, attempt_id, modules, prior_mu, prior_sigma2),
+    )
 
-    items = await repo.list_eligible_items_for_quiz(attempt.quizId)
-    items = await _filter_repeat_correct_items(attempt, items)
-    if not items:
+
+async def _init_attempt(
+    attempt_id: str,
+    modules: list[str] | None,
+    prior_mu: float | None,
+    prior_sigma2: float | None
+) -> tuple[dict[str, float], PublicItem | None]:
+    """Body of init_attempt, run under the attempt's single-flight."""
+    with timings.measure("context.load"):
+        ctx = await _load_quiz_context(attempt_id)
+    attempt, bank = ctx.attempt, ctx.bank
+    if not ctx.has_items:
         # Nothing to ask
         return {}, None
 
-    # Build pools and model
-    all_concepts, pools, ti2id, ti2skill = _build_item_pools(items)
+    mu = prior_mu if prior_mu is not None else settings.prior_mu
+    sigma2 = prior_sigma2 if prior_sigma2 is not None else settings.prior_sigma2
+    # A re-init starts over from the attempt's own prior, not from thetas its
+    # earlier steps have already updated
+    ctx = _with_recorded_prior(ctx, _stored_checkpoint(attempt))
+
+    tree = await _opening_tree(ctx, modules, mu, sigma2)
+    if tree is not None:
+        # First item (and with decision_tree_depth the following ones) comes
+        # from the bank's shared opening
+        model = await engine.run("tree.fork", fork_model, tree.branch.model)
+        thr = {c: ctx.thresholds[c] for c in model.models}
+        next_item = tree.branch.next_item
+    else:
+        # Build pools and model, choose the first item
+        model, thr, next_item = await engine.run(
+            "init.model", _init_model, ctx, modules, mu, sigma2
+        )
+    if not next_item:
+        return {}, None
 
-    # Scope modules if provided; else use all_concepts from pool
-    effective_concepts = modules or all_concepts
+    # Initial thetas (no responses yet)
+    theta = {skill: uni.get_theta() for skill, uni in model.models.items()}
 
-    # Load existing theta values from database
-    existing_thetas = await repo.get_thetas_for_enrollment(
-        attempt.enrollmentId,
-        effective_concepts,
+    # Keep the live model around so the following /step can continue from it
+    session = AttemptSession(
+        attempt_id=attempt_id,
+        enrollment_id=attempt.enrollmentId,
+        quiz_id=attempt.quizId,
+        fixed_length=attempt.fixedLengthN,
+        model=model,
+        bank=bank,
+        thresholds=thr,
+        prior_sigma2=sigma2,
+        tree_node=tree if tree is not None and tree.children else None,
     )
+    _start_speculation(session, next_item)
+    sessions.put(session)
 
-    # Mastery thresholds
-    quiz_modules = await repo.get_quiz_modules(attempt.quizId)
-    module_thresholds = {qm.moduleId: qm.masteryThreshold for qm in quiz_modules}
+    return theta, await _load_public_item(bank, next_item)
 
-    thr = {c: module_thresholds[c] for c in effective_concepts}
 
-    model = build_multidim_model(
-        concepts=effective_concepts,
-        pools_by_concept=pools,
-        prior_mu=prior_mu if prior_mu is not None else settings.prior_mu,
-        prior_sigma2=prior_sigma2 if prior_sigma2 is not None else settings.prior_sigma2,
-        mastery_thresholds=thr,
-        existing_thetas=existing_thetas,
-    )
+async def _checkout_session(attempt_id: str, response_id: str) -> AttemptSession | None:
+    """
+    Take the cached session for an attempt if it is safe to continue from it.
 
-    # Choose first item
-    next_item, chosen_skill = choose_next_item(model)
-    if not next_item:
-        return {}, None
+    The session is only reused when it has applied exactly the stored
+    responses other than response_id, in order. Anything else (a retry of a
+    response already applied, or responses recorded through another worker)
+    returns None so the caller rebuilds the model by replay.
+    """
+    session = sessions.take(attempt_id)
+    if session is None:
+        return None
+    if response_id in session.response_ids:
+        session.drop_speculation()
+        return None
 
-    # Initial thetas (no responses yet)
-    theta = {skill: uni.get_theta() for skill, uni in model.models.items()}
+    stored_ids = await repo.list_response_ids(attempt_id)
+    if [rid for rid in stored_ids if rid != response_id] != session.response_ids:
+        session.drop_speculation()
+        return None
+    return session
+
+
+async def _replay_session(
+    attempt_id: str,
+    response_id: str,
+    answered_item_id: str | None = None,
+) -> AttemptSession | None:
+    """
+    Rebuild an attempt session from the DB by replaying its stored responses.
 
-    # Return a public payload based on DB item object
-    # Find DB item by matching IRT parameters since TestItem objects may not be identical
-    public = None
-    if next_item:
-        # Find the matching DB item by IRT parameters
-        for item in items:
-            if (item.irtA is not None and item.irtB is not None and item.irtC is not None and
-                abs(float(item.irtA) - next_item.a) < 0.001 and
-                abs(float(item.irtB) - next_item.b) < 0.001 and
-                abs(float(item.irtC) - next_item.c) < 0.001):
-                public = _public_item_payload(item)
-                break
+    Builds pools from the eligible items. If the attempt carries an engine
+    checkpoint covering every stored response except response_id, the model
+    is restored from it without running the estimator. Otherwise the model
+    seeds theta from the prior recorded on the checkpoint (the enrollment's
+    stored values when there is none) and replays every stored response
+    except response_id (which the caller applies itself).
 
-    return theta, public
+    On quizzes without repeats, the items of the attempt's own responses,
+    including response_id's (or the fallback answered_item_id), stay in the
+    pools even if they are among the enrollment's correct items, as they were
+    for the live model.
+
+    Returns:
+        The rebuilt session, or None if no items are left in scope.
+
+    Raises:
+        ValueError: If attempt_id does not correspond to a known Attempt record.
+    """
+    with timings.measure("context.load"):
+        ctx = await _load_quiz_context(attempt_id)
+    attempt, bank = ctx.attempt, ctx.bank
+    answered = [answered_item_id] if answered_item_id is not None else []
+
+    # Restore from the persisted checkpoint when it covers every stored response
+    checkpoint = _stored_checkpoint(attempt)
+    if checkpoint is not None and set(checkpoint.skills) <= set(ctx.thresholds):
+        stored_ids = await repo.list_response_ids(attempt_id)
+        own = [item_id for st in checkpoint.skills.values() for item_id in st.item_ids]
+        if ctx.excluded is not None and response_id in stored_ids:
+            # The item being answered may already count as correct
+            response = await repo.get_response_by_id(response_id)
+            own += [response.item.id] if response else []
+        own_ctx = _exempt_own_items(ctx, answered + own)
+        if (
+            own_ctx.has_items
+            and [rid for rid in stored_ids if rid != response_id] == checkpoint.response_ids
+        ):
+            model = await engine.run("replay.restore", _restore_model, own_ctx, checkpoint)
+            if model is not None:
+                return AttemptSession(
+                    attempt_id=attempt_id,
+                    enrollment_id=attempt.enrollmentId,
+                    quiz_id=attempt.quizId,
+                    fixed_length=attempt.fixedLengthN,
+                    model=model,
+                    bank=bank,
+                    thresholds={s: ctx.thresholds[s] for s in checkpoint.skills},
+                    prior_sigma2=checkpoint.prior_sigma2,
+                    response_ids=list(checkpoint.response_ids),
+                )
+
+    # Load all previous responses for this attempt and replay them into a model
+    # seeded from the prior the attempt started with
+    all_responses = await repo.list_responses(attempt_id)
+    ctx = _exempt_own_items(ctx, answered + [r.item.id for r in all_responses])
+    if not ctx.has_items:
+        return None
+    ctx = _with_recorded_prior(ctx, checkpoint)
+    sigma2 = checkpoint.prior_sigma2 if checkpoint is not None else settings.prior_sigma2
+    return await engine.run(
+        "replay.model", _replay_model, ctx, attempt_id, all_responses, response_id, sigma2
+    )
 
 
 async def step_attempt(
@@ -269,6 +851,14 @@ async def step_attempt(
     """
     Process a response and return the next item.
 
+    Continues from the cached attempt session when this worker holds an
+    up-to-date one (one estimation and one selection), otherwise rebuilds the
+    model by replaying the attempt's stored responses.
+
+    Concurrent identical calls (same response_id and fallback answer) share
+    one computation and its result; other calls for the same attempt,
+    including init_attempt, run one at a time in arrival order.
+
     Args:
         attempt_id: Unique identifier for the attempt
         response_id: ID of the Response record created by Core Backend
@@ -278,77 +868,44 @@ async def step_attempt(
     Returns:
         Tuple of (theta values, mastery values, next item, is_finished, all_mastered)
     """
-    attempt = await repo.get_attempt(attempt_id)
-    if not attempt:
-        raise ValueError("Unknown attempt_id")
-
-    # Pull scope items
-    items = await repo.list_eligible_items_for_quiz(attempt.quizId)
-    items = await _filter_repeat_correct_items(attempt, items)
-    if not items:
-        # No items left in scope
-        return {}, {}, None, True, False
-
-    # Build pools/model
-    concepts, pools, ti2id, ti2skill = _build_item_pools(items)
-
-    # Load existing theta values from database
-    existing_thetas = await repo.get_thetas_for_enrollment(
-        attempt.enrollmentId,
-        concepts,
-    )
-
-    quiz_modules = await repo.get_quiz_modules(attempt.quizId)
-    module_thresholds = {qm.moduleId: qm.masteryThreshold for qm in quiz_modules}
-    thr = {c: module_thresholds[c] for c in concepts}
-    model = build_multidim_model(
-        concepts=concepts,
-        pools_by_concept=pools,
-        prior_mu=settings.prior_mu,
-        prior_sigma2=settings.prior_sigma2,
-        mastery_thresholds=thr,
-        existing_thetas=existing_thetas,
+    return await flights.run(
+        attempt_id,
+        ("step", response_id, item_id, answer_index),
+        partial(_step_attempt, attempt_id, response_id, item_id, answer_index),
     )
 
-    # Load all previous responses for this attempt and replay them
-    all_responses = await repo.list_responses(attempt_id)
-    for prev_response in all_responses:
-        # Skip the current response (we'll process it separately)
-        if prev_response.id == response_id:
-            continue
 
-        # Replay previous response
-        is_correct = bool(prev_response.isCorrect)
-        skill = prev_response.item.moduleId
-        prev_ti = _find_test_item_by_irt_params(
-            model,
-            float(prev_response.item.irtA),
-            float(prev_response.item.irtB),
-            float(prev_response.item.irtC)
-        )
-        if prev_ti:
-            model.models[skill].record_response(1 if is_correct else 0, prev_ti)
+async def _step_attempt(
+    attempt_id: str,
+    response_id: str,
+    item_id: str | None = None,
+    answer_index: int | None = None
+) -> tuple[dict[str, float], dict[str, bool], PublicItem | None, bool, bool]:
+    """Body of step_attempt, run under the attempt's single-flight."""
+    session = await _checkout_session(attempt_id, response_id)
+    if session is None:
+        session = await _replay_session(attempt_id, response_id, item_id)
+        if session is None:
+            # No items left in scope
+            return {}, {}, None, True, False
 
     # Fetch the Response record by response_id
     response = await repo.get_response_by_id(response_id)
     used_response_id: str | None = None
+    # Only keep the session if every response applied to it is stored in the DB
+    keep_session = True
+    # (skill, item_id, is_correct) of the response to record into the model
+    answer: tuple[str, str, bool] | None = None
 
     if response:
         used_response_id = response.id
-        # DB has truth for correctness
+        # DB has truth for correctness; identify skill by the item's moduleId
         is_correct = bool(response.isCorrect)
-        # Identify skill by the item's moduleId
-        skill = response.item.moduleId
-        # Find the TestItem in the model that matches this response
-        prev_ti = _find_test_item_by_irt_params(
-            model,
-            float(response.item.irtA),
-            float(response.item.irtB),
-            float(response.item.irtC)
-        )
-        if prev_ti:
-            # Record the response into the correct skill model
-            model.models[skill].record_response(1 if is_correct else 0, prev_ti)
+        answer = (response.item.moduleId, response.item.id, is_correct)
+        session.response_ids.append(response.id)
+        if is_correct:
+            # Keep the cached correct-item set in step with the stored response
+            correct_items.record(session.enrollment_id, session.quiz_id, response.item.id)
     elif item_id is not None and answer_index is not None:
         # Fallback: compute correctness without DB response
         db_item = await repo.get_item_by_id(item_id)
@@ -359,55 +916,60 @@ async def step_attempt(
         if not correct_opt:
             raise ValueError("Item has no correct option in DB")
         is_correct = (_label_from_index(answer_index) == correct_opt.label)
-        skill = db_item.moduleId
-        # Find the TestItem in the model that matches this item
-        prev_ti = _find_test_item_by_irt_params(
-            model,
-            float(db_item.irtA),
-            float(db_item.irtB),
-            float(db_item.irtC)
-        )
-        if prev_ti:
-            model.models[skill].record_response(1 if is_correct else 0, prev_ti)
+        answer = (db_item.moduleId, db_item.id, is_correct)
+        keep_session = False
     else:
         # No response to apply (first step after init)
         pass
 
-    # Compute current theta and naive mastery
-    theta = {s: m.get_theta() for s, m in model.models.items()}
-    mastery = {s: (theta[s] > thr[s]) for s in theta}
-
-    # Persist theta values to database
-    for module_id, theta_value in theta.items():
-        await repo.upsert_theta(attempt.enrollmentId, module_id, theta_value)
-
-    # Persist snapshot onto the *latest* response if we found one
-    if used_response_id:
-        await repo.attach_engine_snapshot_to_response(
-            used_response_id, snapshot=_snapshot_payload(theta=theta, mastery=mastery)
+    # Outcome precomputed by the opening decision tree, or in the background
+    # when the answer is for the item served last (speculative_steps)
+    capture = settings.engine_checkpoints and keep_session
+    branch = await _tree_branch(session, answer)
+    if branch is None and answer is not None:
+        branch = await session.take_branch(answer[1], answer[2])
+    elif branch is None:
+        branch = await session.take_branch(None)
+
+    if branch is not None:
+        # The fork that recorded this answer becomes the live model
+        session.model = branch.model
+        theta, mastery, checkpoint = branch.theta, branch.mastery, None
+        if capture:
+            _, _, checkpoint = await engine.run("step.checkpoint", _estimate, session, None, True)
+    else:
+        # Record the response, compute theta/mastery and the checkpoint
+        theta, mastery, checkpoint = await engine.run(
+            "step.estimate", _estimate, session, answer, capture
         )
 
-    next_item = None
+    # Snapshot onto the *latest* response if we found one
+    snapshot = _snapshot_payload(theta=theta, mastery=mastery) if used_response_id else None
+
+    # Persist thetas, snapshot and checkpoint in one transaction
+    with timings.measure("step.persist"):
+        await repo.persist_step_results(
+            session.enrollment_id,
+            theta,
+            response_id=used_response_id,
+            snapshot=snapshot,
+            attempt_id=attempt_id,
+            checkpoint=checkpoint,
+        )
 
-    if (len(all_responses) < attempt.fixedLengthN):
-        # Pick next item
-        next_item, chosen_skill = choose_next_item(model)
+    if branch is not None:
+        next_item, all_mastered = branch.next_item, branch.all_mastered
+        if len(session.response_ids) >= session.fixed_length:
+            next_item = None
+    else:
+        next_item, all_mastered = await engine.run("step.select", _select, session)
 
     # FINISH if no next item
     is_finished = next_item is None
 
-    all_mastered = determine_all_mastered(model)
-
-    # Build public payload
-    next_public: PublicItem | None = None
-    if next_item:
-        # Find the matching DB item by IRT parameters since TestItem objects may not be identical
-        for item in items:
-            if (item.irtA is not None and item.irtB is not None and item.irtC is not None and
-                abs(float(item.irtA) - next_item.a) < 0.001 and
-                abs(float(item.irtB) - next_item.b) < 0.001 and
-                abs(float(item.irtC) - next_item.c) < 0.001):
-                next_public = _public_item_payload(item)
-                break
+    if keep_session:
+        _start_speculation(session, next_item)
+        sessions.put(session)
 
+    next_public = await _load_public_item(session.bank, next_item)
     return theta, mastery, next_public, is_finished, all_mastered
@@ -0,0 +1,117 @@
+"""
+Per-(enrollment, quiz) cache of items the student already answered correctly.
+
+Quizzes with repeatCorrectQuestions disabled must never serve an item the
+student answered correctly in any earlier attempt. Resolving that set means
+scanning every correct Response of the enrollment on the quiz, so it is
+loaded once per (enrollment, quiz) and then kept up to date in place:
+step_attempt records each new correct answer on the cached entry.
+
+Each entry also keeps a boolean mask over the positions of its QuizBank's
+items (rebuilt when the bank is reloaded), so excluding the items from the
+engine's pools is a mask operation rather than a list filter.
+
+Entries expire ttl_seconds after they were loaded, however often they are
+read, so correct answers recorded through another worker are picked up within
+that time; the attempt's own model never repeats an item regardless.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from ..cache import TTLCache
+from ..config import settings
+
+
+@dataclass
+class CorrectItems:
+    """
+    Items one enrollment answered correctly on one quiz.
+
+    Attributes:
+        item_ids: DB Item.ids answered correctly at least once.
+    """
+    item_ids: set[str]
+    _bank: Any = field(default=None, repr=False)
+    _mask: np.ndarray | None = field(default=None, repr=False)
+
+    def mask(self, bank) -> np.ndarray:
+        """Boolean mask over bank.items, True for items answered correctly."""
+        if self._bank is not bank:
+            mask = np.zeros(len(bank.items), dtype=bool)
+            mask[[bank.positions[i] for i in self.item_ids if i in bank.positions]] = True
+            self._bank, self._mask = bank, mask
+        return self._mask
+
+    def add(self, item_id: str) -> None:
+        """Record a new correct answer, updating the cached mask in place."""
+        self.item_ids.add(item_id)
+        if self._mask is not None and item_id in self._bank.positions:
+            self._mask[self._bank.positions[item_id]] = True
+
+
+class CorrectItemCache:
+    """LRU + TTL cache of CorrectItems keyed by (enrollment_id, quiz_id)."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._cache = TTLCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds, sliding=False, clock=clock
+        )
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    async def get(
+        self,
+        enrollment_id: str,
+        quiz_id: str,
+        loader: Callable[..., Awaitable[set[str]]],
+    ) -> CorrectItems:
+        """
+        Return the cached entry, loading it with loader(enrollment_id=, quiz_id=)
+        on a miss.
+        """
+        key = (enrollment_id, quiz_id)
+        entry = self._cache.get(key)
+        if entry is None:
+            item_ids = await loader(enrollment_id=enrollment_id, quiz_id=quiz_id)
+            entry = CorrectItems(item_ids=set(item_ids))
+            self._cache.put(key, entry)
+        return entry
+
+    def record(self, enrollment_id: str, quiz_id: str, item_id: str) -> None:
+        """
+        Add a correct answer to a cached entry. Without an entry nothing is
+        done: the next load reads the answer from the DB.
+        """
+        entry = self._cache.get((enrollment_id, quiz_id))
+        if entry is not None:
+            entry.add(item_id)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._cache.clear()
+
+
+correct_items = CorrectItemCache(
+    max_entries=settings.correct_cache_max_entries,
+    ttl_seconds=settings.correct_cache_ttl_seconds,
+)
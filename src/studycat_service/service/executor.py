@@ -0,0 +1,170 @@
+"""
+Executor for the engine's CPU-bound work (estimation, selection, replay).
+
+Theta estimation and item selection are pure NumPy/Python computations: run
+on the event loop they block every other request of the worker, including
+the DB round trips of concurrent attempts. EngineExecutor hands them to a
+thread pool instead (NumPy and SciPy release the GIL for most of the work), so
+the loop keeps serving I/O while the engine computes.
+
+The number of computations queued or running is bounded by max_queue. Past it
+run() waits (first come, first served) for a computation to finish, so bursts
+are absorbed; only a caller still waiting after queue_timeout seconds gets
+EngineBusyError, which the API maps to 503 so load is shed before latency
+grows without bound. Every computation is recorded in timings under its stage
+name, and the time it waited for a worker (including any wait for a slot)
+under "<stage>.wait".
+
+Mode "inline" runs the computations on the loop (no offloading) and keeps the
+timings; it is meant for tests and single-request debugging. Process pools are
+not supported: sessions hold live engine models that cannot leave the process.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+from ..config import settings
+from .timing import StageTimings, timings
+
+EXECUTOR_MODES = ("thread", "inline")
+
+
+class EngineBusyError(RuntimeError):
+    """Raised when no engine slot freed up within queue_timeout seconds."""
+
+
+def _timed_call[T](fn: Callable[..., T], *args: Any, **kwargs: Any) -> tuple[float, T, float]:
+    """Run fn in the worker and return (start, result, end) perf_counter stamps."""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return started, result, time.perf_counter()
+
+
+class EngineExecutor:
+    """
+    Bounded executor for engine computations.
+
+    Attributes:
+        mode (str):            "thread" or "inline".
+        max_queue (int):       Maximum number of computations queued or running.
+        queue_timeout (float): Seconds a computation waits for a slot before
+                               EngineBusyError; 0 rejects at once.
+        pending (int):         Computations currently queued or running.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64,
+        queue_timeout: float = 5.0,
+        stage_timings: StageTimings = timings,
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown engine executor {mode!r}; expected one of {EXECUTOR_MODES}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.pending = 0
+        # Futures of callers waiting for a slot, in arrival order. Plain futures
+        # (not an asyncio.Semaphore) so the executor is not bound to one loop.
+        self._waiters: deque[asyncio.Future] = deque()
+        self.timings = stage_timings
+        self._pool: ThreadPoolExecutor | None = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="engine"
+            )
+        return self._pool
+
+    @property
+    def waiting(self) -> int:
+        """Callers waiting for a slot."""
+        return sum(not w.done() for w in self._waiters)
+
+    async def _acquire(self) -> None:
+        """Take a slot, waiting up to queue_timeout seconds for one."""
+        if self.pending < self.max_queue and not self.waiting:
+            self.pending += 1
+            return
+        if self.queue_timeout <= 0:
+            raise EngineBusyError(f"{self.pending} engine computations pending")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as we gave up: pass it on
+                self._release()
+            else:
+                waiter.cancel()
+            if isinstance(e, TimeoutError):
+                raise EngineBusyError(
+                    f"{self.pending} engine computations pending after "
+                    f"{self.queue_timeout:g}s"
+                ) from None
+            raise
+
+    def _release(self) -> None:
+        """Hand the slot to the oldest waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.pending -= 1
+
+    async def run[T](self, stage: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run fn(*args, **kwargs) off the event loop and return its result.
+
+        Raises:
+            EngineBusyError: If no slot freed up within queue_timeout seconds.
+        """
+        submitted = time.perf_counter()
+        await self._acquire()
+        try:
+            if self.mode == "inline":
+                started, result, finished = _timed_call(fn, *args, **kwargs)
+            else:
+                # Run in a copy of the caller's context so stages timed inside fn
+                # reach the request's RequestTiming
+                loop = asyncio.get_running_loop()
+                started, result, finished = await loop.run_in_executor(
+                    self._get_pool(),
+                    contextvars.copy_context().run,
+                    partial(_timed_call, fn, *args, **kwargs),
+                )
+        finally:
+            self._release()
+
+        self.timings.observe(f"{stage}.wait", started - submitted)
+        self.timings.observe(stage, finished - started)
+        return result
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; a later run() starts a new pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+engine = EngineExecutor(
+    mode=settings.engine_executor,
+    max_workers=settings.engine_workers,
+    max_queue=settings.engine_max_queue,
+    queue_timeout=settings.engine_queue_timeout,
+)
@@ -0,0 +1,84 @@
+"""
+Per-attempt single-flight for engine requests.
+
+Clients retry on timeout and students double-click, so the same step often
+arrives twice at once. Run independently, both calls would rebuild the model,
+estimate, and upsert the same Theta rows concurrently. AttemptFlights:
+- coalesces concurrent identical requests (same attempt, same request key)
+  onto one in-flight computation whose result every caller receives,
+- serialises different requests for the same attempt in arrival order, so a
+  step never observes a session another step is still mutating.
+
+Requests for different attempts run concurrently. Like the other service
+caches this is per worker; requests for one attempt routed to different
+workers are reconciled by the session/replay logic instead.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class _AttemptFlight:
+    """Lock and in-flight computations of one attempt."""
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    running: dict[Hashable, asyncio.Future] = field(default_factory=dict)
+
+
+class AttemptFlights:
+    """Single-flight + per-attempt serialisation of coroutine calls."""
+
+    def __init__(self):
+        self._attempts: dict[str, _AttemptFlight] = {}
+
+    def __len__(self) -> int:
+        return len(self._attempts)
+
+    async def run(
+        self,
+        attempt_id: str,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return fn()'s result, sharing it with concurrent calls for the same
+        (attempt_id, key) and running after earlier calls for attempt_id.
+
+        Args:
+            attempt_id: Attempt the request belongs to.
+            key:        Identity of the request within the attempt; equal keys
+                        are treated as the same request.
+            fn:         Coroutine function performing the request.
+        """
+        flight = self._attempts.get(attempt_id)
+        if flight is None:
+            flight = self._attempts[attempt_id] = _AttemptFlight()
+
+        task = flight.running.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(flight, fn))
+            flight.running[key] = task
+            task.add_done_callback(lambda _task: self._done(attempt_id, flight, key))
+        # shield: a cancelled waiter must not cancel the computation others share
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        """Forget every attempt (running computations are not cancelled)."""
+        self._attempts.clear()
+
+    @staticmethod
+    async def _run(flight: _AttemptFlight, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # asyncio.Lock wakes waiters in FIFO order, which keeps arrival order
+        async with flight.lock:
+            return await fn()
+
+    def _done(self, attempt_id: str, flight: _AttemptFlight, key: Hashable) -> None:
+        flight.running.pop(key, None)
+        if not flight.running and self._attempts.get(attempt_id) is flight:
+            del self._attempts[attempt_id]
+
+
+flights = AttemptFlights()
@@ -0,0 +1,69 @@
+"""
+Idempotent replay cache for serialised /init and /step responses.
+
+A retried /step (same response_id) or an /init repeated after a page refresh
+would otherwise rebuild the model, re-run estimation and upsert the Theta rows
+again. The routes keep the JSON body they returned:
+- /step per (attempt_id, response_id),
+- /init per attempt_id, dropped as soon as a step for the attempt succeeds so a
+  later /init never returns a stale first item.
+
+Each entry also stores the request body it answered; a request with the same
+key but a different body (other modules, priors or fallback answer) is a miss.
+Only successful responses are cached.
+"""
+from __future__ import annotations
+
+from ..cache import TTLCache
+from ..config import settings
+
+
+class ResultCache:
+    """LRU + TTL cache of serialised responses keyed by attempt and response."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds, sliding=False)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def get_init(self, attempt_id: str, request: str) -> str | None:
+        """Cached /init body for attempt_id answered for request, or None."""
+        return self._lookup(("init", attempt_id), request)
+
+    def put_init(self, attempt_id: str, request: str, body: str) -> None:
+        """Store the /init body returned for request."""
+        self._cache.put(("init", attempt_id), (request, body))
+
+    def get_step(self, attempt_id: str, response_id: str, request: str) -> str | None:
+        """Cached /step body for (attempt_id, response_id) answered for request, or None."""
+        return self._lookup(("step", attempt_id, response_id), request)
+
+    def put_step(self, attempt_id: str, response_id: str, request: str, body: str) -> None:
+        """Store the /step body and forget the attempt's /init body."""
+        self._cache.put(("step", attempt_id, response_id), (request, body))
+        self._cache.discard(("init", attempt_id))
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self._cache.clear()
+
+    def _lookup(self, key: tuple, request: str) -> str | None:
+        entry = self._cache.get(key)
+        if entry is None or entry[0] != request:
+            return None
+        return entry[1]
+
+
+results = ResultCache(
+    max_entries=settings.result_cache_max_entries,
+    ttl_seconds=settings.result_cache_ttl_seconds,
+)
@@ -0,0 +1,219 @@
+"""
+In-memory store of live attempt sessions.
+
+A session keeps the MultidimensionalModel built for an attempt together with
+the quiz's item bank and the attempt metadata, so that consecutive /step
+calls handled by the same worker can apply one response to the live model
+instead of rebuilding every ItemPool and replaying the whole history.
+
+Sessions are checked out with `take` for the duration of a step (so two
+concurrent steps for one attempt never mutate the same model) and returned
+with `put` once the step has been persisted. Anything missing, stale or
+evicted simply falls back to the replay path in service/core.py.
+
+With speculative steps enabled a session may also carry a Speculation: the
+outcome of both possible answers to the item just served, computed in the
+background on forks of the model. It is cancelled when the session is
+evicted or dropped.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from adaptivetesting.models import TestItem
+
+from ..cache import TTLCache
+from ..config import settings
+from ..engine.adapter import index_test_items
+from ..engine.item_bank import ArrayItemPool
+from ..models.multidimensional import MultidimensionalModel
+from .bank import QuizBank
+
+if TYPE_CHECKING:
+    from .tree import TreeNode
+
+
+@dataclass
+class Branch:
+    """
+    Engine state after one possible answer to the served item.
+
+    Attributes:
+        model:        Fork of the session's model with the answer recorded.
+        theta:        Theta per skill after the answer.
+        mastery:      Naive mastery per skill after the answer.
+        next_item:    Item selected after the answer, or None.
+        all_mastered: Whether every skill is mastered after the answer.
+    """
+    model: MultidimensionalModel
+    theta: dict[str, float]
+    mastery: dict[str, bool]
+    next_item: TestItem | None
+    all_mastered: bool
+
+
+@dataclass
+class Speculation:
+    """
+    Background computation of both branches for the item served last.
+
+    Attributes:
+        item_id: DB Item.id of the served item.
+        task:    Future resolving to {0: incorrect Branch, 1: correct Branch}.
+    """
+    item_id: str
+    task: asyncio.Future
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+
+@dataclass
+class AttemptSession:
+    """
+    Live engine state for one attempt.
+
+    Attributes:
+        attempt_id:    Primary key of the Attempt.
+        enrollment_id: Enrollment the attempt belongs to (used for theta writes).
+        quiz_id:       Quiz the attempt belongs to.
+        fixed_length:  Attempt.fixedLengthN at the time the session was built.
+        model:         The live MultidimensionalModel.
+        bank:          The quiz's QuizBank, used to build public payloads.
+        thresholds:    Mastery threshold per skill in the model.
+        prior_sigma2:  Prior variance the model was built with.
+        response_ids:  IDs of the stored Responses already applied to the model,
+                       oldest first. Used to detect sessions that fell behind
+                       the DB (e.g. a step handled by another worker).
+        indexes:       Per-skill TestItem.id -> TestItem maps, built on first use.
+        speculation:   Precomputed branches for the item served last, if any.
+        tree_node:     Node of the quiz's opening decision tree the attempt is
+                       at, while its next answer is still covered by the tree.
+    """
+    attempt_id: str
+    enrollment_id: str
+    quiz_id: str
+    fixed_length: int
+    model: MultidimensionalModel
+    bank: QuizBank
+    thresholds: dict[str, float]
+    prior_sigma2: float
+    response_ids: list[str] = field(default_factory=list)
+    indexes: dict[str, dict[Any, TestItem]] = field(default_factory=dict)
+    speculation: Speculation | None = None
+    tree_node: TreeNode | None = None
+
+    @property
+    def weight(self) -> int:
+        """Number of engine items still held by the session's pools."""
+        return sum(
+            len(uni.adaptive_test.item_pool.test_items) for uni in self.model.models.values()
+        )
+
+    def item_id_of(self, test_item: TestItem) -> str:
+        """Return the DB Item.id of a TestItem held by the session's model."""
+        return test_item.id
+
+    def find_test_item(self, skill: str, item_id: str) -> TestItem | None:
+        """
+        Return the model's TestItem for a DB Item.id in the given skill, or
+        None if the skill is not in the model or the item is not available in
+        its pool (already answered, or excluded as previously correct).
+        """
+        uni = self.model.models.get(skill)
+        if uni is None:
+            return None
+        pool = uni.adaptive_test.item_pool
+        index = self.indexes.get(skill)
+        if index is None:
+            index = self.indexes[skill] = index_test_items(pool)
+        test_item = index.get(item_id)
+        if test_item is None:
+            return None
+        if isinstance(pool, ArrayItemPool):
+            # The shared index also covers the bank's unavailable items
+            return test_item if test_item in pool.test_items else None
+        if any(t is test_item for t in uni.adaptive_test.answered_items):
+            return None
+        return test_item
+
+    async def take_branch(self, item_id: str | None, is_correct: bool = False) -> Branch | None:
+        """
+        Detach the speculation and return its branch for this answer.
+
+        Returns None when there is no answer (item_id None), no speculation,
+        a speculation for another item, or a failed one. A pending speculation
+        is always waited for, so the caller can mutate the model afterwards.
+        """
+        speculation, self.speculation = self.speculation, None
+        if speculation is None or speculation.task.cancelled():
+            return None
+        try:
+            branches = await asyncio.shield(speculation.task)
+        except Exception:
+            return None
+        if item_id is None or speculation.item_id != item_id:
+            return None
+        return branches[1 if is_correct else 0]
+
+    def drop_speculation(self) -> None:
+        """Cancel any pending speculation."""
+        if self.speculation is not None:
+            self.speculation.cancel()
+            self.speculation = None
+
+
+class SessionStore:
+    """
+    LRU + idle-TTL store of AttemptSession objects keyed by attempt_id, with a
+    cap on the total number of engine items held across all sessions.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_items: int):
+        self._cache = TTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_weight=max_items,
+            weigher=lambda session: session.weight,
+            on_evict=lambda _attempt_id, session: session.drop_speculation(),
+        )
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def take(self, attempt_id: str) -> AttemptSession | None:
+        """Check a session out of the store; the caller owns it until put()."""
+        return self._cache.pop(attempt_id)
+
+    def put(self, session: AttemptSession) -> None:
+        """Return (or add) a session to the store."""
+        self._cache.put(session.attempt_id, session)
+
+    def discard(self, attempt_id: str) -> None:
+        """Forget any cached session for attempt_id."""
+        session = self._cache.pop(attempt_id)
+        if session is not None:
+            session.drop_speculation()
+
+    def clear(self) -> None:
+        """Drop every cached session."""
+        for session in self._cache.values():
+            session.drop_speculation()
+        self._cache.clear()
+
+
+sessions = SessionStore(
+    max_entries=settings.session_cache_max_entries,
+    ttl_seconds=settings.session_cache_ttl_seconds,
+    max_items=settings.session_cache_max_items,
+)
@@ -0,0 +1,132 @@
+"""
+Per-stage wall-clock timings of the attempt pipeline.
+
+Every stage (an engine computation run through the executor, the time a
+computation waited for a worker, or a DB round trip of service/core.py) is
+recorded under a name such as "step.select", "step.select.wait" or
+"context.load". Aggregates are kept per name so they can be inspected without
+a metrics backend.
+
+Stages nested inside engine computations (e.g. "pools.build") are recorded
+from executor threads, so updates are serialised by a lock.
+
+A sampled request (see middleware.py) additionally gets a RequestTiming:
+while it is the current one (request_timing context variable, propagated to
+executor threads by service/executor.py) every observation is also appended
+to it in order. Unsampled requests only pay a context variable lookup.
+
+The module's timings instance also feeds every observation to the
+studycat_stage_duration_seconds histogram served by /v1/metrics (metrics.py).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from ..metrics import Histogram, stage_duration
+
+
+@dataclass
+class StageStats:
+    """
+    Aggregate timings of one stage.
+
+    Attributes:
+        count (int):   Number of observations.
+        total (float): Summed duration in seconds.
+        max (float):   Longest observed duration in seconds.
+    """
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class RequestTiming:
+    """
+    Stages one sampled request went through, in the order they finished.
+
+    Attributes:
+        stages: (stage name, seconds) per observation.
+    """
+    stages: list[tuple[str, float]] = field(default_factory=list)
+
+    def server_timing(self, total: float | None = None) -> str:
+        """Server-Timing header value ("name;dur=<ms>" entries), with total first if given."""
+        entries = [("total", total)] if total is not None else []
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.3f}" for name, seconds in entries + self.stages
+        )
+
+    def as_dict(self) -> dict[str, float]:
+        """Seconds per stage, summed over repeated observations."""
+        totals: dict[str, float] = {}
+        for name, seconds in self.stages:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+
+request_timing: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+class StageTimings:
+    """
+    Named StageStats, filled by observe() / measure().
+
+    Attributes:
+        histogram (Histogram | None): Optional metric, labelled by stage, that
+            also receives every observation.
+    """
+
+    def __init__(self, histogram: Histogram | None = None):
+        self._stages: dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self.histogram = histogram
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Add one duration (in seconds) to the stage's aggregates."""
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats()
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+        if self.histogram is not None:
+            self.histogram.labels(stage).observe(seconds)
+        record = request_timing.get()
+        if record is not None:
+            record.stages.append((stage, seconds))
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Time the body of a with-block as one observation of stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def snapshot(self) -> dict[str, StageStats]:
+        """Copy of the current aggregates, keyed by stage name."""
+        with self._lock:
+            return {
+                name: StageStats(s.count, s.total, s.max)
+                for name, s in sorted(self._stages.items())
+            }
+
+    def clear(self) -> None:
+        """Drop every recorded stage."""
+        with self._lock:
+            self._stages.clear()
+
+
+timings = StageTimings(histogram=stage_duration)
@@ -0,0 +1,93 @@
+"""
+Precomputed decision tree of a quiz's opening items.
+
+For a student with no stored thetas and nothing excluded, the first items of
+an attempt depend only on the quiz bank, the prior and the response pattern,
+so every such student walks one of the same few paths. An OpeningTree holds,
+for every response prefix up to depth K, the engine state after it: the
+model, theta, mastery and the item selected next.
+
+Trees are built once per (bank, concepts, thresholds, prior, estimator) and
+cached on the QuizBank (see service/core.py), so they are rebuilt whenever
+the bank is reloaded. Nodes are shared by every attempt: their models must be
+forked (engine/adapter.py:fork_model) before recording responses into them.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from ..engine.adapter import choose_next_item, determine_all_mastered, fork_model
+from ..models.multidimensional import MultidimensionalModel
+from .session import Branch
+
+
+@dataclass
+class TreeNode:
+    """
+    Engine state after one response prefix.
+
+    Attributes:
+        branch:   Model, theta, mastery, next item and all_mastered after the
+                  prefix. branch.model is shared and must not be mutated.
+        depth:    Number of responses in the prefix.
+        children: Nodes for an incorrect (0) and correct (1) answer to
+                  branch.next_item; empty at the tree's maximum depth or when
+                  no item is left.
+    """
+    branch: Branch
+    depth: int
+    children: dict[int, TreeNode] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        """Number of nodes in the subtree rooted here."""
+        return 1 + sum(child.size for child in self.children.values())
+
+    def child(self, item_id: str, is_correct: bool) -> TreeNode | None:
+        """The node reached by answering item_id, or None if it is off the tree."""
+        item = self.branch.next_item
+        if not self.children or item is None or item.id != item_id:
+            return None
+        return self.children[1 if is_correct else 0]
+
+
+def _node(
+    model: MultidimensionalModel,
+    thresholds: dict[str, float],
+    depth: int,
+    max_depth: int,
+) -> TreeNode:
+    theta = {s: m.get_theta() for s, m in model.models.items()}
+    next_item, skill = choose_next_item(model)
+    node = TreeNode(
+        branch=Branch(
+            model=model,
+            theta=theta,
+            mastery={s: theta[s] > thresholds[s] for s in theta},
+            next_item=next_item,
+            all_mastered=determine_all_mastered(model),
+        ),
+        depth=depth,
+    )
+    if next_item is not None and depth < max_depth:
+        for response in (0, 1):
+            fork = fork_model(model)
+            fork.models[skill].record_response(response, next_item)
+            node.children[response] = _node(fork, thresholds, depth + 1, max_depth)
+    return node
+
+
+def build_tree(
+    model: MultidimensionalModel,
+    thresholds: dict[str, float],
+    depth: int,
+) -> TreeNode:
+    """
+    Expand every response pattern of length up to depth from a fresh model.
+
+    The root holds the first item; a node at depth d holds the state after d
+    responses and the item selected next, so the tree covers 2**(depth+1) - 1
+    states. model is owned by the tree afterwards.
+    """
+    return _node(model, thresholds, 0, depth)
+
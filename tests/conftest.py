@@ -7,7 +7,8 @@ pytest fixture that returns the callable, allowing tests to call them with
 arbitrary arguments via normal function-call syntax.
 """
 
-from unittest.mock import MagicMock
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -74,18 +75,22 @@ def _make_quiz_module(module_id="math", threshold=1.5):
     return qm
 
 
-def _make_attempt(quiz_id="quiz1", enrollment_id="enr1", fixed_length=5):
+def _make_attempt(quiz_id="quiz1", enrollment_id="enr1", fixed_length=5, quiz_modules=None):
     """
-    Build a MagicMock that mimics a Prisma Attempt record.
+    Build a MagicMock that mimics a Prisma Attempt record with its quiz
+    included.
 
     fixed_length controls how many responses are allowed before step_attempt
     stops issuing new items. Set it to 1 in tests that want to verify the
     finished=True path, or to a large number to keep the test running.
+    quiz_modules become attempt.quiz.quizModules, which carry the mastery
+    thresholds; by default a single 'math' module from _make_quiz_module().
     """
     a = MagicMock()
     a.quizId       = quiz_id
     a.enrollmentId = enrollment_id
     a.fixedLengthN = fixed_length
+    a.quiz.quizModules = quiz_modules if quiz_modules is not None else [_make_quiz_module()]
     return a
 
 
@@ -105,6 +110,83 @@ def _make_response(response_id, db_item, is_correct=True):
     return r
 
 
+def _make_item_lookup(*db_items):
+    """
+    Build an AsyncMock standing in for repo.get_item_by_id over the given DB
+    item mocks.
+
+    The item bank is loaded without options, so core.py fetches the content
+    of the selected item by ID when building its public payload. Unknown IDs
+    resolve to None, like the real query.
+    """
+    by_id = {item.id: item for item in db_items}
+
+    async def get_item_by_id(item_id):
+        return by_id.get(item_id)
+
+    return AsyncMock(side_effect=get_item_by_id)
+
+
+async def _run_attempt(items, quiz_module, attempt, answers, thetas=None,
+                       attempt_id="attempt1"):
+    """
+    Drive one attempt end to end through init_attempt and step_attempt with
+    the repo patched over the given DB item mocks.
+
+    Each served item is answered with the next value of answers (True for
+    correct) through a stored Response, so every step takes the normal
+    response_id path. thetas are the enrollment's stored thetas.
+
+    Returns:
+        (first item ID, [(theta, mastery, next item ID, is_finished,
+        all_mastered) per step])
+    """
+    from studycat_service.service.core import init_attempt, step_attempt
+
+    by_id = {it.id: it for it in items}
+    responses = {}
+
+    async def get_response(response_id):
+        return responses.get(response_id)
+
+    async def list_response_ids(attempt_id):
+        return list(responses)
+
+    attempt.quiz.quizModules = [quiz_module]
+    results = []
+    with ExitStack() as stack:
+        for name, value in {
+            "get_attempt": attempt,
+            "list_eligible_items_for_quiz": items,
+            "get_thetas_for_enrollment": thetas or {},
+            "get_correct_item_ids_for_enrollment_and_quiz": set(),
+            "persist_step_results": None,
+        }.items():
+            stack.enter_context(patch(
+                f"studycat_service.service.core.repo.{name}", AsyncMock(return_value=value)))
+        stack.enter_context(patch(
+            "studycat_service.service.core.repo.get_response_by_id",
+            AsyncMock(side_effect=get_response)))
+        stack.enter_context(patch(
+            "studycat_service.service.core.repo.list_response_ids",
+            AsyncMock(side_effect=list_response_ids)))
+        stack.enter_context(patch(
+            "studycat_service.service.core.repo.get_item_by_id", _make_item_lookup(*items)))
+
+        _, served = await init_attempt(attempt_id, None, None, None)
+        first = served.item_id
+        for n, correct in enumerate(answers, start=1):
+            response_id = f"{attempt_id}-resp{n}"
+            responses[response_id] = _make_response(
+                response_id, by_id[served.item_id], is_correct=correct)
+            theta, mastery, served, finished, mastered = await step_attempt(
+                attempt_id, response_id)
+            results.append((theta, mastery, served and served.item_id, finished, mastered))
+            if served is None:
+                break
+    return first, results
+
+
 # --- fixtures ---
 
 @pytest.fixture
@@ -130,3 +212,44 @@ def make_attempt():
 @pytest.fixture
 def make_response():
     return _make_response
+
+
+@pytest.fixture
+def item_lookup():
+    return _make_item_lookup
+
+
+@pytest.fixture
+def run_attempt():
+    return _run_attempt
+
+
+@pytest.fixture(autouse=True)
+def _reset_service_caches():
+    """
+    Clear the service's in-process caches around every test so that state
+    built by one test (e.g. an attempt session created by init_attempt) never
+    leaks into another test that reuses the same attempt or quiz IDs.
+    """
+    from studycat_service.service.bank import banks, estimates
+    from studycat_service.service.exclusions import correct_items
+    from studycat_service.service.flights import flights
+    from studycat_service.service.results import results
+    from studycat_service.service.session import sessions
+    from studycat_service.service.timing import timings
+
+    sessions.clear()
+    banks.clear()
+    estimates.clear()
+    correct_items.clear()
+    flights.clear()
+    results.clear()
+    timings.clear()
+    yield
+    sessions.clear()
+    banks.clear()
+    estimates.clear()
+    correct_items.clear()
+    flights.clear()
+    results.clear()
+    timings.clear()
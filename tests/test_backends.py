@@ -0,0 +1,144 @@
+"""
+Tests for the repository backends (db/backend.py, db/sqlite.py).
+
+The SQLite repository must answer the query surface exactly like the
+in-memory one for the same seeded data, run the service end to end, and be
+selectable through open_repository().
+"""
+from __future__ import annotations
+
+import pytest
+
+
+def _seed_both(tmp_path):
+    """Seed a MemoryRepository and a SQLiteRepository with the same quiz and answers."""
+    from studycat_service.db.memory import MemoryRepository
+    from studycat_service.db.sqlite import SQLiteRepository
+    from studycat_service.db.synthetic import seed_attempts, seed_quiz
+
+    repositories = [MemoryRepository(), SQLiteRepository(str(tmp_path / "bank.sqlite3"))]
+    for repository in repositories:
+        quiz = seed_quiz(repository, n_modules=2, items_per_module=6, seed=5)
+        attempt = seed_attempts(repository, quiz.id, 1, fixed_length=3)[0]
+        repository.add_response(attempt.id, f"{quiz.id}-{quiz.id}-module0-0", True)
+        repository.add_response(attempt.id, f"{quiz.id}-{quiz.id}-module1-2", False)
+    return repositories, quiz, attempt
+
+
+class TestSQLiteRepository:
+    """SQLiteRepository against MemoryRepository on the same data."""
+
+    @pytest.mark.asyncio
+    async def test_queries_match_memory_repository(self, tmp_path):
+        """
+        Attempts (with their quiz), eligible items, responses, correct items
+        and items with options come back the same from both repositories.
+        """
+        (memory, sqlite), quiz, attempt = _seed_both(tmp_path)
+        try:
+            for name, args in [
+                ("get_attempt", (attempt.id,)),
+                ("list_response_ids", (attempt.id,)),
+                ("get_correct_item_ids_for_enrollment_and_quiz", (attempt.enrollmentId, quiz.id)),
+            ]:
+                assert await getattr(sqlite, name)(*args) == await getattr(memory, name)(*args)
+
+            eligible = await sqlite.list_eligible_items_for_quiz(quiz.id)
+            expected = await memory.list_eligible_items_for_quiz(quiz.id)
+            assert sorted(i.id for i in eligible) == sorted(i.id for i in expected)
+
+            responses = await sqlite.list_responses(attempt.id)
+            assert [(r.item.moduleId, r.isCorrect) for r in responses] == [
+                (r.item.moduleId, r.isCorrect) for r in await memory.list_responses(attempt.id)
+            ]
+            item_id = responses[0].itemId
+            assert await sqlite.get_item_by_id(item_id) == await memory.get_item_by_id(item_id)
+            assert await sqlite.get_attempt("missing") is None
+        finally:
+            sqlite.close()
+
+    @pytest.mark.asyncio
+    async def test_writes_are_visible_and_upserted(self, tmp_path):
+        """
+        persist_step_results upserts thetas (updating rows a previous step
+        wrote) and stores the snapshot and checkpoint; a module filter narrows
+        get_thetas_for_enrollment.
+        """
+        (_, sqlite), _, attempt = _seed_both(tmp_path)
+        try:
+            response_id = (await sqlite.list_response_ids(attempt.id))[0]
+            await sqlite.persist_step_results("enr", {"m1": 0.1})
+            await sqlite.persist_step_results(
+                "enr", {"m1": 0.5, "m2": -0.5},
+                response_id=response_id, snapshot="{}",
+                attempt_id=attempt.id, checkpoint="ckpt",
+            )
+
+            assert await sqlite.get_thetas_for_enrollment("enr") == {"m1": 0.5, "m2": -0.5}
+            assert await sqlite.get_thetas_for_enrollment("enr", ["m2"]) == {"m2": -0.5}
+            assert (await sqlite.get_response_by_id(response_id)).engineMasterySnapshot == "{}"
+            assert (await sqlite.get_attempt(attempt.id)).engineCheckpoint == "ckpt"
+        finally:
+            sqlite.close()
+
+    @pytest.mark.asyncio
+    async def test_drives_service_end_to_end(self, tmp_path):
+        """init_attempt and step_attempt complete an attempt over SQLite."""
+        from studycat_service.db.sqlite import SQLiteRepository
+        from studycat_service.db.synthetic import seed_attempts, seed_quiz
+        from studycat_service.service import core
+
+        sqlite = SQLiteRepository(str(tmp_path / "service.sqlite3"))
+        quiz = seed_quiz(sqlite, n_modules=2, items_per_module=8)
+        attempt = seed_attempts(sqlite, quiz.id, 1, fixed_length=3)[0]
+        try:
+            with sqlite.installed():
+                _, item = await core.init_attempt(attempt.id, None, None, None)
+                for _ in range(3):
+                    response = sqlite.add_response(attempt.id, item.item_id, False)
+                    _, _, item, finished, _ = await core.step_attempt(attempt.id, response.id)
+            thetas = await sqlite.get_thetas_for_enrollment(attempt.enrollmentId)
+        finally:
+            sqlite.close()
+
+        assert finished and item is None
+        assert len(thetas) == 2 and min(thetas.values()) < 0.0
+
+
+class TestOpenRepository:
+    """Backend selection by name."""
+
+    @pytest.mark.asyncio
+    async def test_sqlite_backend_seeded_once_and_installed(self, tmp_path, monkeypatch):
+        """
+        The sqlite backend seeds an empty file with the synthetic settings,
+        installs itself (metered) for service/core.py, and reuses the data
+        next time.
+        """
+        from studycat_service.config import settings
+        from studycat_service.db.backend import open_repository
+        from studycat_service.service import core
+
+        monkeypatch.setattr(settings, "sqlite_path", str(tmp_path / "local.sqlite3"))
+        monkeypatch.setattr(settings, "synthetic_items_per_module", 4)
+        monkeypatch.setattr(settings, "synthetic_attempts", 2)
+        original = core.repo
+
+        async with open_repository("sqlite") as repository:
+            assert core.repo.repository is repository
+            attempt = await repository.get_attempt("quiz-attempt1")
+            repository.add_response(attempt.id, "quiz-quiz-module0-0", True)
+        async with open_repository("sqlite") as repository:
+            assert await repository.list_response_ids(attempt.id) == ["quiz-attempt1-r0"]
+
+        assert core.repo is original
+        assert attempt.fixedLengthN == settings.synthetic_attempt_length
+
+    @pytest.mark.asyncio
+    async def test_unknown_backend_rejected(self):
+        """Only the listed backends can be opened."""
+        from studycat_service.db.backend import open_repository
+
+        with pytest.raises(ValueError):
+            async with open_repository("mongodb"):
+                pass
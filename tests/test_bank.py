@@ -0,0 +1,121 @@
+"""
+Tests for the per-quiz item bank cache (service/bank.py).
+
+The cache must load a quiz's bank once per version, share a single load
+between concurrent requests, and hand out fresh ItemPools on every call so
+one attempt's model never mutates another's pool.
+"""
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from studycat_service.service.bank import BankCache
+
+
+def _bank_loader(make_db_item, calls: list):
+    """Build a loader that records its calls and returns a two-concept bank."""
+    from studycat_service.service.bank import QuizBank
+    from studycat_service.service.core import _build_item_pools
+
+    async def loader(quiz_id, version):
+        calls.append((quiz_id, version))
+        await asyncio.sleep(0)
+        items = [
+            make_db_item("math",    item_id="m1"),
+            make_db_item("math",    item_id="m2", b=1.0),
+            make_db_item("reading", item_id="r1"),
+        ]
+        concepts, pools, ti2id, ti2skill = _build_item_pools(items)
+        return QuizBank(
+            quiz_id=quiz_id,
+            version=version,
+            items=items,
+            concepts=concepts,
+            test_items={c: list(p.test_items) for c, p in pools.items()},
+            testitem_to_itemid=ti2id,
+            testitem_to_skill=ti2skill,
+        )
+
+    return loader
+
+
+class TestBankCache:
+    """BankCache versioning, single-flight loading and pool building."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, make_db_item):
+        """
+        Fifty concurrent requests for the same quiz and version must trigger
+        exactly one loader call and all receive the same bank object.
+        """
+        calls = []
+        cache = BankCache(max_entries=8, ttl_seconds=60)
+        loader = _bank_loader(make_db_item, calls)
+
+        results = await asyncio.gather(*(cache.get("quiz1", "v1", loader) for _ in range(50)))
+
+        assert len(calls) == 1
+        assert all(bank is results[0] for bank in results)
+
+    @pytest.mark.asyncio
+    async def test_new_version_reloads(self, make_db_item):
+        """
+        A request presenting a different version than the cached bank was
+        loaded with must trigger a reload; the same version must not.
+        """
+        calls = []
+        cache = BankCache(max_entries=8, ttl_seconds=60)
+        loader = _bank_loader(make_db_item, calls)
+
+        await cache.get("quiz1", "v1", loader)
+        await cache.get("quiz1", "v1", loader)
+        bank = await cache.get("quiz1", "v2", loader)
+
+        assert calls == [("quiz1", "v1"), ("quiz1", "v2")]
+        assert bank.version == "v2"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_reload(self, make_db_item):
+        """invalidate() drops the entry so the next get() loads again."""
+        calls = []
+        cache = BankCache(max_entries=8, ttl_seconds=60)
+        loader = _bank_loader(make_db_item, calls)
+
+        await cache.get("quiz1", "v1", loader)
+        cache.invalidate("quiz1")
+        await cache.get("quiz1", "v1", loader)
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_build_pools_returns_fresh_pools(self, make_db_item):
+        """
+        Two calls to build_pools must return independent ItemPool objects, so
+        deleting an item from one never affects the other.
+        """
+        cache = BankCache(max_entries=8, ttl_seconds=60)
+        bank = await cache.get("quiz1", "v1", _bank_loader(make_db_item, []))
+
+        _, first, _, _ = bank.build_pools()
+        _, second, _, _ = bank.build_pools()
+        first["math"].delete_item(first["math"].test_items[0])
+
+        assert len(second["math"].test_items) == 2
+
+    @pytest.mark.asyncio
+    async def test_build_pools_for_filtered_items(self, make_db_item):
+        """
+        Passing an exclusion mask (e.g. previously correct items) leaves the
+        masked items out, and drops concepts left empty.
+        """
+        cache = BankCache(max_entries=8, ttl_seconds=60)
+        bank = await cache.get("quiz1", "v1", _bank_loader(make_db_item, []))
+
+        excluded = np.array([it.id != "m2" for it in bank.items])
+        concepts, pools, ti2id, _ = bank.build_pools(excluded)
+
+        assert concepts == ["math"]
+        assert [ti2id[t] for t in pools["math"].test_items] == ["m2"]
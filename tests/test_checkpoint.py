@@ -0,0 +1,241 @@
+"""
+Tests for engine/checkpoint.py and the checkpoint-based cold resume in
+service/core.py.
+
+A checkpoint must restore a model to the same state the live model had
+(theta, answered items, pool contents, mastery) without re-running the
+estimator, and must be ignored when it is stale or from another version.
+"""
+from __future__ import annotations
+
+import json
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from adaptivetesting.models import ItemPool
+
+
+def _bank():
+    """Three math items keyed by a DB-style id, plus the id lookup used by checkpoints."""
+    from studycat_service.engine.adapter import _make_test_item
+
+    items = {
+        "m1": _make_test_item(a=1.0, b=-1.0, c=0.2),
+        "m2": _make_test_item(a=1.0, b=0.0,  c=0.2),
+        "m3": _make_test_item(a=1.0, b=1.0,  c=0.2),
+    }
+    ids = {ti.id: item_id for item_id, ti in items.items()}
+    return items, (lambda t: ids[t.id])
+
+
+def _model(items):
+    from studycat_service.engine.adapter import build_multidim_model
+
+    return build_multidim_model(
+        concepts=["math"],
+        pools_by_concept={"math": ItemPool(list(items.values()))},
+        prior_mu=0.3,
+        prior_sigma2=1.0,
+        mastery_thresholds={"math": 2.0},
+    )
+
+
+class TestCheckpointRoundTrip:
+    """capture -> dump -> load -> restore reproduces the live model's state."""
+
+    def test_restored_model_matches_live_model(self, pool_items):
+        """
+        After two responses, the restored model must report the same theta,
+        the same response pattern and a pool without the answered items.
+        """
+        from studycat_service.engine.checkpoint import (
+            capture_checkpoint,
+            dump_checkpoint,
+            load_checkpoint,
+            restore_model,
+        )
+
+        items, item_id_of = _bank()
+        live = _model(items)
+        live_items = pool_items(live.models["math"])
+        live.models["math"].record_response(1, live_items[0])
+        live.models["math"].record_response(0, live_items[2])
+
+        raw = dump_checkpoint(capture_checkpoint(live, item_id_of, ["r1", "r2"], 1.0))
+        restored = restore_model(
+            load_checkpoint(raw),
+            {"math": ItemPool(list(items.values()))},
+            {"math": 2.0},
+            item_id_of,
+        )
+
+        uni = restored.models["math"]
+        assert uni.get_theta() == pytest.approx(live.models["math"].get_theta())
+        assert uni.adaptive_test.response_pattern == [1, 0]
+        assert [item_id_of(t) for t in uni.adaptive_test.item_pool.test_items] == ["m2"]
+        assert uni.initial_theta == pytest.approx(0.3)
+
+    def test_unknown_version_is_ignored(self):
+        """A checkpoint written by another format version loads as None."""
+        from studycat_service.engine.checkpoint import load_checkpoint
+
+        assert load_checkpoint(json.dumps({"v": 999, "s2": 1.0, "r": [], "k": {}})) is None
+        assert load_checkpoint("not json") is None
+        assert load_checkpoint(None) is None
+
+    def test_missing_item_aborts_restore(self):
+        """
+        If an administered item is no longer in the pool (the bank changed),
+        restore_model returns None so the caller falls back to replay.
+        """
+        from studycat_service.engine.checkpoint import (
+            EngineCheckpoint,
+            SkillState,
+            restore_model,
+        )
+
+        items, item_id_of = _bank()
+        checkpoint = EngineCheckpoint(
+            prior_sigma2=1.0,
+            response_ids=["r1"],
+            skills={"math": SkillState(0.0, 0.5, 0.9, ["gone"], [1], False)},
+        )
+        assert restore_model(
+            checkpoint, {"math": ItemPool(list(items.values()))}, {"math": 2.0}, item_id_of
+        ) is None
+
+
+class TestCheckpointResume:
+    """step_attempt restores from Attempt.engineCheckpoint instead of replaying."""
+
+    @pytest.mark.asyncio
+    async def test_cold_step_uses_checkpoint(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        make_response,
+        ):
+        """
+        With checkpoints enabled and no cached session, a step whose checkpoint
+        covers every earlier stored response must not call list_responses and
+        must persist a new checkpoint that includes the current response.
+        """
+        from studycat_service.engine.checkpoint import load_checkpoint
+        from studycat_service.service.core import step_attempt
+
+        db_items = [
+            make_db_item("math", item_id="m1", b=-1.0),
+            make_db_item("math", item_id="m2", b=0.0),
+        ]
+        attempt = make_attempt(fixed_length=5, quiz_modules=[make_quiz_module(threshold=3.0)])
+        attempt.engineCheckpoint = json.dumps({
+            "v": 1, "s2": 1.0, "r": ["resp0"],
+            "k": {"math": [0.0, 0.6, 0.8, ["m1"], [1], 0]},
+        })
+        response = make_response("resp1", db_items[1], is_correct=True)
+        save = AsyncMock()
+        list_responses = AsyncMock(return_value=[])
+
+        with ExitStack() as stack:
+            stack.enter_context(patch(
+                "studycat_service.service.core.settings.engine_checkpoints", True))
+            for name, value in {
+                "get_attempt": attempt,
+                "list_eligible_items_for_quiz": db_items,
+                "get_thetas_for_enrollment": {},
+                "list_response_ids": ["resp0", "resp1"],
+                "get_response_by_id": response,
+            }.items():
+                stack.enter_context(patch(
+                    f"studycat_service.service.core.repo.{name}",
+                    AsyncMock(return_value=value)))
+            stack.enter_context(patch(
+                "studycat_service.service.core.repo.list_responses", list_responses))
+            stack.enter_context(patch(
+                "studycat_service.service.core.repo.persist_step_results", save))
+
+            theta, _, _, is_finished, _ = await step_attempt("attempt1", "resp1")
+
+        list_responses.assert_not_awaited()
+        saved = load_checkpoint(save.await_args.kwargs["checkpoint"])
+        assert saved.response_ids == ["resp0", "resp1"]
+        assert saved.skills["math"].item_ids == ["m1", "m2"]
+        assert theta["math"] > 0.0
+        assert is_finished is True  # both items of the bank have been answered
+
+    @pytest.mark.asyncio
+    async def test_cold_step_uses_checkpoint_on_no_repeat_quiz(self, monkeypatch):
+        """
+        On a quiz without repeats, the attempt's own correct answers do not
+        stop the checkpoint from being restored: the cold step does not
+        replay, and ends with the same theta and next item as a warm step.
+        """
+        from studycat_service.config import settings
+        from studycat_service.db.memory import MemoryRepository
+        from studycat_service.db.synthetic import seed_attempts, seed_quiz
+        from studycat_service.service.core import init_attempt, step_attempt
+        from studycat_service.service.session import sessions
+
+        monkeypatch.setattr(settings, "engine_checkpoints", True)
+
+        async def run(prefix, cold):
+            repository = MemoryRepository()
+            quiz = seed_quiz(repository, n_modules=2, items_per_module=10, repeat_correct=False)
+            (attempt,) = seed_attempts(repository, quiz.id, 1, fixed_length=5, prefix=prefix)
+            with repository.installed():
+                _, item = await init_attempt(attempt.id, None, None, None)
+                for is_correct in (True, True):
+                    response = repository.add_response(attempt.id, item.item_id, is_correct)
+                    theta, _, item, _, _ = await step_attempt(attempt.id, response.id)
+                if cold:
+                    sessions.clear()
+                response = repository.add_response(attempt.id, item.item_id, False)
+                theta, _, item, _, _ = await step_attempt(attempt.id, response.id)
+            return repository, theta, item.item_id
+
+        cold, cold_theta, cold_item = await run("cold", cold=True)
+        _, warm_theta, warm_item = await run("warm", cold=False)
+
+        assert cold.calls["list_responses"] == 0
+        assert cold_theta == pytest.approx(warm_theta)
+        assert cold_item == warm_item
+
+    @pytest.mark.asyncio
+    async def test_replay_seeds_from_recorded_prior(self, monkeypatch):
+        """
+        When a checkpoint cannot be restored (e.g. the bank changed), the
+        replay starts from the prior recorded on it rather than from thetas
+        the attempt's own steps already updated. The same answers give the
+        same theta and next item whether or not every step is cold.
+        """
+        from studycat_service.config import settings
+        from studycat_service.db.memory import MemoryRepository
+        from studycat_service.db.synthetic import seed_attempts, seed_quiz
+        from studycat_service.service import core
+        from studycat_service.service.core import init_attempt, step_attempt
+        from studycat_service.service.session import sessions
+
+        monkeypatch.setattr(settings, "engine_checkpoints", True)
+        monkeypatch.setattr(core, "restore_model", lambda *args, **kwargs: None)
+
+        async def run(prefix, cold):
+            repository = MemoryRepository()
+            quiz = seed_quiz(repository, n_modules=2, items_per_module=10)
+            (attempt,) = seed_attempts(repository, quiz.id, 1, fixed_length=6, prefix=prefix)
+            with repository.installed():
+                _, item = await init_attempt(attempt.id, None, None, None)
+                for is_correct in (True, False, True, True):
+                    if cold:
+                        sessions.clear()
+                    response = repository.add_response(attempt.id, item.item_id, is_correct)
+                    theta, _, item, _, _ = await step_attempt(attempt.id, response.id)
+            return repository, theta, item.item_id
+
+        cold, cold_theta, cold_item = await run("cold", cold=True)
+        _, warm_theta, warm_item = await run("warm", cold=False)
+
+        assert cold.calls["list_responses"] == 4
+        assert cold_theta == pytest.approx(warm_theta)
+        assert cold_item == warm_item
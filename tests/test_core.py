@@ -1,12 +1,13 @@
 """
 Tests for service/core.py - label helpers, snapshot payload, public item
-payload, init_attempt, and step_attempt.
+payload, quiz context loading, init_attempt, and step_attempt.
 
 The orchestration tests (init_attempt, step_attempt) mock every repo call so
 the tests run without a database and focus purely on the logic inside core.py.
 """
 from __future__ import annotations
 
+import asyncio
 import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -183,7 +184,8 @@ class TestInitAttempt:
         self,
         make_db_item,
         make_quiz_module,
-        make_attempt
+        make_attempt,
+        item_lookup,
         ):
         """
         Happy-path: given a valid attempt, one eligible item, no prior theta
@@ -194,30 +196,35 @@ class TestInitAttempt:
         """
         from studycat_service.service.core import init_attempt
 
+        db_item = make_db_item()
         with patch("studycat_service.service.core.repo.get_attempt",
                    new_callable=AsyncMock,
-                   return_value=make_attempt()), \
+                   return_value=make_attempt()) as get_attempt, \
              patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
                    new_callable=AsyncMock,
-                   return_value=[make_db_item()]), \
+                   return_value=[db_item]), \
              patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
                    new_callable=AsyncMock,
-                   return_value={}), \
-             patch("studycat_service.service.core.repo.get_quiz_modules",
-                   new_callable=AsyncMock,
-                   return_value=[make_quiz_module()]), \
-             patch("studycat_service.service.core.repo.get_quiz",
-                   new_callable=AsyncMock,
-                   return_value=MagicMock(allowRepeatCorrect=False)):
+                   return_value={}) as get_thetas, \
+             patch("studycat_service.service.core.repo.get_item_by_id",
+                   item_lookup(db_item)):
 
             theta, public = await init_attempt("attempt1", ["math"], None, None)
 
+        get_attempt.assert_awaited_once_with("attempt1")
+        get_thetas.assert_awaited_once_with("enr1")
         assert "math" in theta
         assert public is not None
         assert public.skill == "math"
 
     @pytest.mark.asyncio
-    async def test_existing_thetas_seed_model(self, make_db_item, make_quiz_module, make_attempt):
+    async def test_existing_thetas_seed_model(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        item_lookup,
+        ):
         """
         When the enrollment already has a stored theta for a skill (from a
         previous session), init_attempt must load that value into the model
@@ -227,27 +234,63 @@ class TestInitAttempt:
         """
         from studycat_service.service.core import init_attempt
 
+        db_item = make_db_item()
         with patch("studycat_service.service.core.repo.get_attempt",
                    new_callable=AsyncMock,
-                   return_value=make_attempt()), \
+                   return_value=make_attempt()) as get_attempt, \
              patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
-                   new_callable=AsyncMock, return_value=[make_db_item()]), \
+                   new_callable=AsyncMock, return_value=[db_item]), \
              patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
                    new_callable=AsyncMock,
-                   return_value={"math": 1.8}), \
-             patch("studycat_service.service.core.repo.get_quiz_modules",
-                   new_callable=AsyncMock,
-                   return_value=[make_quiz_module()]), \
-             patch("studycat_service.service.core.repo.get_quiz",
-                   new_callable=AsyncMock,
-                   return_value=MagicMock(allowRepeatCorrect=False)):
+                   return_value={"math": 1.8}) as get_thetas, \
+             patch("studycat_service.service.core.repo.get_item_by_id",
+                   item_lookup(db_item)):
 
             theta, _ = await init_attempt("attempt1", ["math"], 0.0, 1.0)
 
+        get_attempt.assert_awaited_once_with("attempt1")
+        get_thetas.assert_awaited_once_with("enr1")
         assert abs(theta["math"] - 1.8) < 1e-4, (
             f"Expected seeded theta 1.8, got {theta['math']}"
         )
 
+    @pytest.mark.asyncio
+    async def test_item_content_fetched_once_per_bank(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        item_lookup,
+        ):
+        """
+        The bank holds items without options, so the selected item's content
+        is fetched by ID. Two attempts on the same quiz that are served the
+        same first item must only fetch its content once; the payload is
+        cached on the shared bank.
+        """
+        from studycat_service.service.core import init_attempt
+
+        db_item  = make_db_item()
+        attempt  = make_attempt()
+        get_item = item_lookup(db_item)
+        with patch("studycat_service.service.core.repo.get_attempt",
+                   new_callable=AsyncMock,
+                   return_value=attempt), \
+             patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
+                   new_callable=AsyncMock,
+                   return_value=[db_item]), \
+             patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
+                   new_callable=AsyncMock,
+                   return_value={}), \
+             patch("studycat_service.service.core.repo.get_item_by_id", get_item):
+
+            _, first = await init_attempt("attempt1", None, None, None)
+            _, second = await init_attempt("attempt2", None, None, None)
+
+        get_item.assert_awaited_once_with(db_item.id)
+        assert first == second
+        assert first.stem == "A question"
+
     @pytest.mark.asyncio
     async def test_no_items_returns_empty(self, make_attempt):
         """
@@ -260,16 +303,18 @@ class TestInitAttempt:
 
         with patch("studycat_service.service.core.repo.get_attempt",
                    new_callable=AsyncMock,
-                   return_value=make_attempt()), \
+                   return_value=make_attempt(quiz_modules=[])) as get_attempt, \
              patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
                    new_callable=AsyncMock,
                    return_value=[]), \
-             patch("studycat_service.service.core.repo.get_quiz",
+             patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
                    new_callable=AsyncMock,
-                   return_value=MagicMock(allowRepeatCorrect=False)):
+                   return_value={}) as get_thetas:
 
             theta, public = await init_attempt("attempt1", None, None, None)
 
+        get_attempt.assert_awaited_once_with("attempt1")
+        get_thetas.assert_awaited_once_with("enr1")
         assert theta  == {}
         assert public is None
 
@@ -289,6 +334,107 @@ class TestInitAttempt:
                 await init_attempt("bad", None, None, None)
 
 
+# ---------------------------------------------------------------------------
+# _load_quiz_context
+# ---------------------------------------------------------------------------
+
+class TestQuizContext:
+    """
+    _load_quiz_context reads the attempt first, then fetches the bank, thetas
+    and previously correct item IDs concurrently, reading the quiz row and its
+    modules only once (as part of the attempt).
+    """
+
+    @pytest.mark.asyncio
+    async def test_independent_queries_run_concurrently(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        ):
+        """
+        Every query after get_attempt should be in flight at the same time,
+        the attempt is read once, and the bank loader must receive the
+        attempt's quiz so it does not read it again.
+        """
+        from studycat_service.service.core import _load_quiz_context
+
+        attempt = make_attempt()
+        attempt.quiz.repeatCorrectQuestions = False
+        in_flight = peak = 0
+
+        def concurrent_mock(value):
+            async def fetch(*args, **kwargs):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0)
+                in_flight -= 1
+                return value
+            return AsyncMock(side_effect=fetch)
+
+        list_items = concurrent_mock([make_db_item(item_id="m1")])
+        with patch("studycat_service.service.core.repo.get_attempt",
+                   new_callable=AsyncMock,
+                   return_value=attempt) as get_attempt, \
+             patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
+                   list_items), \
+             patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
+                   concurrent_mock({"math": 0.4})), \
+             patch("studycat_service.service.core.repo.get_correct_item_ids_for_enrollment_and_quiz",
+                   concurrent_mock(set())):
+
+            ctx = await _load_quiz_context("attempt1")
+
+        assert peak == 3
+        get_attempt.assert_awaited_once_with("attempt1")
+        assert list_items.await_args.kwargs["quiz"] is attempt.quiz
+        assert ctx.thresholds == {"math": 1.5}
+        assert ctx.thetas == {"math": 0.4}
+
+    @pytest.mark.asyncio
+    async def test_previously_correct_items_removed(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        ):
+        """
+        When the attempt's quiz disallows repeats, items the student already
+        answered correctly are masked out in ctx.excluded (the cached bank
+        keeps them); when every item was answered correctly, no items are left.
+        """
+        from studycat_service.service.core import _load_quiz_context
+
+        items = [make_db_item(item_id="m1"), make_db_item(item_id="m2")]
+
+        async def load(enrollment_id, correct_ids):
+            attempt = make_attempt(enrollment_id=enrollment_id)
+            attempt.quiz.repeatCorrectQuestions = False
+            with patch("studycat_service.service.core.repo.get_attempt",
+                       new_callable=AsyncMock,
+                       return_value=attempt), \
+                 patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
+                       new_callable=AsyncMock,
+                       return_value=items), \
+                 patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
+                       new_callable=AsyncMock,
+                       return_value={}), \
+                 patch("studycat_service.service.core.repo.get_correct_item_ids_for_enrollment_and_quiz",
+                       new_callable=AsyncMock,
+                       return_value=correct_ids):
+                return await _load_quiz_context("attempt1")
+
+        ctx = await load("enr1", {"m1"})
+        kept = [it.id for it, drop in zip(ctx.bank.items, ctx.excluded, strict=True) if not drop]
+        assert kept == ["m2"]
+        assert ctx.has_items is True
+        assert len(ctx.bank.items) == 2
+
+        ctx = await load("enr2", {"m1", "m2"})
+        assert ctx.has_items is False
+
+
 # ---------------------------------------------------------------------------
 # step_attempt
 # ---------------------------------------------------------------------------
@@ -299,9 +445,8 @@ class TestStepAttempt:
     the IRT model state, applies the latest response, persists theta and a
     snapshot, and returns the next item (or signals completion).
 
-    All repo calls are mocked. The DB item mock uses matching IRT parameters
-    so _find_test_item_by_irt_params can locate the correct TestItem when
-    replaying.
+    All repo calls are mocked. Answered items are located in the model by
+    their DB Item.id (carried on TestItem.id) when replaying.
     """
 
     @pytest.mark.asyncio
@@ -321,37 +466,31 @@ class TestStepAttempt:
         """
         from studycat_service.service.core import step_attempt
 
-        attempt  = make_attempt(fixed_length=5)
+        attempt  = make_attempt(fixed_length=5, quiz_modules=[make_quiz_module(threshold=2.0)])
         db_item  = make_db_item()
         response = make_response("resp1", db_item, is_correct=True)
         with patch("studycat_service.service.core.repo.get_attempt",
                    new_callable=AsyncMock,
-                   return_value=attempt), \
+                   return_value=attempt) as get_attempt, \
              patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
                    new_callable=AsyncMock,
                    return_value=[db_item]), \
-             patch("studycat_service.service.core.repo.get_quiz_modules",
-                   new_callable=AsyncMock,
-                   return_value=[make_quiz_module(threshold=2.0)]), \
              patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
                    new_callable=AsyncMock,
-                   return_value={}), \
+                   return_value={}) as get_thetas, \
              patch("studycat_service.service.core.repo.list_responses",
                    new_callable=AsyncMock,
                    return_value=[response]), \
              patch("studycat_service.service.core.repo.get_response_by_id",
                    new_callable=AsyncMock,
                    return_value=response), \
-             patch("studycat_service.service.core.repo.upsert_theta",
-                   new_callable=AsyncMock), \
-             patch("studycat_service.service.core.repo.attach_engine_snapshot_to_response",
-                   new_callable=AsyncMock), \
-             patch("studycat_service.service.core.repo.get_quiz",
-                   new_callable=AsyncMock,
-                   return_value=MagicMock(allowRepeatCorrect=False)):
+             patch("studycat_service.service.core.repo.persist_step_results",
+                   new_callable=AsyncMock):
 
             theta, _, _, _, _ = await step_attempt("attempt1", "resp1")
 
+        get_attempt.assert_awaited_once_with("attempt1")
+        get_thetas.assert_awaited_once_with("enr1")
         assert theta["math"] > 0.0
 
     @pytest.mark.asyncio
@@ -371,38 +510,32 @@ class TestStepAttempt:
         """
         from studycat_service.service.core import step_attempt
 
-        attempt  = make_attempt(fixed_length=1)
+        attempt  = make_attempt(fixed_length=1, quiz_modules=[make_quiz_module(threshold=2.0)])
         db_item  = make_db_item()
         response = make_response("resp1", db_item, is_correct=True)
 
         with patch("studycat_service.service.core.repo.get_attempt",
                    new_callable=AsyncMock,
-                   return_value=attempt), \
+                   return_value=attempt) as get_attempt, \
              patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
                    new_callable=AsyncMock,
                    return_value=[db_item]), \
-             patch("studycat_service.service.core.repo.get_quiz_modules",
-                   new_callable=AsyncMock,
-                   return_value=[make_quiz_module(threshold=2.0)]), \
              patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
                    new_callable=AsyncMock,
-                   return_value={}), \
+                   return_value={}) as get_thetas, \
              patch("studycat_service.service.core.repo.list_responses",
                    new_callable=AsyncMock,
                    return_value=[response]), \
              patch("studycat_service.service.core.repo.get_response_by_id",
                    new_callable=AsyncMock,
                    return_value=response), \
-             patch("studycat_service.service.core.repo.upsert_theta",
-                   new_callable=AsyncMock), \
-             patch("studycat_service.service.core.repo.attach_engine_snapshot_to_response",
-                   new_callable=AsyncMock), \
-             patch("studycat_service.service.core.repo.get_quiz",
-                   new_callable=AsyncMock,
-                   return_value=MagicMock(allowRepeatCorrect=False)):
+             patch("studycat_service.service.core.repo.persist_step_results",
+                   new_callable=AsyncMock):
 
             _, _, next_public, is_finished, _ = await step_attempt("attempt1", "resp1")
 
+        get_attempt.assert_awaited_once_with("attempt1")
+        get_thetas.assert_awaited_once_with("enr1")
         assert is_finished is True
         assert next_public is None
 
@@ -416,47 +549,94 @@ class TestStepAttempt:
         ):
         """
         After processing a response, step_attempt must call
-        attach_engine_snapshot_to_response exactly once with the response_id
-        and a snapshot keyword argument. Uses a dedicated AsyncMock for the
-        attach call and asserts assert_awaited_once() to confirm the repo
-        write happened and was not accidentally called twice or skipped.
+        persist_step_results exactly once with the response_id and a snapshot
+        keyword argument. Uses a dedicated AsyncMock for the write stage and
+        asserts assert_awaited_once() to confirm the repo write happened and
+        was not accidentally called twice or skipped.
         """
         from studycat_service.service.core import step_attempt
 
-        attempt     = make_attempt(fixed_length=5)
-        db_item     = make_db_item()
-        response    = make_response("resp1", db_item, is_correct=True)
-        mock_attach = AsyncMock()
+        attempt      = make_attempt(fixed_length=5, quiz_modules=[make_quiz_module(threshold=2.0)])
+        db_item      = make_db_item()
+        response     = make_response("resp1", db_item, is_correct=True)
+        mock_persist = AsyncMock()
 
         with patch("studycat_service.service.core.repo.get_attempt",
                    new_callable=AsyncMock,
-                   return_value=attempt), \
+                   return_value=attempt) as get_attempt, \
              patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
                    new_callable=AsyncMock,
                    return_value=[db_item]), \
-             patch("studycat_service.service.core.repo.get_quiz_modules",
-                   new_callable=AsyncMock,
-                   return_value=[make_quiz_module(threshold=2.0)]), \
              patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
                    new_callable=AsyncMock,
-                   return_value={}), \
+                   return_value={}) as get_thetas, \
              patch("studycat_service.service.core.repo.list_responses",
                    new_callable=AsyncMock,
                    return_value=[response]), \
              patch("studycat_service.service.core.repo.get_response_by_id",
                    new_callable=AsyncMock,
                    return_value=response), \
-             patch("studycat_service.service.core.repo.upsert_theta",
-                   new_callable=AsyncMock), \
-             patch("studycat_service.service.core.repo.attach_engine_snapshot_to_response",
-                   mock_attach), \
-             patch("studycat_service.service.core.repo.get_quiz",
-                   new_callable=AsyncMock,
-                   return_value=MagicMock(allowRepeatCorrect=False)):
+             patch("studycat_service.service.core.repo.persist_step_results",
+                   mock_persist):
 
             await step_attempt("attempt1", "resp1")
 
-        mock_attach.assert_awaited_once()
+        get_attempt.assert_awaited_once_with("attempt1")
+        get_thetas.assert_awaited_once_with("enr1")
+        mock_persist.assert_awaited_once()
+        assert mock_persist.await_args.kwargs["response_id"] == "resp1"
+        assert mock_persist.await_args.kwargs["snapshot"] is not None
+
+    @pytest.mark.asyncio
+    async def test_thetas_persisted_in_one_call(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        make_response,
+        item_lookup,
+        ):
+        """
+        Every module's theta must be written by the single persist_step_results
+        call (one DB round trip) rather than one write per module.
+        """
+        from studycat_service.service.core import step_attempt
+
+        attempt      = make_attempt(
+            fixed_length=5, quiz_modules=[make_quiz_module("math"), make_quiz_module("reading")]
+        )
+        math_item    = make_db_item("math", item_id="m1")
+        read_item    = make_db_item("reading", item_id="r1")
+        response     = make_response("resp1", math_item, is_correct=True)
+        mock_persist = AsyncMock()
+
+        with patch("studycat_service.service.core.repo.get_attempt",
+                   new_callable=AsyncMock,
+                   return_value=attempt) as get_attempt, \
+             patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
+                   new_callable=AsyncMock,
+                   return_value=[math_item, read_item]), \
+             patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
+                   new_callable=AsyncMock,
+                   return_value={}) as get_thetas, \
+             patch("studycat_service.service.core.repo.list_responses",
+                   new_callable=AsyncMock,
+                   return_value=[response]), \
+             patch("studycat_service.service.core.repo.get_response_by_id",
+                   new_callable=AsyncMock,
+                   return_value=response), \
+             patch("studycat_service.service.core.repo.persist_step_results",
+                   mock_persist), \
+             patch("studycat_service.service.core.repo.get_item_by_id",
+                   item_lookup(math_item, read_item)):
+
+            theta, _, _, _, _ = await step_attempt("attempt1", "resp1")
+
+        get_attempt.assert_awaited_once_with("attempt1")
+        get_thetas.assert_awaited_once_with("enr1")
+        mock_persist.assert_awaited_once()
+        assert mock_persist.await_args.args == ("enr1", theta)
+        assert set(theta) == {"math", "reading"}
 
     @pytest.mark.asyncio
     async def test_prior_theta_is_seeded_before_response_applied(
@@ -476,40 +656,82 @@ class TestStepAttempt:
         """
         from studycat_service.service.core import step_attempt
 
-        attempt  = make_attempt(fixed_length=5)
+        attempt  = make_attempt(fixed_length=5, quiz_modules=[make_quiz_module(threshold=2.0)])
         db_item  = make_db_item()
         response = make_response("resp1", db_item, is_correct=True)
 
         with patch("studycat_service.service.core.repo.get_attempt",
                    new_callable=AsyncMock,
-                   return_value=attempt), \
+                   return_value=attempt) as get_attempt, \
              patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
                    new_callable=AsyncMock,
                    return_value=[db_item]), \
-             patch("studycat_service.service.core.repo.get_quiz_modules",
-                   new_callable=AsyncMock,
-                   return_value=[make_quiz_module(threshold=2.0)]), \
              patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
                    new_callable=AsyncMock,
-                   return_value={"math": 1.8}), \
+                   return_value={"math": 1.8}) as get_thetas, \
              patch("studycat_service.service.core.repo.list_responses",
                    new_callable=AsyncMock,
                    return_value=[response]), \
              patch("studycat_service.service.core.repo.get_response_by_id",
                    new_callable=AsyncMock,
                    return_value=response), \
-             patch("studycat_service.service.core.repo.upsert_theta",
-                   new_callable=AsyncMock), \
-             patch("studycat_service.service.core.repo.attach_engine_snapshot_to_response",
-                   new_callable=AsyncMock), \
-             patch("studycat_service.service.core.repo.get_quiz",
-                   new_callable=AsyncMock,
-                   return_value=MagicMock(repeatCorrectQuestions=True)):
+             patch("studycat_service.service.core.repo.persist_step_results",
+                   new_callable=AsyncMock):
 
             theta, _, _, _, _ = await step_attempt("attempt1", "resp1")
 
+        get_attempt.assert_awaited_once_with("attempt1")
+        get_thetas.assert_awaited_once_with("enr1")
         assert theta["math"] > 1.8
 
+    @pytest.mark.asyncio
+    async def test_items_with_identical_irt_params_are_distinguished(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        make_response,
+        item_lookup,
+        ):
+        """
+        Two items sharing the same a/b/c must still be told apart: answering
+        the second one removes it (not its twin) from the pool, so the next
+        item served is the first one. Items are matched by Item.id, never by
+        their IRT parameters.
+        """
+        from studycat_service.service.core import step_attempt
+
+        attempt  = make_attempt(fixed_length=5, quiz_modules=[make_quiz_module(threshold=2.0)])
+        first    = make_db_item(item_id="m1")
+        second   = make_db_item(item_id="m2")
+        response = make_response("resp1", second, is_correct=True)
+
+        with patch("studycat_service.service.core.repo.get_attempt",
+                   new_callable=AsyncMock,
+                   return_value=attempt) as get_attempt, \
+             patch("studycat_service.service.core.repo.list_eligible_items_for_quiz",
+                   new_callable=AsyncMock,
+                   return_value=[first, second]), \
+             patch("studycat_service.service.core.repo.get_thetas_for_enrollment",
+                   new_callable=AsyncMock,
+                   return_value={}) as get_thetas, \
+             patch("studycat_service.service.core.repo.list_responses",
+                   new_callable=AsyncMock,
+                   return_value=[response]), \
+             patch("studycat_service.service.core.repo.get_response_by_id",
+                   new_callable=AsyncMock,
+                   return_value=response), \
+             patch("studycat_service.service.core.repo.persist_step_results",
+                   new_callable=AsyncMock), \
+             patch("studycat_service.service.core.repo.get_item_by_id",
+                   item_lookup(first, second)):
+
+            _, _, next_public, _, _ = await step_attempt("attempt1", "resp1")
+
+        get_attempt.assert_awaited_once_with("attempt1")
+        get_thetas.assert_awaited_once_with("enr1")
+        assert next_public.item_id == "m1"
+
     @pytest.mark.asyncio
     async def test_unknown_attempt_raises(self):
         """
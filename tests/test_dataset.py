@@ -0,0 +1,80 @@
+"""
+Tests for the streaming dataset generator (db/dataset.py).
+
+Generated data must load into the SQLite repository and respect the quiz
+rules it simulates: responses stay within quiz scope and no-repeat quizzes
+never serve an item the student already answered correctly.
+"""
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+
+import pytest
+
+
+def _config(**kwargs):
+    from studycat_service.db.dataset import DatasetConfig
+
+    defaults = {
+        "items_total": 300, "n_modules": 6, "n_quizzes": 8, "n_enrollments": 15,
+        "attempts_per_enrollment": 4, "history": 10, "explicit_fraction": 0.5,
+    }
+    return DatasetConfig(**{**defaults, **kwargs})
+
+
+class TestGenerate:
+    """generate() into SQLite and JSONL sinks."""
+
+    @pytest.mark.asyncio
+    async def test_sqlite_dataset_respects_quiz_scope(self, tmp_path):
+        """
+        Every response's item is eligible for its attempt's quiz (as resolved by
+        SQLiteRepository), and no-repeat quizzes have no item answered
+        correctly twice by the same enrollment.
+        """
+        from studycat_service.db.dataset import SQLiteSink, generate
+        from studycat_service.db.sqlite import SQLiteRepository
+
+        path = str(tmp_path / "dataset.sqlite3")
+        counts = generate(_config(), SQLiteSink(path), batch_size=64)
+        repository = SQLiteRepository(path)
+        try:
+            assert counts["Response"] == 15 * 4 * 10
+            assert counts["Item"] == 300
+            correct = defaultdict(list)
+            for e in range(15):
+                for k in range(4):
+                    attempt = await repository.get_attempt(f"enrollment{e}-attempt{k}")
+                    eligible = {
+                        i.id for i in await repository.list_eligible_items_for_quiz(
+                            attempt.quizId, attempt.quiz
+                        )
+                    }
+                    for response in await repository.list_responses(attempt.id):
+                        assert response.itemId in eligible
+                        if response.isCorrect and not attempt.quiz.repeatCorrectQuestions:
+                            correct[(attempt.enrollmentId, attempt.quizId)].append(
+                                response.itemId
+                            )
+            assert all(len(ids) == len(set(ids)) for ids in correct.values())
+            assert any(correct.values())
+        finally:
+            repository.close()
+
+    def test_jsonl_snapshot_is_deterministic(self, tmp_path):
+        """
+        The JSONL sink writes one file per table with one row per line, and
+        the same seed writes the same rows.
+        """
+        from studycat_service.db.dataset import JSONLSink, generate
+
+        first = generate(_config(), JSONLSink(str(tmp_path / "a")))
+        generate(_config(), JSONLSink(str(tmp_path / "b")))
+
+        for table, count in first.items():
+            lines = (tmp_path / "a" / f"{table}.jsonl").read_text().splitlines()
+            assert len(lines) == count
+            assert lines == (tmp_path / "b" / f"{table}.jsonl").read_text().splitlines()
+        quiz = json.loads((tmp_path / "a" / "Quiz.jsonl").read_text().splitlines()[0])
+        assert set(quiz) == {"id", "includedBlooms", "repeatCorrectQuestions", "updatedAt"}
@@ -0,0 +1,182 @@
+"""
+Tests for the per-enrollment correct-item cache (service/exclusions.py).
+
+The set of items a student answered correctly on a quiz must be loaded from
+the DB once, kept up to date by step_attempt, and applied to the quiz bank as
+a mask.
+"""
+from __future__ import annotations
+
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from studycat_service.service.exclusions import CorrectItemCache
+
+
+def _bank(make_db_item, ids):
+    from studycat_service.service.bank import QuizBank
+
+    items = [make_db_item("math", item_id=i) for i in ids]
+    return QuizBank(
+        quiz_id="quiz1",
+        version="v1",
+        items=items,
+        concepts=["math"],
+        test_items={},
+        testitem_to_itemid={},
+        testitem_to_skill={},
+    )
+
+
+class TestCorrectItemCache:
+    """Loading, in-place updates and masks of CorrectItems entries."""
+
+    @pytest.mark.asyncio
+    async def test_loaded_once_per_enrollment_and_quiz(self):
+        """
+        Repeated gets for the same (enrollment, quiz) share one DB load;
+        another enrollment gets its own entry.
+        """
+        cache = CorrectItemCache(max_entries=8, ttl_seconds=60)
+        loader = AsyncMock(return_value={"m1"})
+
+        first = await cache.get("enr1", "quiz1", loader)
+        again = await cache.get("enr1", "quiz1", loader)
+        await cache.get("enr2", "quiz1", loader)
+
+        assert first is again
+        assert first.item_ids == {"m1"}
+        assert loader.await_count == 2
+        loader.assert_any_await(enrollment_id="enr1", quiz_id="quiz1")
+
+    @pytest.mark.asyncio
+    async def test_reloaded_after_ttl_even_when_read(self):
+        """
+        Reads do not extend an entry's lifetime: once ttl_seconds have passed
+        since the load, the next get reloads it and sees answers recorded
+        through another worker.
+        """
+        now = [0.0]
+        cache = CorrectItemCache(max_entries=8, ttl_seconds=60, clock=lambda: now[0])
+        loader = AsyncMock(side_effect=[{"m1"}, {"m1", "m2"}])
+
+        for t in (0.0, 30.0, 59.0):
+            now[0] = t
+            assert (await cache.get("enr1", "quiz1", loader)).item_ids == {"m1"}
+        now[0] = 61.0
+        assert (await cache.get("enr1", "quiz1", loader)).item_ids == {"m1", "m2"}
+        assert loader.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_record_updates_mask_in_place(self, make_db_item):
+        """
+        record() adds the item to a cached entry and flips its bit in the
+        mask already built for the bank; unknown entries are left alone.
+        """
+        cache = CorrectItemCache(max_entries=8, ttl_seconds=60)
+        bank = _bank(make_db_item, ["m1", "m2", "m3"])
+        entry = await cache.get("enr1", "quiz1", AsyncMock(return_value={"m1"}))
+        mask = entry.mask(bank)
+
+        cache.record("enr1", "quiz1", "m3")
+        cache.record("enr9", "quiz1", "m2")
+
+        assert mask.tolist() == [True, False, True]
+        assert entry.mask(bank) is mask
+        assert len(cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_mask_rebuilt_for_a_reloaded_bank(self, make_db_item):
+        """A new bank object (e.g. after a quiz edit) gets a freshly built mask."""
+        cache = CorrectItemCache(max_entries=8, ttl_seconds=60)
+        entry = await cache.get("enr1", "quiz1", AsyncMock(return_value={"m2"}))
+
+        old = entry.mask(_bank(make_db_item, ["m1", "m2"]))
+        new = entry.mask(_bank(make_db_item, ["m2", "m3", "m4"]))
+
+        assert old.tolist() == [False, True]
+        assert new.tolist() == [True, False, False]
+
+
+class TestCorrectItemsInService:
+    """step_attempt keeps the cache current for later attempts on the quiz."""
+
+    @pytest.mark.asyncio
+    async def test_correct_answer_excluded_from_next_attempt(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        make_response,
+        item_lookup,
+        ):
+        """
+        After a correct answer to m1 in one attempt, a new attempt by the same
+        enrollment on a no-repeat quiz is served m2 without the correct-item
+        query being run a second time.
+        """
+        from studycat_service.service.core import init_attempt, step_attempt
+
+        items = [make_db_item("math", item_id="m1", b=0.0),
+                 make_db_item("math", item_id="m2", b=2.5)]
+        attempt = make_attempt(fixed_length=5, quiz_modules=[make_quiz_module(threshold=3.0)])
+        attempt.quiz.repeatCorrectQuestions = False
+        response = make_response("resp1", items[0], is_correct=True)
+        get_correct = AsyncMock(return_value=set())
+
+        with ExitStack() as stack:
+            for name, value in {
+                "get_attempt": attempt,
+                "list_eligible_items_for_quiz": items,
+                "get_thetas_for_enrollment": {},
+                "list_response_ids": ["resp1"],
+                "get_response_by_id": response,
+                "persist_step_results": None,
+            }.items():
+                stack.enter_context(patch(
+                    f"studycat_service.service.core.repo.{name}",
+                    AsyncMock(return_value=value)))
+            stack.enter_context(patch(
+                "studycat_service.service.core.repo.get_correct_item_ids_for_enrollment_and_quiz",
+                get_correct))
+            stack.enter_context(patch(
+                "studycat_service.service.core.repo.get_item_by_id", item_lookup(*items)))
+
+            _, first = await init_attempt("attempt1", None, None, None)
+            await step_attempt("attempt1", "resp1")
+            _, next_attempt_first = await init_attempt("attempt2", None, None, None)
+
+        assert first.item_id == "m1"
+        assert next_attempt_first.item_id == "m2"
+        get_correct.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cold_step_replays_earlier_correct_answer(self, monkeypatch):
+        """
+        On a no-repeat quiz with the array pool backend, a step without a
+        cached session replays the attempt's earlier correct answer even
+        though the item is now in the enrollment's correct-item set.
+        """
+        from studycat_service.config import settings
+        from studycat_service.db.memory import MemoryRepository
+        from studycat_service.db.synthetic import seed_attempts, seed_quiz
+        from studycat_service.service.core import init_attempt, step_attempt
+        from studycat_service.service.session import sessions
+
+        monkeypatch.setattr(settings, "item_pool_backend", "array")
+        repository = MemoryRepository()
+        quiz = seed_quiz(repository, n_modules=1, items_per_module=10, repeat_correct=False)
+        (attempt,) = seed_attempts(repository, quiz.id, 1, fixed_length=5)
+
+        with repository.installed():
+            _, item = await init_attempt(attempt.id, None, None, None)
+            first = repository.add_response(attempt.id, item.item_id, True)
+            _, _, item, _, _ = await step_attempt(attempt.id, first.id)
+            sessions.clear()
+            second = repository.add_response(attempt.id, item.item_id, False)
+            _, _, next_item, finished, _ = await step_attempt(attempt.id, second.id)
+
+        assert not finished
+        assert next_item.item_id not in {first.item.id, second.item.id}
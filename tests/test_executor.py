@@ -0,0 +1,187 @@
+"""
+Tests for the engine executor (service/executor.py) and stage timings
+(service/timing.py).
+
+Engine computations must run off the event loop, be bounded by max_queue,
+and be timed per stage; init/step must route their engine work through it.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from studycat_service.service.executor import EngineBusyError, EngineExecutor
+from studycat_service.service.timing import StageTimings
+
+
+class TestEngineExecutor:
+    """Offloading, queue bound and timings of EngineExecutor.run()."""
+
+    @pytest.mark.asyncio
+    async def test_thread_mode_runs_off_the_loop(self):
+        """
+        The computation runs on a worker thread, its result is returned, and
+        both the stage and its ".wait" are recorded.
+        """
+        stage_timings = StageTimings()
+        executor = EngineExecutor(mode="thread", max_workers=1, stage_timings=stage_timings)
+        try:
+            result = await executor.run(
+                "select", lambda x: (x * 2, threading.current_thread()), 21
+            )
+        finally:
+            executor.shutdown()
+
+        value, thread = result
+        assert value == 42
+        assert thread is not threading.main_thread()
+        stats = stage_timings.snapshot()
+        assert stats["select"].count == 1
+        assert stats["select.wait"].count == 1
+        assert executor.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_loop_keeps_running_during_computation(self):
+        """
+        While a computation blocks its worker, other coroutines on the loop
+        still make progress.
+        """
+        executor = EngineExecutor(mode="thread", max_workers=1)
+        release = threading.Event()
+        try:
+            task = asyncio.create_task(executor.run("estimate", release.wait, 5))
+            await asyncio.sleep(0.01)
+            assert not task.done()
+            release.set()
+            assert await task is True
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_busy_when_queue_is_full(self):
+        """
+        With max_queue computations pending and no queue_timeout, run() raises
+        EngineBusyError instead of queueing another one; capacity frees up
+        once they finish.
+        """
+        executor = EngineExecutor(mode="thread", max_workers=1, max_queue=2, queue_timeout=0)
+        release = threading.Event()
+        try:
+            blocked = [asyncio.create_task(executor.run("estimate", release.wait, 5))
+                       for _ in range(2)]
+            await asyncio.sleep(0.01)
+            with pytest.raises(EngineBusyError):
+                await executor.run("estimate", lambda: None)
+            release.set()
+            await asyncio.gather(*blocked)
+            assert await executor.run("estimate", lambda: "ok") == "ok"
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_waits_for_a_slot(self):
+        """
+        Past max_queue, callers wait and run in arrival order once slots
+        free up; a caller still waiting after queue_timeout gets
+        EngineBusyError without taking a slot.
+        """
+        executor = EngineExecutor(mode="thread", max_workers=1, max_queue=1, queue_timeout=5)
+        release = threading.Event()
+        order = []
+        try:
+            blocked = asyncio.create_task(executor.run("estimate", release.wait, 5))
+            await asyncio.sleep(0.01)
+            queued = [asyncio.create_task(executor.run("estimate", order.append, n))
+                      for n in range(3)]
+            await asyncio.sleep(0.01)
+            assert executor.waiting == 3 and not any(t.done() for t in queued)
+
+            release.set()
+            await asyncio.gather(blocked, *queued)
+            assert order == [0, 1, 2]
+            assert executor.pending == 0 and executor.waiting == 0
+
+            release.clear()
+            executor.queue_timeout = 0.05
+            blocked = asyncio.create_task(executor.run("estimate", release.wait, 5))
+            await asyncio.sleep(0.01)
+            with pytest.raises(EngineBusyError):
+                await executor.run("estimate", lambda: None)
+            assert executor.waiting == 0 and executor.pending == 1
+            release.set()
+            await blocked
+            assert executor.pending == 0
+        finally:
+            release.set()
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_release_the_slot(self):
+        """Exceptions raised by the computation reach the caller and free its slot."""
+        executor = EngineExecutor(mode="inline", max_queue=1)
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await executor.run("estimate", fail)
+        assert executor.pending == 0
+
+    def test_unknown_mode_rejected(self):
+        """Only "thread" and "inline" are valid executor modes."""
+        with pytest.raises(ValueError):
+            EngineExecutor(mode="process")
+
+
+class TestEngineStagesInService:
+    """init_attempt and step_attempt run their engine work through the executor."""
+
+    @pytest.mark.asyncio
+    async def test_init_and_step_record_stage_timings(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        make_response,
+        item_lookup,
+        ):
+        """
+        An init followed by a step on the cached session records the
+        "init.model", "step.estimate" and "step.select" stages once each.
+        """
+        from studycat_service.service.core import init_attempt, step_attempt
+        from studycat_service.service.timing import timings
+
+        items = [make_db_item("math", item_id="m1", b=0.0),
+                 make_db_item("math", item_id="m2", b=1.0)]
+        response = make_response("resp1", items[0], is_correct=True)
+
+        with ExitStack() as stack:
+            for name, value in {
+                "get_attempt": make_attempt(
+                    fixed_length=5, quiz_modules=[make_quiz_module(threshold=3.0)]),
+                "list_eligible_items_for_quiz": items,
+                "get_thetas_for_enrollment": {},
+                "get_correct_item_ids_for_enrollment_and_quiz": set(),
+                "list_response_ids": ["resp1"],
+                "get_response_by_id": response,
+                "persist_step_results": None,
+            }.items():
+                stack.enter_context(patch(
+                    f"studycat_service.service.core.repo.{name}",
+                    AsyncMock(return_value=value)))
+            stack.enter_context(patch(
+                "studycat_service.service.core.repo.get_item_by_id", item_lookup(*items)))
+
+            await init_attempt("attempt1", None, None, None)
+            await step_attempt("attempt1", "resp1")
+
+        stats = timings.snapshot()
+        for stage in ("init.model", "step.estimate", "step.select"):
+            assert stats[stage].count == 1
+            assert stats[f"{stage}.wait"].count == 1
+        assert "replay.model" not in stats
@@ -0,0 +1,143 @@
+"""
+Tests for per-attempt single-flight (service/flights.py).
+
+Identical concurrent requests for an attempt must share one computation,
+different requests for the same attempt must run one at a time in order, and
+step_attempt must go through it.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from studycat_service.service.flights import AttemptFlights
+
+
+class TestAttemptFlights:
+    """Coalescing and ordering of AttemptFlights.run()."""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_computation(self):
+        """
+        Two concurrent calls with the same attempt and key run fn once and
+        both receive its result; the attempt is forgotten afterwards.
+        """
+        flights = AttemptFlights()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return object()
+
+        first, second = await asyncio.gather(
+            flights.run("attempt1", "resp1", compute),
+            flights.run("attempt1", "resp1", compute),
+        )
+
+        assert calls == 1
+        assert first is second
+        assert len(flights) == 0
+
+    @pytest.mark.asyncio
+    async def test_different_requests_for_an_attempt_are_serialised(self):
+        """
+        Different keys for one attempt run one after another, in the order
+        they arrived, while another attempt runs alongside them.
+        """
+        flights = AttemptFlights()
+        events: list[str] = []
+
+        def compute(name):
+            async def run():
+                events.append(f"{name}:start")
+                await asyncio.sleep(0.01)
+                events.append(f"{name}:end")
+            return run
+
+        await asyncio.gather(
+            flights.run("attempt1", "resp1", compute("a1")),
+            flights.run("attempt1", "resp2", compute("a2")),
+            flights.run("attempt2", "resp1", compute("b1")),
+        )
+
+        assert events.index("a1:end") < events.index("a2:start")
+        assert events.index("b1:start") < events.index("a1:end")
+
+    @pytest.mark.asyncio
+    async def test_error_shared_and_next_request_runs(self):
+        """
+        An exception reaches every waiter of the computation and does not
+        keep the attempt locked for the next request.
+        """
+        flights = AttemptFlights()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flights.run("attempt1", "resp1", fail),
+            flights.run("attempt1", "resp1", fail),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+        assert await flights.run("attempt1", "resp2", AsyncMock(return_value="ok")) == "ok"
+
+
+class TestSingleFlightStep:
+    """Concurrent step_attempt calls for one attempt."""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_step_computed_once(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        make_response,
+        item_lookup,
+        ):
+        """
+        A double-submitted step (same response_id, concurrently) loads the
+        response and persists thetas once, and both callers get the same
+        next item.
+        """
+        from studycat_service.service.core import init_attempt, step_attempt
+
+        items = [make_db_item("math", item_id=f"m{i}", b=float(i)) for i in range(3)]
+        response = make_response("resp1", items[0], is_correct=True)
+        get_response = AsyncMock(return_value=response)
+        persist = AsyncMock(return_value=None)
+
+        with ExitStack() as stack:
+            for name, value in {
+                "get_attempt": make_attempt(
+                    fixed_length=5, quiz_modules=[make_quiz_module(threshold=3.0)]),
+                "list_eligible_items_for_quiz": items,
+                "get_thetas_for_enrollment": {},
+                "get_correct_item_ids_for_enrollment_and_quiz": set(),
+                "list_response_ids": ["resp1"],
+            }.items():
+                stack.enter_context(patch(
+                    f"studycat_service.service.core.repo.{name}",
+                    AsyncMock(return_value=value)))
+            stack.enter_context(patch(
+                "studycat_service.service.core.repo.get_response_by_id", get_response))
+            stack.enter_context(patch(
+                "studycat_service.service.core.repo.persist_step_results", persist))
+            stack.enter_context(patch(
+                "studycat_service.service.core.repo.get_item_by_id", item_lookup(*items)))
+
+            await init_attempt("attempt1", None, None, None)
+            first, second = await asyncio.gather(
+                step_attempt("attempt1", "resp1"),
+                step_attempt("attempt1", "resp1"),
+            )
+
+        assert first is second
+        get_response.assert_awaited_once()
+        persist.assert_awaited_once()
@@ -0,0 +1,150 @@
+"""
+Tests for the incremental grid-posterior estimator (engine/grid.py).
+
+The grid MAP must agree with adaptivetesting's BayesModal on the same
+responses, the EAP/SE must behave like a posterior mean and standard
+deviation, and build_multidim_model must wire the posterior in when a grid
+estimator is selected.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from adaptivetesting.math.estimators import BayesModal, NormalPrior
+
+
+def _random_items(n=40, seed=11):
+    from studycat_service.engine.adapter import _make_test_item
+
+    rng = np.random.default_rng(seed)
+    return [
+        _make_test_item(
+            a=float(rng.uniform(0.5, 2.5)),
+            b=float(rng.normal(0, 1.2)),
+            c=float(rng.uniform(0.0, 0.3)),
+        )
+        for _ in range(n)
+    ]
+
+
+class TestGridPosterior:
+    """Point estimates and SE of GridPosterior."""
+
+    def test_map_matches_bayes_modal(self):
+        """
+        After every response, the refined grid MAP should be within 0.01 of
+        BayesModal's estimate for the same prior and response pattern.
+        """
+        from studycat_service.engine.grid import GridPosterior, theta_grid
+
+        items = _random_items(n=15)
+        responses = [1, 0, 1, 1, 0, 1, 0, 0, 1, 1, 1, 0, 1, 0, 1]
+        prior = NormalPrior(0.0, 1.0)
+        posterior = GridPosterior(prior, theta_grid((-4, 4), 161), point="map")
+
+        for n, (item, response) in enumerate(zip(items, responses, strict=True), start=1):
+            theta, _ = posterior.update(item, response)
+            expected = BayesModal(
+                responses[:n], items[:n], prior=prior, optimization_interval=(-4, 4)
+            ).get_estimation()
+            assert theta == pytest.approx(expected, abs=1e-2)
+
+    def test_eap_and_se_follow_the_responses(self):
+        """
+        With no responses the EAP is the prior mean and the SE the prior SD;
+        correct answers move the EAP up and the SE ends below the prior SD.
+        """
+        from studycat_service.engine.grid import GridPosterior, theta_grid
+
+        items = _random_items(n=5)
+        posterior = GridPosterior(NormalPrior(0.0, 1.0), theta_grid((-4, 4), 161), point="eap")
+
+        theta, se = posterior.estimate()
+        assert theta == pytest.approx(0.0, abs=1e-6)
+        assert se == pytest.approx(1.0, abs=1e-2)
+
+        for item in items:
+            new_theta, se = posterior.update(item, 1)
+            assert new_theta > theta
+            theta = new_theta
+        assert se < 1.0
+
+    def test_pool_table_rows_match_direct_computation(self):
+        """
+        Updates that read the ArrayItemPool's precomputed likelihood table
+        must give the same posterior as computing each item's row directly,
+        and the table is built once and shared by copies of the pool.
+        """
+        from studycat_service.engine.grid import GridPosterior, theta_grid
+        from studycat_service.engine.item_bank import ArrayItemPool
+
+        items = _random_items(n=10)
+        pool = ArrayItemPool(items)
+        grid = theta_grid((-4, 4), 81)
+        with_table = GridPosterior(NormalPrior(0.5, 1.0), grid)
+        direct = GridPosterior(NormalPrior(0.5, 1.0), grid)
+
+        for i, item in enumerate(items):
+            with_table.observe(item, i % 2, pool.copy())
+            direct.observe(item, i % 2)
+
+        np.testing.assert_allclose(with_table.log_posterior, direct.log_posterior)
+        assert len(pool.tables) == 1
+
+    def test_unknown_point_estimate_rejected(self):
+        """Only "map" and "eap" are valid point estimates."""
+        from studycat_service.engine.grid import GridPosterior, theta_grid
+
+        with pytest.raises(ValueError):
+            GridPosterior(NormalPrior(0.0, 1.0), theta_grid((-4, 4), 11), point="median")
+
+
+class TestGridEstimatorInModel:
+    """build_multidim_model with ability_estimator set to a grid estimator."""
+
+    @pytest.mark.parametrize("estimator", ["grid_map", "grid_eap"])
+    def test_model_updates_theta_through_posterior(self, estimator):
+        """
+        Each UnidimensionalModel gets its own posterior, and recording
+        responses updates theta and SE from it.
+        """
+        from studycat_service.engine.adapter import build_multidim_model, choose_next_item
+        from studycat_service.engine.item_bank import ArrayItemPool
+
+        model = build_multidim_model(
+            concepts=["math", "reading"],
+            pools_by_concept={
+                "math": ArrayItemPool(_random_items(n=6, seed=1)),
+                "reading": ArrayItemPool(_random_items(n=6, seed=2)),
+            },
+            prior_mu=0.0,
+            prior_sigma2=1.0,
+            mastery_thresholds={"math": 5.0, "reading": 5.0},
+            ability_estimator=estimator,
+        )
+        math, reading = model.models["math"], model.models["reading"]
+        assert math.posterior is not None and math.posterior is not reading.posterior
+
+        for _ in range(3):
+            item, skill = choose_next_item(model)
+            model.record_response(skill, 0, item)
+
+        answered = [m for m in (math, reading) if m.adaptive_test.answered_items]
+        assert answered
+        for uni in answered:
+            assert uni.get_theta() < 0.0
+            assert uni.adaptive_test.standard_error < 1.0
+
+    def test_unknown_estimator_rejected(self):
+        """An unrecognised ability_estimator raises ValueError."""
+        from studycat_service.engine.adapter import build_multidim_model
+
+        with pytest.raises(ValueError):
+            build_multidim_model(
+                concepts=[],
+                pools_by_concept={},
+                prior_mu=0.0,
+                prior_sigma2=1.0,
+                mastery_thresholds={},
+                ability_estimator="mle",
+            )
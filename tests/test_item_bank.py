@@ -0,0 +1,129 @@
+"""
+Tests for the array-backed item pool and vectorised item selection
+(engine/item_bank.py).
+
+ArrayItemPool must behave like adaptivetesting's ItemPool wherever the
+engine touches it (deep copies, deletion, iteration) and its vectorised
+maximum information criterion must pick the same item as the library's
+per-item implementation.
+"""
+from __future__ import annotations
+
+import copy
+
+import numpy as np
+import pytest
+from adaptivetesting.math.item_selection import maximum_information_criterion
+from adaptivetesting.models import ItemSelectionException
+
+
+def _random_items(n=200, seed=7):
+    from studycat_service.engine.adapter import _make_test_item
+
+    rng = np.random.default_rng(seed)
+    return [
+        _make_test_item(
+            a=float(rng.uniform(0.5, 2.5)),
+            b=float(rng.normal(0, 1.2)),
+            c=float(rng.uniform(0.0, 0.3)),
+        )
+        for _ in range(n)
+    ]
+
+
+class TestArrayItemPool:
+    """ItemPool compatibility of ArrayItemPool."""
+
+    def test_selection_matches_library_criterion(self):
+        """
+        For a range of abilities, the vectorised selector must return the
+        same TestItem as adaptivetesting's maximum_information_criterion
+        applied to the same items.
+        """
+        from studycat_service.engine.item_bank import (
+            ArrayItemPool,
+            vectorized_maximum_information_criterion,
+        )
+
+        items = _random_items()
+        pool = ArrayItemPool(items)
+        for theta in (-3.0, -1.2, 0.0, 0.4, 1.7, 3.0):
+            expected = maximum_information_criterion(items, theta)
+            assert vectorized_maximum_information_criterion(pool.test_items, theta) is expected
+
+    def test_deleted_items_are_not_selected(self):
+        """
+        delete_item removes the item from the available view and from
+        selection; deleting it a second time raises ValueError like ItemPool.
+        """
+        from studycat_service.engine.item_bank import ArrayItemPool
+
+        items = _random_items(n=20)
+        pool = ArrayItemPool(items)
+        best = pool.most_informative(0.0)
+        pool.delete_item(best)
+
+        assert best not in pool.test_items
+        assert len(pool.test_items) == 19
+        assert pool.most_informative(0.0) is not best
+        with pytest.raises(ValueError):
+            pool.delete_item(best)
+
+    def test_deepcopy_shares_items_but_not_mask(self):
+        """
+        TestAssembler deep-copies its pool. The copy must hold the very same
+        TestItem objects (so identity lookups keep working) while deletions
+        on the copy leave the original untouched.
+        """
+        from studycat_service.engine.item_bank import ArrayItemPool
+
+        items = _random_items(n=5)
+        pool = ArrayItemPool(items)
+        clone = copy.deepcopy(pool)
+        clone.delete_item(items[0])
+
+        assert list(clone.test_items) == items[1:]
+        assert list(pool.test_items) == items
+
+    def test_empty_pool_raises_selection_exception(self):
+        """Selecting from an exhausted pool raises ItemSelectionException."""
+        from studycat_service.engine.item_bank import ArrayItemPool
+
+        items = _random_items(n=2)
+        pool = ArrayItemPool(items)
+        for item in items:
+            pool.delete_item(item)
+        with pytest.raises(ItemSelectionException):
+            pool.most_informative(0.0)
+
+
+class TestArrayPoolInModel:
+    """build_multidim_model wires ArrayItemPools to the vectorised selector."""
+
+    def test_model_runs_until_pool_exhausted(self):
+        """
+        A model built on an ArrayItemPool should administer every item once,
+        update theta after each response, and then report no items left.
+        """
+        from studycat_service.engine.adapter import build_multidim_model, choose_next_item
+        from studycat_service.engine.item_bank import ArrayItemPool
+
+        model = build_multidim_model(
+            concepts=["math"],
+            pools_by_concept={"math": ArrayItemPool(_random_items(n=4))},
+            prior_mu=0.0,
+            prior_sigma2=1.0,
+            mastery_thresholds={"math": 5.0},
+        )
+        seen = []
+        while True:
+            item, skill = choose_next_item(model)
+            if item is None:
+                break
+            assert skill == "math"
+            seen.append(item)
+            model.record_response("math", 1, item)
+
+        assert len(seen) == len({id(t) for t in seen}) == 4
+        assert model.models["math"].get_theta() > 0.0
+        assert model.models["math"].questions_left is False
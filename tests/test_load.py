@@ -0,0 +1,65 @@
+"""
+Tests for the ASGI load test (bench/load.py).
+
+Simulated students must drive the real app end to end over the in-memory
+repository, and the report must account for every request.
+"""
+from __future__ import annotations
+
+import pytest
+
+
+class TestLoadTest:
+    """run_load() and format_report()."""
+
+    @pytest.mark.asyncio
+    async def test_students_complete_their_attempts(self):
+        """
+        Every student gets through /init and attempt_length /steps without
+        errors, and the event-loop lag probe records samples.
+        """
+        from studycat_service.bench.load import LoadConfig, run_load
+
+        report = await run_load(LoadConfig(
+            students=4, n_modules=2, items_per_module=10, attempt_length=3,
+            latency_ms=0.5, lag_interval_ms=1.0,
+        ))
+
+        assert report.completed == 4
+        assert len(report.latencies["init"]) == 4
+        assert len(report.latencies["step"]) == 12
+        assert not report.errors
+        assert report.requests == 16
+        assert report.loop_lag
+
+    @pytest.mark.asyncio
+    async def test_burst_absorbed_at_default_executor_settings(self):
+        """
+        100 students starting at once (more than engine_max_queue engine
+        computations) wait for the executor instead of getting 503s.
+        """
+        from studycat_service.bench.load import LoadConfig, run_load
+
+        report = await run_load(LoadConfig(
+            students=100, n_modules=2, items_per_module=20, attempt_length=2,
+            latency_ms=0.5,
+        ))
+
+        assert not report.errors
+        assert report.completed == 100
+
+    def test_report_lists_failed_statuses(self):
+        """Non-200 responses count as errors and are listed by status."""
+        from studycat_service.bench.load import LoadReport, format_report
+
+        report = LoadReport(seconds=1.0)
+        report.latencies["init"].extend([0.01, 0.02, 0.03])
+        report.errors["init"] += 1
+        report.statuses[("init", 200)] += 3
+        report.statuses[("init", 503)] += 1
+
+        text = format_report(report)
+
+        assert report.error_rate("init") == pytest.approx(0.25)
+        assert "4 requests" in text
+        assert "init HTTP 503: 1" in text
@@ -0,0 +1,128 @@
+"""
+Tests for the estimation memo (engine/memo.py).
+
+Identical response patterns under the same scope and prior must share one
+BayesModal run and give the estimate an unmemoised model computes; anything
+that changes the estimate (items, parameters, responses, prior, scope) must
+change the key.
+"""
+from __future__ import annotations
+
+import pytest
+from adaptivetesting.models import ItemPool
+
+from studycat_service.engine.memo import EstimationMemo, pattern_key
+
+
+def _items():
+    from studycat_service.engine.adapter import _make_test_item
+
+    return [_make_test_item(a=1.0 + i / 5, b=i - 2.0, c=0.1, item_id=f"m{i}") for i in range(5)]
+
+
+def _model(items, memo=None, scope="quiz1@v1", prior_mu=0.0):
+    from studycat_service.engine.adapter import build_multidim_model
+
+    return build_multidim_model(
+        concepts=["math"],
+        pools_by_concept={"math": ItemPool(items)},
+        prior_mu=prior_mu,
+        prior_sigma2=1.0,
+        mastery_thresholds={"math": 5.0},
+        estimation_memo=memo,
+        memo_scope=scope,
+    )
+
+
+def _answer(model, responses):
+    uni = model.models["math"]
+    for response in responses:
+        item = next(iter(uni.adaptive_test.item_pool.test_items))
+        uni.record_response(response, item)
+    return uni.get_theta(), uni.adaptive_test.standard_error
+
+
+class TestPatternKey:
+    """pattern_key() identity."""
+
+    def test_key_covers_scope_parameters_and_responses(self):
+        """Changing scope, an item parameter or a response changes the key."""
+        items = _items()[:2]
+        base = pattern_key("s", items, [1, 0])
+
+        assert pattern_key("s", items, [1, 0]) == base
+        assert pattern_key("t", items, [1, 0]) != base
+        assert pattern_key("s", items, [1, 1]) != base
+        items[1].b += 0.1
+        assert pattern_key("s", items, [1, 0]) != base
+
+
+class TestMemoisedModel:
+    """UnidimensionalModel.record_response with an EstimationMemo."""
+
+    def test_second_identical_pattern_hits(self):
+        """
+        A second model answering the same items the same way is served from
+        the memo on every response, with the unmemoised estimate.
+        """
+        items = _items()
+        memo = EstimationMemo(max_entries=64)
+        responses = [1, 0, 1]
+
+        expected = _answer(_model(items), responses)
+        first = _answer(_model(items, memo), responses)
+        assert (memo.hits, memo.misses) == (0, 3)
+        second = _answer(_model(items, memo), responses)
+
+        assert (memo.hits, memo.misses) == (3, 3)
+        assert first == pytest.approx(expected)
+        assert second == pytest.approx(expected)
+
+    def test_prior_and_scope_are_part_of_the_key(self):
+        """Another prior mean or another bank version misses the memo."""
+        items = _items()
+        memo = EstimationMemo(max_entries=64)
+
+        _answer(_model(items, memo), [1])
+        _answer(_model(items, memo, prior_mu=0.5), [1])
+        _answer(_model(items, memo, scope="quiz1@v2"), [1])
+
+        assert (memo.hits, memo.misses) == (0, 3)
+
+    def test_bounded(self):
+        """The memo never holds more than max_entries patterns."""
+        memo = EstimationMemo(max_entries=2)
+        _answer(_model(_items(), memo), [1, 1, 0, 0])
+
+        assert len(memo) == 2
+
+
+class TestMemoInService:
+    """Attempts on the same bank share estimates."""
+
+    @pytest.mark.asyncio
+    async def test_second_attempt_reuses_estimates(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        run_attempt,
+        ):
+        """
+        A second student answering the same way on the same bank runs no
+        estimation of their own.
+        """
+        from studycat_service.service.bank import estimates
+
+        items = [make_db_item("math", item_id=f"m{i}", b=i - 2.0) for i in range(5)]
+        attempt = make_attempt(fixed_length=5)
+        answers = [True, False, True]
+
+        first = await run_attempt(items, make_quiz_module(threshold=3.0), attempt, answers)
+        misses = estimates.misses
+        second = await run_attempt(items, make_quiz_module(threshold=3.0), attempt, answers,
+                                   attempt_id="attempt2")
+
+        assert estimates.misses == misses
+        assert estimates.hits == len(answers)
+        assert second == first
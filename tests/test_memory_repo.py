@@ -0,0 +1,122 @@
+"""
+Tests for the in-memory repository (db/memory.py), its synthetic seeding
+(db/synthetic.py) and the service benchmark built on them (bench/service.py).
+
+MemoryRepository must behave like db/repo.py closely enough that
+init_attempt/step_attempt run end to end against it.
+"""
+from __future__ import annotations
+
+import pytest
+
+
+def _seeded(**kwargs):
+    from studycat_service.db.memory import MemoryRepository
+    from studycat_service.db.synthetic import seed_quiz
+
+    repository = MemoryRepository()
+    quiz = seed_quiz(repository, **kwargs)
+    return repository, quiz
+
+
+class TestMemoryRepository:
+    """Seeding and the db/repo.py query surface."""
+
+    def test_seed_quiz_shape_is_deterministic(self):
+        """
+        seed_quiz creates items_per_module items per module, and the same seed
+        draws the same item parameters.
+        """
+        repository, quiz = _seeded(n_modules=2, items_per_module=5, seed=3)
+        again, _ = _seeded(n_modules=2, items_per_module=5, seed=3)
+
+        assert len(quiz.quizModules) == 2
+        assert len(repository.items) == 10
+        assert [i.irtB for i in repository.items.values()] == [
+            i.irtB for i in again.items.values()
+        ]
+        assert all(sum(o.isCorrect for o in i.options) == 1 for i in repository.items.values())
+
+    @pytest.mark.asyncio
+    async def test_eligible_items_and_correct_ids(self):
+        """
+        Inactive items are not eligible, and correct item IDs cover every
+        attempt of the enrollment on the quiz.
+        """
+        from studycat_service.db.synthetic import seed_attempts
+
+        repository, quiz = _seeded(n_modules=1, items_per_module=4)
+        first, second, third = list(repository.items)[:3]
+        repository.items[third].active = False
+        attempt = seed_attempts(repository, quiz.id, 1, fixed_length=5)[0]
+        repository.add_response(attempt.id, first, is_correct=True)
+        repository.add_response(attempt.id, second, is_correct=False)
+
+        eligible = await repository.list_eligible_items_for_quiz(quiz.id)
+        correct = await repository.get_correct_item_ids_for_enrollment_and_quiz(
+            attempt.enrollmentId, quiz.id
+        )
+
+        assert third not in {i.id for i in eligible}
+        assert len(eligible) == 3
+        assert correct == {first}
+        assert await repository.list_response_ids(attempt.id) == [
+            r.id for r in repository.responses.values()
+        ]
+
+    @pytest.mark.asyncio
+    async def test_drives_service_end_to_end(self):
+        """
+        init_attempt and step_attempt run against an installed repository:
+        every step persists thetas and a snapshot, and the attempt ends after
+        fixedLengthN responses.
+        """
+        from studycat_service.db.synthetic import seed_attempts
+        from studycat_service.service import core
+
+        repository, quiz = _seeded(n_modules=2, items_per_module=10)
+        attempt = seed_attempts(repository, quiz.id, 1, fixed_length=4)[0]
+        original = core.repo
+
+        with repository.installed():
+            _, item = await core.init_attempt(attempt.id, None, None, None)
+            for _ in range(4):
+                response = repository.add_response(attempt.id, item.item_id, True)
+                _, _, item, finished, _ = await core.step_attempt(attempt.id, response.id)
+
+        assert core.repo is original
+        assert finished and item is None
+        assert all(r.engineMasterySnapshot for r in repository.responses.values())
+        assert {m for (_, m) in repository.thetas} == {qm.moduleId for qm in quiz.quizModules}
+        assert repository.calls["persist_step_results"] == 4
+
+
+class TestServiceBenchmark:
+    """Scenarios and reporting of bench/service.py."""
+
+    def test_percentiles(self):
+        """p50/p95/p99 interpolate like numpy.percentile; no values give zeros."""
+        from studycat_service.bench.service import percentiles
+
+        assert percentiles(list(range(101))) == (50.0, 95.0, 99.0)
+        assert percentiles([]) == (0.0, 0.0, 0.0)
+
+    @pytest.mark.asyncio
+    async def test_scenarios_record_stages_and_sweep(self):
+        """
+        The attempts scenario samples every request and its stages; the cold
+        sweep replays, so every step after the first goes through replay.
+        """
+        from studycat_service.bench.service import run_attempts, run_replay_sweep
+
+        repository, quiz = _seeded(n_modules=2, items_per_module=10)
+        with repository.installed():
+            samples = await run_attempts(repository, quiz.id, 2, attempt_length=3)
+            by_length, sweep = await run_replay_sweep(repository, quiz.id, 1, attempt_length=3)
+
+        assert len(samples["init"]) == 2
+        assert len(samples["step"]) == 6
+        assert len(samples["step.persist"]) == 6
+        assert "context.load" in samples and "step.select" in samples
+        assert sorted(by_length) == [0, 1, 2]
+        assert len(sweep["replay.responses"]) == 3
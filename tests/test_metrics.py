@@ -0,0 +1,155 @@
+"""
+Tests for the Prometheus metrics (metrics.py) and GET /v1/metrics.
+
+Metrics must render in the text exposition format, and a request through the
+app must show up in the route, repository, estimation, selection, stage and
+cache series.
+"""
+from __future__ import annotations
+
+import re
+
+import httpx
+import pytest
+
+
+def _template(name: str) -> str:
+    """Path template of the named route, as the router reports it."""
+    from studycat_service.routers import router
+
+    return next(route.path for route in router.routes if route.name == name)
+
+
+def _value(text: str, sample: str) -> float:
+    """Value of the exposition line starting with sample (name plus labels)."""
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{sample} not exposed")
+
+
+class TestRegistry:
+    """Text exposition of the metric primitives."""
+
+    def test_counter_and_gauge_render_with_escaped_labels(self):
+        """HELP/TYPE lines precede the samples; label values are escaped."""
+        from studycat_service.metrics import Counter, Gauge, Registry
+
+        registry = Registry()
+        calls = registry.register(Counter("calls_total", "Calls.", ("function",)))
+        depth = registry.register(Gauge("depth", "Depth."))
+        calls.labels('say "hi"\n').inc(2)
+        depth.inc()
+        depth.inc(0.5)
+
+        assert registry.render().splitlines() == [
+            "# HELP calls_total Calls.",
+            "# TYPE calls_total counter",
+            'calls_total{function="say \\"hi\\"\\n"} 2',
+            "# HELP depth Depth.",
+            "# TYPE depth gauge",
+            "depth 1.5",
+        ]
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Each bucket counts observations <= le; +Inf equals _count."""
+        from studycat_service.metrics import Histogram, Registry
+
+        registry = Registry()
+        sizes = registry.register(Histogram("sizes", "Sizes.", buckets=(1, 10)))
+        for value in (0.5, 1, 5, 50):
+            sizes.observe(value)
+        text = registry.render()
+
+        assert _value(text, 'sizes_bucket{le="1"}') == 2
+        assert _value(text, 'sizes_bucket{le="10"}') == 3
+        assert _value(text, 'sizes_bucket{le="+Inf"}') == 4
+        assert _value(text, "sizes_count") == 4
+        assert _value(text, "sizes_sum") == 56.5
+
+    def test_wrong_label_count_rejected(self):
+        """labels() needs exactly one value per label name."""
+        from studycat_service.metrics import Counter
+
+        with pytest.raises(ValueError):
+            Counter("calls_total", "Calls.", ("function",)).labels()
+
+
+class TestMetricsEndpoint:
+    """GET /v1/metrics after traffic through the app."""
+
+    @pytest.mark.asyncio
+    async def test_requests_reported(self):
+        """
+        After /init and /step on a metered repository, the scrape reports
+        both routes, the repository calls, the step estimation, the selection
+        candidates, the engine stages and the cache statistics.
+        """
+        from studycat_service.config import settings
+        from studycat_service.db.backend import MeteredRepository, installed
+        from studycat_service.db.memory import MemoryRepository
+        from studycat_service.db.synthetic import seed_attempts, seed_quiz
+        from studycat_service.main import app
+
+        repository = MemoryRepository()
+        quiz = seed_quiz(repository, n_modules=2, items_per_module=10)
+        seed_attempts(repository, quiz.id, 1, fixed_length=5, prefix="metrics")
+        transport = httpx.ASGITransport(app=app)
+
+        with installed(MeteredRepository(repository)):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                before = (await client.get("/v1/metrics")).text
+                init = await client.post("/v1/attempts/quiz-metrics0/init", json={})
+                response = repository.add_response(
+                    "quiz-metrics0", init.json()["next_item"]["item_id"], True
+                )
+                await client.post(
+                    "/v1/attempts/quiz-metrics0/step", json={"response_id": response.id}
+                )
+                scrape = await client.get("/v1/metrics")
+
+        assert scrape.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = scrape.text
+        init_route = f'route="{_template("attempt_init")}",method="POST"'
+        assert _value(text, f"studycat_http_requests_total{{{init_route},status=\"200\"}}") >= 1
+        assert _value(text, f"studycat_http_request_duration_seconds_count{{{init_route}}}") >= 1
+        # The scrape itself is in flight while the registry renders
+        assert _value(text, "studycat_http_requests_in_flight") >= 1
+
+        calls = 'studycat_db_calls_total{function="get_attempt"}'
+        assert _value(text, calls) > (_value(before, calls) if calls in before else 0)
+        assert _value(text, 'studycat_db_call_duration_seconds_count{function="get_attempt"}')
+        estimator = settings.ability_estimator
+        estimations = f'studycat_estimations_total{{path="step",estimator="{estimator}"}}'
+        assert _value(text, estimations) >= 1
+        selections = "studycat_selection_candidates_count"
+        selected_before = _value(before, selections) if selections in before else 0
+        assert _value(text, selections) > selected_before
+        assert _value(text, 'studycat_stage_duration_seconds_count{stage="step.estimate"}') >= 1
+        assert 'studycat_cache_hit_ratio{cache="bank"}' in text
+        assert "studycat_engine_pending 0" in text
+
+    @pytest.mark.asyncio
+    async def test_route_label_ignores_path_values(self):
+        """
+        Attempt ids equal to literal path segments ("init", "v1", "attempts")
+        are labelled with the route's template, like any other id; unknown
+        paths share the "unmatched" label.
+        """
+        from studycat_service.db.memory import MemoryRepository
+        from studycat_service.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        with MemoryRepository().installed():
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                for attempt_id in ("init", "v1", "attempts", "step"):
+                    await client.post(f"/v1/attempts/{attempt_id}/init", json={})
+                await client.get("/v1/no-such-route/init")
+                text = (await client.get("/v1/metrics")).text
+
+        labels = set(re.findall(r'^studycat_http_requests_total\{route="([^"]*)"', text, re.M))
+        assert labels <= {
+            _template("attempt_init"), _template("attempt_step"),
+            _template("health"), _template("metrics"), "unmatched",
+        }
+        assert {_template("attempt_init"), "unmatched"} <= labels
@@ -0,0 +1,109 @@
+"""
+Tests for the idempotent replay cache of /init and /step responses
+(service/results.py and its use in routers.py).
+
+Retried requests must get the first response's body back without reaching the
+service layer; changed payloads, failures and stale /init bodies must not be
+replayed.
+"""
+from __future__ import annotations
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from studycat_service.schemas import AttemptInitRequest, AttemptStepRequest
+from studycat_service.service.results import ResultCache
+
+
+class TestResultCache:
+    """Keying and invalidation of ResultCache."""
+
+    def test_step_body_replayed_for_same_request_only(self):
+        """A step body is returned for the same request and missed for another."""
+        cache = ResultCache(max_entries=8, ttl_seconds=60)
+        cache.put_step("attempt1", "resp1", "req", "body")
+
+        assert cache.get_step("attempt1", "resp1", "req") == "body"
+        assert cache.get_step("attempt1", "resp1", "other") is None
+        assert cache.get_step("attempt1", "resp2", "req") is None
+
+    def test_step_drops_cached_init(self):
+        """Storing a step for an attempt forgets that attempt's init body only."""
+        cache = ResultCache(max_entries=8, ttl_seconds=60)
+        cache.put_init("attempt1", "req", "init1")
+        cache.put_init("attempt2", "req", "init2")
+
+        cache.put_step("attempt1", "resp1", "req", "step1")
+
+        assert cache.get_init("attempt1", "req") is None
+        assert cache.get_init("attempt2", "req") == "init2"
+
+
+class TestReplayedRoutes:
+    """attempt_init / attempt_step replay cached bodies."""
+
+    @pytest.mark.asyncio
+    async def test_retried_step_skips_the_service(self):
+        """
+        Posting the same step twice calls step_attempt once and returns an
+        identical body; a different payload for the response is recomputed.
+        """
+        from studycat_service.routers import attempt_step
+
+        step = AsyncMock(return_value=({"math": 0.4}, {"math": False}, None, True, False))
+        payload = AttemptStepRequest(response_id="resp1")
+
+        with patch("studycat_service.routers.step_attempt", step):
+            first = await attempt_step("attempt1", payload)
+            retry = await attempt_step("attempt1", payload)
+            await attempt_step("attempt1", AttemptStepRequest(
+                response_id="resp1", item_id="m1", answer_index=0))
+
+        assert retry.body == first.body
+        assert json.loads(first.body)["next_action"] == "FINISH"
+        assert step.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_step_not_cached(self):
+        """A ValueError from the service is not replayed to the next retry."""
+        from fastapi import HTTPException
+
+        from studycat_service.routers import attempt_step
+
+        step = AsyncMock(side_effect=[
+            ValueError("Unknown item_id"),
+            ({"math": 0.4}, {"math": False}, None, True, False),
+        ])
+        payload = AttemptStepRequest(response_id="resp1")
+
+        with patch("studycat_service.routers.step_attempt", step):
+            with pytest.raises(HTTPException):
+                await attempt_step("attempt1", payload)
+            await attempt_step("attempt1", payload)
+
+        assert step.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_init_replayed_until_first_step(self):
+        """
+        A refreshed /init gets the cached body; after a step on the attempt
+        /init is computed again.
+        """
+        from studycat_service.routers import attempt_init, attempt_step
+
+        init = AsyncMock(return_value=({"math": 0.0}, None))
+        step = AsyncMock(return_value=({"math": 0.4}, {"math": False}, None, False, False))
+        payload = AttemptInitRequest()
+
+        with patch("studycat_service.routers.init_attempt", init), \
+             patch("studycat_service.routers.step_attempt", step):
+            await attempt_init("attempt1", payload)
+            await attempt_init("attempt1", payload)
+            assert init.await_count == 1
+
+            await attempt_step("attempt1", AttemptStepRequest(response_id="resp1"))
+            await attempt_init("attempt1", payload)
+
+        assert init.await_count == 2
@@ -0,0 +1,88 @@
+"""
+Tests for per-request stage timings (middleware.py, service/timing.py).
+
+Sampled requests must report every stage they went through, including
+stages timed on engine executor threads, in a Server-Timing header and a
+structured log record; unsampled requests must be left untouched.
+"""
+from __future__ import annotations
+
+import json
+import logging
+
+import httpx
+import pytest
+
+
+async def _init_and_step(repository):
+    """POST /init and one /step for a seeded attempt; return both HTTP responses."""
+    from studycat_service.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        init = await client.post("/v1/attempts/quiz-attempt0/init", json={})
+        item_id = init.json()["next_item"]["item_id"]
+        response = repository.add_response("quiz-attempt0", item_id, True)
+        step = await client.post(
+            "/v1/attempts/quiz-attempt0/step", json={"response_id": response.id}
+        )
+    return init, step
+
+
+def _stages(header: str) -> list[str]:
+    return [entry.split(";")[0] for entry in header.split(", ")]
+
+
+class TestServerTiming:
+    """Sampling, headers and records of ServerTimingMiddleware."""
+
+    @pytest.fixture
+    def repository(self):
+        from studycat_service.db.memory import MemoryRepository
+        from studycat_service.db.synthetic import seed_attempts, seed_quiz
+
+        repository = MemoryRepository()
+        quiz = seed_quiz(repository, n_modules=2, items_per_module=10)
+        seed_attempts(repository, quiz.id, 1, fixed_length=5)
+        with repository.installed():
+            yield repository
+
+    @pytest.mark.asyncio
+    async def test_sampled_requests_report_their_stages(self, repository, monkeypatch, caplog):
+        """
+        With every request sampled, /init and /step carry Server-Timing with
+        the total first and their loop and executor-thread stages (e.g.
+        pools.build), and one JSON record per request is logged.
+        """
+        from studycat_service.config import settings
+
+        monkeypatch.setattr(settings, "timing_sample_rate", 1.0)
+        with caplog.at_level(logging.INFO, logger="studycat_service.timing"):
+            init, step = await _init_and_step(repository)
+
+        init_stages = _stages(init.headers["server-timing"])
+        step_stages = _stages(step.headers["server-timing"])
+        assert init_stages[0] == step_stages[0] == "total"
+        assert {"context.attempt", "context.bank", "pools.build", "model.build",
+                "item.content", "payload.build"} <= set(init_stages)
+        # The step continues the cached session: no context load or replay
+        assert {"step.estimate", "step.select", "step.snapshot",
+                "step.persist", "payload.build"} <= set(step_stages)
+        assert "context.load" not in step_stages
+
+        records = [r for r in caplog.records if r.name == "studycat_service.timing"]
+        assert [r.timing["path"] for r in records] == [
+            "/v1/attempts/quiz-attempt0/init", "/v1/attempts/quiz-attempt0/step"
+        ]
+        assert json.loads(records[1].getMessage())["stages"]["step.persist"] > 0.0
+        assert records[1].timing["status"] == 200
+
+    @pytest.mark.asyncio
+    async def test_unsampled_requests_untouched(self, repository, caplog):
+        """At the default rate of 0 no header is added and nothing is logged."""
+        with caplog.at_level(logging.INFO, logger="studycat_service.timing"):
+            init, step = await _init_and_step(repository)
+
+        assert "server-timing" not in init.headers
+        assert "server-timing" not in step.headers
+        assert not [r for r in caplog.records if r.name == "studycat_service.timing"]
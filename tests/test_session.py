@@ -0,0 +1,230 @@
+"""
+Tests for the attempt session cache (cache.py, service/session.py) and the
+warm /step path in service/core.py that continues from a cached session
+instead of replaying the attempt's history.
+"""
+from __future__ import annotations
+
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from studycat_service.cache import TTLCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock for expiry tests."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# ---------------------------------------------------------------------------
+# TTLCache
+# ---------------------------------------------------------------------------
+
+class TestTTLCache:
+    """
+    TTLCache is the shared LRU/TTL container behind the session store and the
+    other in-process caches.
+    """
+
+    def test_lru_eviction(self):
+        """
+        With max_entries=2, inserting a third key evicts the least recently
+        used one. Reading 'a' before inserting 'c' makes 'b' the LRU entry.
+        """
+        cache = TTLCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_idle_ttl_refreshed_on_get(self):
+        """
+        A sliding TTL only expires entries that have been idle for longer than
+        ttl_seconds; each get() restarts the idle timer.
+        """
+        clock = FakeClock()
+        cache = TTLCache(max_entries=10, ttl_seconds=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 8
+        assert cache.get("a") == 1
+        clock.now = 16
+        assert cache.get("a") == 1
+        clock.now = 30
+        assert cache.get("a") is None
+
+    def test_weight_cap_evicts_oldest(self):
+        """
+        When the summed weight exceeds max_weight, least recently used entries
+        are evicted until the cache is back within budget.
+        """
+        evicted = []
+        cache = TTLCache(
+            max_entries=10,
+            max_weight=10,
+            weigher=len,
+            on_evict=lambda key, _value: evicted.append(key),
+        )
+        cache.put("a", [0] * 6)
+        cache.put("b", [0] * 6)
+        assert evicted == ["a"]
+        assert cache.weight == 6
+
+    def test_pop_removes_entry(self):
+        """pop() returns the value and leaves the cache without the key."""
+        cache = TTLCache(max_entries=2)
+        cache.put("a", 1)
+        assert cache.pop("a") == 1
+        assert "a" not in cache
+        assert cache.pop("a") is None
+
+
+# ---------------------------------------------------------------------------
+# Warm step path
+# ---------------------------------------------------------------------------
+
+def _patch_repo(stack: ExitStack, **mocks) -> dict[str, AsyncMock]:
+    """Patch repo functions used by core.py with AsyncMocks returning the given values."""
+    patched = {}
+    for name, value in mocks.items():
+        mock = value if isinstance(value, AsyncMock) else AsyncMock(return_value=value)
+        stack.enter_context(patch(f"studycat_service.service.core.repo.{name}", mock))
+        patched[name] = mock
+    return patched
+
+
+class TestWarmStep:
+    """
+    After init_attempt the live model is kept in the session store, so the
+    next step_attempt for that attempt only applies the new response instead
+    of rebuilding pools and replaying list_responses.
+    """
+
+    def _db_items(self, make_db_item):
+        return [
+            make_db_item("math", item_id="m1", b=-1.0),
+            make_db_item("math", item_id="m2", b=0.0),
+            make_db_item("math", item_id="m3", b=1.0),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_step_after_init_skips_replay(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        make_response,
+        item_lookup,
+        ):
+        """
+        A step directly after init must not call list_responses or reload the
+        item bank, and should still move theta up after a correct answer.
+        """
+        from studycat_service.service.core import init_attempt, step_attempt
+
+        items = self._db_items(make_db_item)
+        response = make_response("resp1", items[1], is_correct=True)
+        with ExitStack() as stack:
+            mocks = _patch_repo(
+                stack,
+                get_attempt=make_attempt(
+                    fixed_length=5, quiz_modules=[make_quiz_module(threshold=3.0)]),
+                list_eligible_items_for_quiz=items,
+                get_thetas_for_enrollment={},
+                list_response_ids=["resp1"],
+                list_responses=[response],
+                get_response_by_id=response,
+                persist_step_results=None,
+                get_item_by_id=item_lookup(*items),
+            )
+            theta0, _ = await init_attempt("attempt1", None, None, None)
+            mocks["list_eligible_items_for_quiz"].reset_mock()
+            theta, _, next_public, is_finished, _ = await step_attempt("attempt1", "resp1")
+
+        mocks["list_responses"].assert_not_awaited()
+        mocks["list_eligible_items_for_quiz"].assert_not_awaited()
+        assert theta["math"] > theta0["math"]
+        assert next_public is not None
+        assert is_finished is False
+
+    @pytest.mark.asyncio
+    async def test_stale_session_falls_back_to_replay(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        make_response,
+        item_lookup,
+        ):
+        """
+        If the DB holds a response the cached session has not seen (e.g. it
+        was handled by another worker), the session is discarded and the
+        model is rebuilt by replaying list_responses.
+        """
+        from studycat_service.service.core import init_attempt, step_attempt
+
+        items = self._db_items(make_db_item)
+        other = make_response("resp0", items[0], is_correct=True)
+        response = make_response("resp1", items[1], is_correct=True)
+        with ExitStack() as stack:
+            mocks = _patch_repo(
+                stack,
+                get_attempt=make_attempt(
+                    fixed_length=5, quiz_modules=[make_quiz_module(threshold=3.0)]),
+                list_eligible_items_for_quiz=items,
+                get_thetas_for_enrollment={},
+                list_response_ids=["resp0", "resp1"],
+                list_responses=[other, response],
+                get_response_by_id=response,
+                persist_step_results=None,
+                get_item_by_id=item_lookup(*items),
+            )
+            await init_attempt("attempt1", None, None, None)
+            await step_attempt("attempt1", "resp1")
+
+        mocks["list_responses"].assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_retried_response_is_not_applied_twice(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        make_response,
+        item_lookup,
+        ):
+        """
+        Re-posting a response_id the cached session already applied must not
+        record it into the live model a second time; the step is recomputed
+        from a replay instead, so both calls return the same theta.
+        """
+        from studycat_service.service.core import init_attempt, step_attempt
+
+        items = self._db_items(make_db_item)
+        response = make_response("resp1", items[1], is_correct=True)
+        with ExitStack() as stack:
+            _patch_repo(
+                stack,
+                get_attempt=make_attempt(
+                    fixed_length=5, quiz_modules=[make_quiz_module(threshold=3.0)]),
+                list_eligible_items_for_quiz=items,
+                get_thetas_for_enrollment={},
+                list_response_ids=["resp1"],
+                list_responses=[response],
+                get_response_by_id=response,
+                persist_step_results=None,
+                get_item_by_id=item_lookup(*items),
+            )
+            await init_attempt("attempt1", None, None, None)
+            first, _, _, _, _ = await step_attempt("attempt1", "resp1")
+            second, _, _, _, _ = await step_attempt("attempt1", "resp1")
+
+        assert abs(first["math"] - second["math"]) < 1e-9
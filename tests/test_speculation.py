@@ -0,0 +1,116 @@
+"""
+Tests for speculative precomputation of the next step (settings.speculative_steps).
+
+After an item is served, both possible answers are computed in the background
+on forks of the model. A following /step for that item must give exactly the
+result the normal path would, without running estimation or selection itself,
+and a session's speculation must be cancelled when the session is evicted.
+"""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from adaptivetesting.models import ItemPool
+
+
+class TestSpeculativeSteps:
+    """step_attempt with speculative_steps enabled."""
+
+    @pytest.mark.asyncio
+    async def test_same_results_as_without_speculation(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        run_attempt,
+        ):
+        """
+        The speculative path serves the same items with the same theta and
+        mastery as the normal path, and never runs the step's own estimation
+        or selection.
+        """
+        from studycat_service.service.session import sessions
+        from studycat_service.service.timing import timings
+
+        items = [make_db_item("math", item_id=f"m{i}", a=1.0 + i / 10, b=i - 2.0)
+                 for i in range(6)]
+        answers = [True, False, True, True]
+
+        def run():
+            return run_attempt(items, make_quiz_module(threshold=3.0),
+                               make_attempt(fixed_length=4), answers)
+
+        expected = await run()
+        sessions.clear()
+        timings.clear()
+        with patch("studycat_service.service.core.settings.speculative_steps", True):
+            speculative = await run()
+
+        assert speculative[0] == expected[0]
+        for got, want in zip(speculative[1], expected[1], strict=True):
+            assert got[0] == pytest.approx(want[0])
+            assert got[1:] == want[1:]
+        stats = timings.snapshot()
+        assert stats["speculate"].count == len(answers)
+        assert "step.estimate" not in stats
+        assert "step.select" not in stats
+
+    @pytest.mark.asyncio
+    async def test_eviction_cancels_speculation(self):
+        """A session evicted from the store has its pending speculation cancelled."""
+        from studycat_service.service.session import AttemptSession, SessionStore, Speculation
+
+        store = SessionStore(max_entries=1, ttl_seconds=60, max_items=100)
+        pending = asyncio.get_running_loop().create_future()
+
+        def session(attempt_id):
+            return AttemptSession(
+                attempt_id=attempt_id, enrollment_id="enr1", quiz_id="quiz1",
+                fixed_length=5, model=AsyncMock(models={}), bank=None,
+                thresholds={}, prior_sigma2=1.0,
+            )
+
+        first = session("attempt1")
+        first.speculation = Speculation(item_id="m1", task=pending)
+        store.put(first)
+        store.put(session("attempt2"))
+
+        assert pending.cancelled()
+
+
+class TestForkModel:
+    """fork_model copies engine state but shares TestItems."""
+
+    def test_fork_is_independent_and_shares_items(self, pool_items):
+        """
+        Recording a response on the fork leaves the original model untouched,
+        while the fork's answered and pooled items are the original objects.
+        """
+        from studycat_service.engine.adapter import (
+            _make_test_item,
+            build_multidim_model,
+            fork_model,
+        )
+
+        items = [_make_test_item(a=1.0, b=b, c=0.0) for b in (-1.0, 0.0, 1.0)]
+        model = build_multidim_model(
+            concepts=["math"],
+            pools_by_concept={"math": ItemPool(items)},
+            prior_mu=0.0,
+            prior_sigma2=1.0,
+            mastery_thresholds={"math": 3.0},
+            ability_estimator="grid_map",
+        )
+        original = model.models["math"]
+        served = pool_items(original)[0]
+
+        fork = fork_model(model)
+        fork.models["math"].record_response(1, served)
+
+        assert original.adaptive_test.answered_items == []
+        assert original.get_theta() == 0.0
+        assert fork.models["math"].get_theta() > 0.0
+        assert fork.models["math"].adaptive_test.answered_items[0] is served
+        assert set(map(id, pool_items(fork.models["math"]))) < set(map(id, pool_items(original)))
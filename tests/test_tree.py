@@ -0,0 +1,233 @@
+"""
+Tests for shared attempt openings (service/tree.py): the first-item cache
+(settings.init_cache) and the opening decision tree (settings.decision_tree_depth).
+
+Openings must hold the same states the live engine reaches for every
+response prefix, be built once per bank and configuration, and only be used
+for attempts whose opening is fully determined by the bank and the prior.
+"""
+from __future__ import annotations
+
+import logging
+from unittest.mock import patch
+
+import pytest
+from adaptivetesting.models import ItemPool
+
+
+def _bank_items(make_db_item, n=8):
+    return [make_db_item("math", item_id=f"m{i}", a=0.8 + i / 10, b=i / 2 - 2.0)
+            for i in range(n)]
+
+
+class TestBuildTree:
+    """Shape and contents of build_tree()."""
+
+    def test_nodes_match_live_engine(self):
+        """
+        A depth-2 tree has 7 nodes; the root serves the live engine's first
+        item and a correct answer leads to a higher theta than an incorrect one.
+        """
+        from studycat_service.engine.adapter import (
+            _make_test_item,
+            build_multidim_model,
+            choose_next_item,
+        )
+        from studycat_service.service.tree import build_tree
+
+        items = [_make_test_item(a=1.0, b=b, c=0.0) for b in (-1.5, -0.5, 0.5, 1.5)]
+
+        def model():
+            return build_multidim_model(
+                concepts=["math"],
+                pools_by_concept={"math": ItemPool(items)},
+                prior_mu=0.0,
+                prior_sigma2=1.0,
+                mastery_thresholds={"math": 3.0},
+            )
+
+        root = build_tree(model(), {"math": 3.0}, depth=2)
+        live_first, _ = choose_next_item(model())
+
+        assert root.size == 7
+        assert root.branch.next_item.id == live_first.id
+        wrong, right = root.children[0], root.children[1]
+        assert right.branch.theta["math"] > wrong.branch.theta["math"]
+        assert right.child(live_first.id, True) is None  # off-path item id
+        assert root.child(live_first.id, True) is right
+
+
+class TestTreeInService:
+    """init_attempt / step_attempt with decision_tree_depth set."""
+
+    @pytest.mark.asyncio
+    async def test_same_results_as_live_engine(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        run_attempt,
+        ):
+        """
+        With depth 2 the first three steps' estimation and selection come from
+        the tree, giving the live engine's results; the tree is built once
+        and reused by a second attempt on the same bank.
+        """
+        from studycat_service.service.session import sessions
+        from studycat_service.service.timing import timings
+
+        items = _bank_items(make_db_item)
+        attempt = make_attempt(fixed_length=6)
+        answers = [True, False, True, False]
+
+        def run(attempt_id="attempt1"):
+            return run_attempt(items, make_quiz_module(threshold=3.0), attempt, answers,
+                               attempt_id=attempt_id)
+
+        expected = await run()
+        sessions.clear()
+        timings.clear()
+        with patch("studycat_service.service.core.settings.decision_tree_depth", 2):
+            from_tree = await run()
+            await run("attempt2")
+
+        assert from_tree[0] == expected[0]
+        for got, want in zip(from_tree[1], expected[1], strict=True):
+            assert got[0] == pytest.approx(want[0])
+            assert got[1:] == want[1:]
+        stats = timings.snapshot()
+        assert stats["tree.build"].count == 1
+        assert "init.model" not in stats
+        # Two attempts each leave the tree after their second answer
+        assert stats["step.estimate"].count == 2 * (len(answers) - 2)
+
+    @pytest.mark.asyncio
+    async def test_stored_theta_uses_live_engine(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        run_attempt,
+        ):
+        """An enrollment whose stored theta differs from the prior bypasses the tree."""
+        from studycat_service.service.timing import timings
+
+        with patch("studycat_service.service.core.settings.decision_tree_depth", 2):
+            await run_attempt(_bank_items(make_db_item), make_quiz_module(threshold=3.0),
+                              make_attempt(fixed_length=6), [True],
+                              thetas={"math": 0.7})
+
+        stats = timings.snapshot()
+        assert "tree.build" not in stats
+        assert stats["init.model"].count == 1
+
+
+class TestInitCache:
+    """init_attempt sharing the initial model and first item per bank."""
+
+    @pytest.mark.asyncio
+    async def test_computed_once_per_scope(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        run_attempt,
+        ):
+        """
+        Cold-start inits on one bank build the model once per module scope,
+        and each attempt gets its own copy: answers in one attempt do not leak
+        into the next one's results.
+        """
+        from studycat_service.service.session import sessions
+        from studycat_service.service.timing import timings
+
+        items = _bank_items(make_db_item)
+        attempt = make_attempt(fixed_length=6)
+
+        with patch("studycat_service.service.core.settings.init_cache", False):
+            expected = await run_attempt(items, make_quiz_module(threshold=3.0), attempt,
+                                         [False, True])
+        sessions.clear()
+        timings.clear()
+
+        await run_attempt(items, make_quiz_module(threshold=3.0), attempt, [True, True, True])
+        cached = await run_attempt(items, make_quiz_module(threshold=3.0), attempt,
+                                   [False, True], attempt_id="attempt2")
+
+        assert cached[0] == expected[0]
+        for got, want in zip(cached[1], expected[1], strict=True):
+            assert got[0] == pytest.approx(want[0])
+            assert got[1:] == want[1:]
+        stats = timings.snapshot()
+        assert stats["init.model"].count == 1
+        assert stats["tree.fork"].count == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_or_seeded_uses_live_engine(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        run_attempt,
+        ):
+        """
+        With init_cache off, or for an enrollment with a stored theta, every
+        init builds its own model.
+        """
+        from studycat_service.service.timing import timings
+
+        items = _bank_items(make_db_item)
+        attempt = make_attempt(fixed_length=6)
+        module = make_quiz_module(threshold=3.0)
+
+        with patch("studycat_service.service.core.settings.init_cache", False):
+            await run_attempt(items, module, attempt, [])
+            await run_attempt(items, module, attempt, [], attempt_id="attempt2")
+        await run_attempt(items, module, attempt, [], thetas={"math": 0.7},
+                          attempt_id="attempt3")
+
+        stats = timings.snapshot()
+        assert stats["init.model"].count == 3
+        assert "tree.fork" not in stats
+
+    @pytest.mark.asyncio
+    async def test_failed_build_retried_by_next_init(
+        self,
+        make_db_item,
+        make_quiz_module,
+        make_attempt,
+        run_attempt,
+        caplog,
+        ):
+        """
+        A build rejected by a busy engine falls back to the live engine, and
+        any other error is logged and raised; either way the failed build is
+        not cached, so the next init builds the opening again.
+        """
+        from studycat_service.service import core
+        from studycat_service.service.executor import EngineBusyError
+
+        items = _bank_items(make_db_item)
+        attempt = make_attempt(fixed_length=6)
+        module = make_quiz_module(threshold=3.0)
+        build_tree = core._build_tree
+        failures = [EngineBusyError("busy"), RuntimeError("bad bank")]
+        builds = []
+
+        def failing_build(*args):
+            builds.append(args)
+            if failures:
+                raise failures.pop(0)
+            return build_tree(*args)
+
+        with patch("studycat_service.service.core._build_tree", failing_build):
+            first, _ = await run_attempt(items, module, attempt, [])
+            with caplog.at_level(logging.ERROR, logger="studycat_service.service.core"):
+                with pytest.raises(RuntimeError, match="bad bank"):
+                    await run_attempt(items, module, attempt, [], attempt_id="attempt2")
+            cached, _ = await run_attempt(items, module, attempt, [], attempt_id="attempt3")
+            again, _ = await run_attempt(items, module, attempt, [], attempt_id="attempt4")
+
+        assert first == cached == again
+        assert len(builds) == 3
+        assert "Building the opening of quiz quiz1 failed" in caplog.text